@@ -0,0 +1,19 @@
+import os
+
+
+def atomic_write(path, write):
+    """
+    Call write(tmp_path) and rename the file into place at path, so readers never see a partial file.
+
+    The temporary file sits next to path and carries the writer's pid, so
+    concurrent writers of the same path don't clobber each other's partial
+    output; the last rename wins. It is removed if write fails.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
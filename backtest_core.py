@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+# NSE cash session 09:15-15:30
+TRADING_MINUTES_PER_DAY = 375
+TRADING_DAYS_PER_YEAR = 252
+
+# Keys of compute_metrics, in report order
+METRIC_COLUMNS = ['Number of Trades', 'Total Profit/Loss', 'Win Rate', 'Sharpe Ratio', 'Maximum Drawdown',
+                  'Exposure', 'Turnover']
+
+_CALENDAR_PERIODS = {'W': 52, 'ME': 12, 'M': 12, 'MS': 12, 'QE': 4, 'Q': 4, 'QS': 4, 'YE': 1, 'Y': 1, 'YS': 1}
+
+
+def periods_per_year(timeframe):
+    """Number of bars of `timeframe` in a trading year, used to annualise the Sharpe ratio."""
+    offset = to_offset(timeframe)
+    name = offset.name.split('-')[0]
+    if name in _CALENDAR_PERIODS:
+        return _CALENDAR_PERIODS[name] / offset.n
+    if name in ('D', 'B'):
+        return TRADING_DAYS_PER_YEAR / offset.n
+    minutes = pd.Timedelta(offset).total_seconds() / 60
+    return TRADING_DAYS_PER_YEAR * max(TRADING_MINUTES_PER_DAY / minutes, 1)
+
+
+def pair_trades(entry_price, exit_price):
+    """
+    Pair Entry_Price/Exit_Price markers into (entries, exits) bar indices.
+
+    A trade opens on the first entry marker while flat and closes on the first
+    exit marker after it. The RSI strategy also marks signal bars it did not
+    trade on, and those are skipped. If the last trade is still open,
+    entries has one element more than exits.
+    """
+    entry_idx = np.flatnonzero(~np.isnan(np.asarray(entry_price, dtype=np.float64)))
+    exit_idx = np.flatnonzero(~np.isnan(np.asarray(exit_price, dtype=np.float64)))
+
+    # Fast path: markers already alternate entry, exit, entry, ... (Moving Average Crossover),
+    # i.e. every exit follows its entry and every later entry (an open one included) follows the previous exit
+    k = len(exit_idx)
+    if (len(entry_idx) in (k, k + 1) and np.all(entry_idx[:k] < exit_idx)
+            and np.all(exit_idx[:len(entry_idx) - 1] < entry_idx[1:])):
+        return entry_idx, exit_idx
+
+    entries, exits = [], []
+    position = 0
+    while True:
+        i = np.searchsorted(entry_idx, position)
+        if i == len(entry_idx):
+            break
+        entries.append(entry_idx[i])
+        j = np.searchsorted(exit_idx, entry_idx[i], side='right')
+        if j == len(exit_idx):
+            break
+        exits.append(exit_idx[j])
+        position = exit_idx[j] + 1
+    return np.asarray(entries, dtype=np.int64), np.asarray(exits, dtype=np.int64)
+
+
+def _close_open_trade(entries, exits, n):
+    # A trade still open at the end is marked to the last close
+    if len(entries) > len(exits):
+        return np.append(exits, n - 1).astype(np.int64), True
+    return np.asarray(exits, dtype=np.int64), False
+
+
+def trade_ledger(df, entries=None, exits=None):
+    """
+    One row per trade: entry/exit time and price, PnL in points, return and holding period.
+
+    Trades come from the frame's Entry_Price/Exit_Price columns unless entry
+    and exit bar indices are given.
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    if entries is None:
+        entries, exits = pair_trades(df['Entry_Price'].to_numpy(), df['Exit_Price'].to_numpy())
+    entries = np.asarray(entries, dtype=np.int64)
+    exits, is_open = _close_open_trade(entries, exits, len(close))
+
+    entry_price = close[entries]
+    exit_price = close[exits]
+    ledger = pd.DataFrame({
+        'Entry_Time': df.index[entries],
+        'Exit_Time': df.index[exits],
+        'Entry_Price': entry_price,
+        'Exit_Price': exit_price,
+        'PnL': exit_price - entry_price,
+        'Return': exit_price / entry_price - 1,
+        'Holding_Bars': exits - entries,
+        'Holding_Period': df.index[exits] - df.index[entries],
+        'Open': False,
+    })
+    if is_open:
+        ledger.loc[ledger.index[-1], 'Open'] = True
+    return ledger
+
+
+def compute_metrics(close, entries, exits, timeframe=None):
+    """
+    Backtest metrics for a long/flat trade list over one close series.
+
+    The position is held from the bar after each entry through its exit bar.
+    Everything is derived in a single pass of array operations: per-bar
+    strategy returns, the compounded equity curve and its running peak.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    entries = np.asarray(entries, dtype=np.int64)
+    n = len(close)
+    num_trades = len(entries)
+    closed_trades = len(exits)
+    exits, _ = _close_open_trade(entries, exits, n)
+
+    held = np.zeros(n + 1)
+    held[entries + 1] += 1
+    held[exits + 1] -= 1
+    held = np.cumsum(held[:n])
+
+    returns = close[1:] / close[:-1] - 1
+    strategy_returns = returns * held[1:]
+    equity = np.cumprod(1 + strategy_returns)
+    peak = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+
+    trade_returns = close[exits] / close[entries] - 1 if num_trades else np.empty(0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if len(strategy_returns) > 1:
+            sharpe = strategy_returns.mean() / strategy_returns.std(ddof=1)
+            if timeframe is not None:
+                sharpe *= np.sqrt(periods_per_year(timeframe))
+        else:
+            sharpe = np.nan
+
+    return {
+        'Number of Trades': num_trades,
+        'Total Profit/Loss': equity[-1] - 1 if len(equity) else 0.0,
+        'Win Rate': (trade_returns > 0).sum() / num_trades * 100 if num_trades else np.nan,
+        'Sharpe Ratio': sharpe,
+        'Maximum Drawdown': (1 - equity / peak).max() if len(equity) else 0.0,
+        'Exposure': held.mean() if n else 0.0,
+        # Position changes per bar: one for each entry and each completed exit
+        'Turnover': (num_trades + closed_trades) / n if n else 0.0,
+    }
+
+
+class StreamingMetrics:
+    """
+    compute_metrics over a series delivered in consecutive chunks.
+
+    update(close, entries, exits) takes each chunk's closes and the chunk-local
+    trade indices produced by long_flat_positions(..., entry_price=...): when a
+    position is open at the start of a chunk, its first exit closes it. Only
+    running totals are kept (equity, peak, trade counts and a Welford
+    mean/variance of the strategy returns), so memory does not grow with the
+    length of the series.
+    """
+
+    def __init__(self):
+        self.bars = 0
+        self.num_trades = 0
+        self.closed_trades = 0
+        self.wins = 0
+        self.entry_price = None  # Entry price of the open position, if any
+        self._prev_close = None
+        self._held_bars = 0
+        self._equity = 1.0
+        self._peak = 1.0
+        self._max_drawdown = 0.0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, close, entries, exits):
+        close = np.asarray(close, dtype=np.float64)
+        entries = np.asarray(entries, dtype=np.int64)
+        exits = np.asarray(exits, dtype=np.int64)
+        m = len(close)
+        if not m:
+            return
+
+        # Bars held: from the bar after each entry through its exit bar
+        held = np.zeros(m + 1)
+        held[0] = self.entry_price is not None
+        np.add.at(held, entries + 1, 1)
+        np.add.at(held, exits + 1, -1)
+        held = np.cumsum(held[:m])
+        self._held_bars += int(held.sum())
+
+        # Per-bar strategy returns, continuing from the previous chunk's last close
+        if self._prev_close is None:
+            strategy_returns = (close[1:] / close[:-1] - 1) * held[1:]
+        else:
+            previous = np.concatenate(([self._prev_close], close[:-1]))
+            strategy_returns = (close / previous - 1) * held
+        self._prev_close = close[-1]
+
+        if len(strategy_returns):
+            equity = self._equity * np.cumprod(1 + strategy_returns)
+            peak = np.maximum(self._peak, np.maximum.accumulate(equity))
+            self._max_drawdown = max(self._max_drawdown, (1 - equity / peak).max())
+            self._equity, self._peak = equity[-1], peak[-1]
+
+            # Chan et al. merge of the chunk's mean/variance into the running totals
+            count = len(strategy_returns)
+            mean = strategy_returns.mean()
+            m2 = ((strategy_returns - mean) ** 2).sum()
+            delta = mean - self._mean
+            total = self._count + count
+            self._mean += delta * count / total
+            self._m2 += m2 + delta ** 2 * self._count * count / total
+            self._count = total
+
+        # Pair exits with the open entry price (carried in first), then this chunk's entries
+        entry_prices = close[entries]
+        if self.entry_price is not None:
+            entry_prices = np.concatenate(([self.entry_price], entry_prices))
+        closed = len(exits)
+        self.wins += int((close[exits] > entry_prices[:closed]).sum())
+        self.entry_price = entry_prices[closed] if len(entry_prices) > closed else None
+
+        self.num_trades += len(entries)
+        self.closed_trades += closed
+        self.bars += m
+
+    def result(self, timeframe=None):
+        """The compute_metrics dict for everything seen so far (an open trade is marked to the last close)."""
+        n = self.bars
+        wins = self.wins
+        if self.entry_price is not None and self._prev_close > self.entry_price:
+            wins += 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self._count > 1:
+                sharpe = self._mean / np.sqrt(self._m2 / (self._count - 1))
+                if timeframe is not None:
+                    sharpe *= np.sqrt(periods_per_year(timeframe))
+            else:
+                sharpe = np.nan
+
+        return {
+            'Number of Trades': self.num_trades,
+            'Total Profit/Loss': self._equity - 1 if self._count else 0.0,
+            'Win Rate': wins / self.num_trades * 100 if self.num_trades else np.nan,
+            'Sharpe Ratio': sharpe,
+            'Maximum Drawdown': self._max_drawdown if self._count else 0.0,
+            'Exposure': self._held_bars / n if n else 0.0,
+            'Turnover': (self.num_trades + self.closed_trades) / n if n else 0.0,
+        }
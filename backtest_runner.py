@@ -0,0 +1,137 @@
+import inspect
+import os
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from bars import load_bars
+from instrumentation import instrumented_run, stage
+from results_store import RESULTS_DIR, record_runs
+from task3 import moving_average_crossover, rsi_strategy
+from task4 import backtest_strategy
+from tickers import TICKERS
+
+TIMEFRAMES = ['1Min', '5Min', '1h', '1D', '1ME']
+
+STRATEGIES = {
+    "Moving Average Crossover": moving_average_crossover,
+    "RSI": rsi_strategy,
+}
+
+# Frames attached from shared memory in each worker process, keyed by ticker
+_worker_frames = {}
+_worker_blocks = []
+
+
+def share_arrays(arrays):
+    """
+    Copy named NumPy arrays into one shared memory block.
+
+    Returns the block (the caller keeps it alive and unlinks it) and a small,
+    picklable spec that attach_arrays uses in other processes to map the
+    arrays without copying.
+    """
+    arrays = [(name, np.ascontiguousarray(arr)) for name, arr in arrays.items()]
+    size = sum(arr.nbytes for _, arr in arrays)
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+    layout = []
+    offset = 0
+    for name, arr in arrays:
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf, offset=offset)
+        view[:] = arr
+        layout.append((name, arr.dtype.str, arr.shape, offset))
+        offset += arr.nbytes
+    return block, {'name': block.name, 'layout': layout}
+
+
+def attach_arrays(spec):
+    """Map the arrays of a share_arrays spec; keep the returned block open while they are in use."""
+    block = shared_memory.SharedMemory(name=spec['name'])
+    arrays = {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+              for name, dtype, shape, offset in spec['layout']}
+    return block, arrays
+
+
+def _share_frame(df):
+    # The index and columns of df in one shared block, plus what's needed to rebuild the frame
+    index = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+    block, spec = share_arrays({"__index__": index, **{col: df[col].to_numpy() for col in df.columns}})
+    spec['tz'] = str(df.index.tz) if getattr(df.index, 'tz', None) is not None else None
+    return block, spec
+
+
+def _attach_frame(spec):
+    block, arrays = attach_arrays(spec)
+    index = pd.DatetimeIndex(arrays.pop("__index__").view('datetime64[ns]'), name='Date')
+    if spec['tz']:
+        index = index.tz_localize('UTC').tz_convert(spec['tz'])
+    return block, pd.DataFrame(arrays, index=index, copy=False)
+
+
+def _init_worker(specs):
+    for ticker, spec in specs.items():
+        block, df = _attach_frame(spec)
+        _worker_blocks.append(block)
+        _worker_frames[ticker] = df
+
+
+def _run_job(job):
+    ticker, strategy, timeframe = job
+    result = backtest_strategy(_worker_frames[ticker], STRATEGIES[strategy], timeframe, ticker=ticker)
+    return {'Ticker': ticker, 'Strategy': strategy, 'Timeframe': timeframe, **result}
+
+
+def strategy_params(strategy):
+    """The keyword defaults a strategy runs with in the grid, recorded with each run."""
+    signature = inspect.signature(STRATEGIES[strategy])
+    return {name: p.default for name, p in signature.parameters.items() if p.default is not inspect.Parameter.empty}
+
+
+def run_backtest_grid(tickers=TICKERS, strategies=tuple(STRATEGIES), timeframes=TIMEFRAMES, max_workers=None,
+                      store_dir=None):
+    """
+    Backtest every (ticker, strategy, timeframe) combination on a process pool.
+
+    Each ticker's OHLCV data is loaded once as compact Bars (float32 prices
+    where precision allows) and placed in shared memory; workers
+    attach to it when they start, so only the job tuples and results dicts are
+    pickled. Returns one row of backtest metrics per combination, and appends
+    them to the results store in store_dir when given.
+    """
+    blocks = []
+    specs = {}
+    try:
+        with stage('load'):
+            for ticker in tickers:
+                block, specs[ticker] = _share_frame(load_bars(ticker).to_frame())
+                blocks.append(block)
+
+        jobs = [(ticker, strategy, timeframe)
+                for ticker in tickers for strategy in strategies for timeframe in timeframes]
+        workers = min(max_workers or os.cpu_count() or 1, len(jobs)) or 1
+        # Stages inside the workers run in other processes and are not part of this run's report
+        with stage('backtest pool'), \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+            rows = list(pool.map(_run_job, jobs))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    results = pd.DataFrame(rows)
+    if store_dir is not None and len(results):
+        for strategy, group in results.groupby('Strategy', sort=False):
+            params = strategy_params(strategy)
+            record_runs(group.assign(**params), param_columns=list(params), store_dir=store_dir)
+    return results
+
+
+if __name__ == "__main__":
+    # Nightly run: all indices, both strategies, every timeframe
+    with instrumented_run('nightly', report_path=f"reports/nightly-{datetime.now():%Y%m%d-%H%M%S}.json"):
+        results = run_backtest_grid(store_dir=RESULTS_DIR)
+    print(results.to_string(index=False))
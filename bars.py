@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data_loader import BASE_DIR, INDEX_COLUMN, read_table
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+OHLCV_COLUMNS = PRICE_COLUMNS + ['Volume']
+
+# NSE index tick; float32 is used only if every price survives the round trip to within half a tick
+PRICE_TICK = 0.05
+
+
+def price_dtype(values, tick=PRICE_TICK):
+    """float32 when it represents every value to within tick/2, else float64."""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(invalid='ignore', over='ignore'):
+        error = np.abs(values.astype(np.float32).astype(np.float64) - values)
+    return np.float32 if not len(values) or np.nanmax(error, initial=0.0) <= tick / 2 else np.float64
+
+
+class Bars:
+    """
+    Compact OHLCV bars: one contiguous NumPy array per field.
+
+    `time` holds UTC epoch nanoseconds (int64) and `tz` the original timezone;
+    prices are float32 when precision allows (see price_dtype) and Volume is
+    int64. There are no partition or Adj Close columns. Slicing returns views.
+    """
+
+    __slots__ = ('time', 'open', 'high', 'low', 'close', 'volume', 'tz')
+
+    def __init__(self, time, open, high, low, close, volume, tz=None):
+        self.time = np.ascontiguousarray(time, dtype=np.int64)
+        self.open = np.ascontiguousarray(open)
+        self.high = np.ascontiguousarray(high)
+        self.low = np.ascontiguousarray(low)
+        self.close = np.ascontiguousarray(close)
+        self.volume = np.ascontiguousarray(volume, dtype=np.int64)
+        self.tz = tz
+
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            raise TypeError("Bars only support slicing")
+        return Bars(self.time[key], self.open[key], self.high[key], self.low[key], self.close[key],
+                    self.volume[key], self.tz)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays().values())
+
+    @property
+    def index(self):
+        index = pd.DatetimeIndex(self.time.view('datetime64[ns]'), name=INDEX_COLUMN)
+        return index.tz_localize('UTC').tz_convert(self.tz) if self.tz else index
+
+    def arrays(self):
+        """The field arrays by frame column name (the time array under 'Date')."""
+        return {INDEX_COLUMN: self.time, 'Open': self.open, 'High': self.high, 'Low': self.low,
+                'Close': self.close, 'Volume': self.volume}
+
+    def to_frame(self):
+        """OHLCV frame with a Date index; the columns share memory with these arrays."""
+        columns = {name: array for name, array in self.arrays().items() if name != INDEX_COLUMN}
+        return pd.DataFrame(columns, index=self.index, copy=False)
+
+    @classmethod
+    def from_frame(cls, df, tick=PRICE_TICK):
+        """Compact an OHLCV frame (extra columns such as Adj Close, Year and Month are dropped)."""
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        time = (index.tz_convert('UTC').tz_localize(None) if tz else index).as_unit('ns').asi8
+        prices = [df[column].to_numpy(dtype=np.float64) for column in PRICE_COLUMNS]
+        dtype = np.result_type(*(price_dtype(values, tick) for values in prices))
+        volume = df['Volume'].to_numpy() if 'Volume' in df else np.zeros(len(df), dtype=np.int64)
+        return cls(time, *(values.astype(dtype) for values in prices), volume, tz)
+
+
+def load_bars(ticker, start_date=None, end_date=None, tick=PRICE_TICK, base_dir=BASE_DIR):
+    """
+    Load a ticker's OHLCV bars straight from parquet into a Bars container.
+
+    Only the Date and OHLCV columns are read, and each is converted from its
+    Arrow column without building a float64 DataFrame first.
+    """
+    table = read_table(ticker, start_date, end_date, OHLCV_COLUMNS, base_dir)
+    date_type = table.schema.field(INDEX_COLUMN).type
+    tz = date_type.tz
+    time = table.column(INDEX_COLUMN).cast(pa.timestamp('ns', tz=tz)).to_numpy().view(np.int64)
+    order = None if np.all(time[1:] >= time[:-1]) else np.argsort(time, kind='stable')
+
+    def column(name, dtype=None):
+        values = table.column(name).to_numpy()
+        values = values if order is None else values[order]
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    prices = [column(name, np.float64) for name in PRICE_COLUMNS]
+    dtype = np.result_type(*(price_dtype(values, tick) for values in prices))
+    time = time if order is None else time[order]
+    return Bars(time, *(values.astype(dtype, copy=False) for values in prices), column('Volume', np.int64), tz)
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_data
+from tickers import TICKERS
+
+START_PRICE = dict(zip(TICKERS, [12000.0, 30000.0, 13000.0]))
+SIZES_YEARS = [0.25, 1, 4]
+TASK2_TIMEFRAMES = ["5 minutes", "1 hour", "1 day"]
+BACKTEST_TIMEFRAMES = ['5Min', '1h', '1D']
+
+# NSE cash session, one bar per minute from 09:15 to 15:29
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+BARS_PER_DAY = 375
+
+
+def synthetic_bars(ticker, years, start="2020-01-01", seed=0):
+    """
+    Seeded minute OHLCV bars for `years` of weekday sessions, in task1's column layout.
+
+    Closes follow a geometric random walk; each bar's open is the previous
+    close and high/low bracket both. The same (ticker, years, start, seed)
+    always gives the same bars.
+    """
+    rng = np.random.default_rng([seed, sum(map(ord, ticker))])
+    days = pd.bdate_range(start, periods=max(int(years * 252), 1))
+    dates = (days.values[:, None] + SESSION_OPEN.to_timedelta64()
+             + np.arange(BARS_PER_DAY) * np.timedelta64(1, 'm')).ravel()
+
+    n = len(dates)
+    close = START_PRICE.get(ticker, 10000.0) * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0003, (2, n))) * close
+    return pd.DataFrame({
+        'Date': dates,
+        'Open': open_,
+        'High': np.maximum(open_, close) + wick[0],
+        'Low': np.minimum(open_, close) - wick[1],
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(0, 10000, n),
+    })
+
+
+def write_synthetic_data(base_dir, tickers=TICKERS, years=1, start="2020-01-01", seed=0):
+    """Write synthetic bars for each ticker as <base_dir>/<ticker>/Year=Y/Month=M/part-0000.parquet. Returns total bars."""
+    total = 0
+    for ticker in tickers:
+        df = synthetic_bars(ticker, years, start, seed)
+        total += len(df)
+        for (year, month), month_df in df.groupby([df['Date'].dt.year, df['Date'].dt.month]):
+            month_path = os.path.join(base_dir, ticker, f"Year={year}", f"Month={month}")
+            os.makedirs(month_path, exist_ok=True)
+            month_df.to_parquet(os.path.join(month_path, "part-0000.parquet"), index=False)
+    return total
+
+
+def time_stage(func, repeat=3, setup=None):
+    """
+    Best and median wall time of `repeat` calls, then one more call under tracemalloc for peak memory.
+
+    If given, setup() runs before every call, outside the timed region and
+    the memory trace, and its result is passed to func (e.g. a fresh copy of
+    a frame the stage modifies in place).
+
+    tracemalloc sees NumPy and pandas allocations but not Arrow's memory pool,
+    so the peak for parquet reads covers the resulting frame, not the reader.
+    """
+    def arguments():
+        return (setup(),) if setup is not None else ()
+
+    timings = []
+    for _ in range(repeat):
+        args = arguments()
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+
+    args = arguments()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak
+
+
+def _stages(ticker, base_dir):
+    # (stage, name, function, bars processed, setup for time_stage); imported here so task3's module
+    # setup only runs when benchmarking
+    from task2 import apply_strategy, resample_data
+    from task3 import moving_average_crossover, rsi_strategy
+    from task4 import backtest_strategy
+
+    df = load_data(ticker, base_dir=base_dir)
+    n = len(df)
+    stages = [("load", "load_data", lambda: load_data(ticker, base_dir=base_dir), n, None)]
+    for timeframe in TASK2_TIMEFRAMES:
+        stages.append(("resample", f"resample_data[{timeframe}]", lambda tf=timeframe: resample_data(df, tf), n,
+                       None))
+    # The strategies add columns to their input, so each call gets a copy made outside the timing
+    for strategy in ("Moving Average Crossover", "RSI", "Bollinger Bands"):
+        stages.append(("strategy", f"task2.apply_strategy[{strategy}]",
+                       lambda frame, s=strategy: apply_strategy(frame, s), n, df.copy))
+    for func in (moving_average_crossover, rsi_strategy):
+        stages.append(("strategy", f"task3.{func.__name__}", func, n, df.copy))
+        for timeframe in BACKTEST_TIMEFRAMES:
+            stages.append(("backtest", f"backtest_strategy[{func.__name__}, {timeframe}]",
+                           lambda f=func, tf=timeframe: backtest_strategy(df, f, tf), n, None))
+    return stages
+
+
+def run_benchmarks(sizes=SIZES_YEARS, tickers=("NSEI",), repeat=3, seed=0, work_dir=None):
+    """
+    Benchmark every stage on synthetic data of each size (in years of minute bars) for each ticker.
+
+    Returns a report dict: environment metadata plus one result per
+    (size, ticker, stage) with best/median seconds, bars/sec and tracemalloc
+    peak MB.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        for years in sizes:
+            base_dir = os.path.join(tmp, f"years-{years}")
+            write_synthetic_data(base_dir, tickers, years, seed=seed)
+            for ticker in tickers:
+                for stage, name, func, bars, setup in _stages(ticker, base_dir):
+                    best, median, peak = time_stage(func, repeat, setup)
+                    results.append({
+                        'years': years,
+                        'ticker': ticker,
+                        'bars': bars,
+                        'stage': stage,
+                        'name': name,
+                        'best_s': round(best, 6),
+                        'median_s': round(median, 6),
+                        'bars_per_sec': round(bars / best) if best else None,
+                        'peak_mb': round(peak / 1024 ** 2, 3),
+                    })
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'seed': seed,
+        'repeat': repeat,
+        'tickers': list(tickers),
+        'results': results,
+    }
+
+
+def compare_reports(old, new):
+    """Join two reports on (years, ticker, name) with the speedup of new over old (old best_s / new best_s)."""
+    old_df, new_df = pd.DataFrame(old['results']), pd.DataFrame(new['results'])
+    # Reports from before --tickers existed have no ticker column; they only ever covered NSEI
+    for df in (old_df, new_df):
+        if 'ticker' not in df.columns:
+            df['ticker'] = "NSEI"
+    keys = ['years', 'ticker', 'name']
+    old_df, new_df = old_df[keys + ['best_s', 'peak_mb']], new_df[keys + ['best_s', 'peak_mb']]
+    merged = old_df.merge(new_df, on=keys, suffixes=('_old', '_new'))
+    merged['speedup'] = (merged['best_s_old'] / merged['best_s_new']).round(2)
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark load, resample, strategy and backtest stages")
+    parser.add_argument("--sizes", type=float, nargs="+", default=SIZES_YEARS, help="Years of minute bars")
+    parser.add_argument("--tickers", nargs="+", default=["NSEI"],
+                        help=f"Synthetic tickers to benchmark, e.g. {' '.join(TICKERS)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.tickers, repeat=args.repeat, seed=args.seed)
+    table = pd.DataFrame(report['results'])
+    print(table[['years', 'ticker', 'bars', 'name', 'best_s', 'bars_per_sec', 'peak_mb']].to_string(index=False))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare_reports(json.load(f), report).to_string(index=False))
@@ -0,0 +1,212 @@
+import argparse
+import os
+import sys
+
+from tickers import TICKER_MAP, TICKERS
+
+# Only argparse and the ticker names are imported up front; each command imports what it needs, so `--help` and
+# scheduled jobs don't pay for pandas, dask, yfinance or telethon unless they use them.
+
+STRATEGY_NAMES = {
+    "mac": "Moving Average Crossover",
+    "rsi": "RSI",
+    "bollinger": "Bollinger Bands",
+}
+DEFAULT_TIMEFRAMES = ['1Min', '5Min', '1h', '1D', '1ME']
+
+
+def _ticker(name):
+    return TICKER_MAP.get(name, name)
+
+
+def ingest(args):
+    from task1 import process_and_save_all_data, tickers
+
+    process_and_save_all_data(args.tickers or tickers, incremental=not args.full)
+
+
+def validate(args):
+    from data_loader import BASE_DIR
+    from data_quality import repair_ticker
+
+    tickers = [_ticker(t) for t in args.tickers] if args.tickers else sorted(
+        name for name in os.listdir(BASE_DIR) if os.path.isdir(os.path.join(BASE_DIR, name)))
+    for ticker in tickers:
+        repaired = repair_ticker(ticker, BASE_DIR)
+        print(f"{ticker}: {len(repaired)} partitions repaired")
+
+
+def scrape(args):
+    from tast1_async_telegram_scrapper import CHECKPOINT_FILE, scrape as run_scrape
+
+    run_scrape(args.group, args.checkpoint or CHECKPOINT_FILE, args.concurrency)
+    if args.convert:
+        from feather_to_parquet import convert_all
+        convert_all()
+
+
+def signals(args):
+    from data_loader import load_data
+
+    ticker = _ticker(args.ticker)
+    df = load_data(ticker, args.start, args.end, columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+    if args.timeframe:
+        from task4 import resample_ohlcv
+        df = resample_ohlcv(df, args.timeframe)
+
+    if args.strategy == "bollinger":
+        from task2 import apply_strategy
+        df = apply_strategy(df, STRATEGY_NAMES[args.strategy])
+    else:
+        from task3 import moving_average_crossover, rsi_strategy
+        df = (moving_average_crossover if args.strategy == "mac" else rsi_strategy)(df)
+
+    from export import export_path, parse_format, write_frame
+
+    fmt, compression = parse_format(args.format)
+    output = args.output or export_path(ticker, args.strategy, args.timeframe or "raw", fmt, compression)
+    write_frame(df, output, fmt, compression)
+    print(f"Wrote {len(df)} rows to {output}")
+
+
+def backtest(args):
+    import pandas as pd
+
+    tickers = [_ticker(t) for t in args.tickers] if args.tickers else None
+    strategies = [STRATEGY_NAMES[s] for s in args.strategies]
+    timeframes = args.timeframes or DEFAULT_TIMEFRAMES
+
+    if args.out_of_core:
+        from dask_backtest import backtest_out_of_core, read_ticker
+
+        rows = [{'Ticker': ticker, 'Strategy': strategy, 'Timeframe': timeframe,
+                 **backtest_out_of_core(read_ticker(ticker), strategy, timeframe)}
+                for ticker in tickers or TICKERS for strategy in strategies for timeframe in timeframes]
+        results = pd.DataFrame(rows)
+        if args.store:
+            from results_store import record_runs
+            record_runs(results, store_dir=args.store)
+    else:
+        from backtest_runner import run_backtest_grid
+
+        results = run_backtest_grid(tickers or TICKERS, strategies, timeframes, max_workers=args.workers,
+                                    store_dir=args.store)
+    print(results.to_string(index=False))
+
+
+def portfolio(args):
+    from portfolio import backtest_portfolio, load_price_matrix
+
+    tickers = [_ticker(t) for t in args.tickers]
+    weights = dict(zip(tickers, args.weights)) if args.weights else None
+    close = load_price_matrix(tickers, args.timeframe, args.start, args.end, how=args.align)
+    result = backtest_portfolio(close, STRATEGY_NAMES[args.strategy], weights, timeframe=args.timeframe)
+    print(result.metrics.to_string())
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        result.equity.to_parquet(args.output)
+        print(f"Wrote equity curves to {args.output}")
+
+
+def walk_forward(args):
+    import pandas as pd
+    from data_loader import load_data
+    from walk_forward import walk_forward as run_walk_forward
+
+    df = load_data(_ticker(args.ticker), args.start, args.end, columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+    result = run_walk_forward(df, STRATEGY_NAMES[args.strategy], in_sample=args.in_sample,
+                              out_of_sample=args.out_of_sample, step=args.step, anchored=args.anchored,
+                              timeframe=args.timeframe, rank_by=args.rank_by, max_workers=args.workers)
+    print(result.windows.to_string(index=False))
+    print(pd.Series(result.metrics).to_string())
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        result.windows.to_parquet(args.output)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Quantumcona data and backtesting pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("ingest", help="Download index data from Yahoo Finance into data/")
+    p.add_argument("--tickers", nargs="+", help="Yahoo symbols (default: task1.tickers)")
+    p.add_argument("--full", action="store_true", help="Re-download everything instead of appending new bars")
+    p.set_defaults(func=ingest)
+
+    p = commands.add_parser("validate", help="Sort/dedup stored partitions and refresh their stats sidecars")
+    p.add_argument("--tickers", nargs="+", help="Default: every ticker under data/")
+    p.set_defaults(func=validate)
+
+    p = commands.add_parser("scrape", help="Download option chain .feather files from Telegram")
+    p.add_argument("--group", help="Group link (default: GROUP_LINK from .env)")
+    p.add_argument("--checkpoint", help="Checkpoint file to resume from")
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--convert", action="store_true", help="Convert the downloads to the parquet options dataset")
+    p.set_defaults(func=scrape)
+
+    p = commands.add_parser("signals", help="Compute a strategy's trading signals for one ticker")
+    p.add_argument("ticker", help="Nifty, BankNifty, FinNifty or a stored ticker")
+    p.add_argument("--strategy", choices=STRATEGY_NAMES, default="mac")
+    p.add_argument("--timeframe", help="Resample first (e.g. 5Min, 1h, 1D)")
+    p.add_argument("--start")
+    p.add_argument("--end")
+    p.add_argument("--format", default="parquet", help="parquet, csv, csv.gz, csv.zst, parquet.zstd ...")
+    p.add_argument("--output", help="Default: output/<ticker>_<strategy>_<timeframe> with the format's extension")
+    p.set_defaults(func=signals)
+
+    p = commands.add_parser("backtest", help="Backtest strategies over tickers and timeframes")
+    p.add_argument("--tickers", nargs="+", help="Default: all three indices")
+    p.add_argument("--strategies", nargs="+", choices=["mac", "rsi"], default=["mac", "rsi"])
+    p.add_argument("--timeframes", nargs="+", help=f"Default: {' '.join(DEFAULT_TIMEFRAMES)}")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    p.add_argument("--store", default="results", help="Results store directory ('' to skip recording)")
+    p.add_argument("--out-of-core", action="store_true", help="Stream the data with Dask instead of loading it")
+    p.set_defaults(func=backtest)
+
+    p = commands.add_parser("portfolio", help="Backtest one strategy over several indices as a weighted portfolio")
+    p.add_argument("--tickers", nargs="+", default=list(TICKER_MAP))
+    p.add_argument("--strategy", choices=["mac", "rsi"], default="mac")
+    p.add_argument("--timeframe", default="1D")
+    p.add_argument("--weights", nargs="+", type=float, help="Capital weight per ticker (default: equal)")
+    p.add_argument("--align", choices=["inner", "outer"], default="inner",
+                   help="Keep only common bars, or all bars with closes carried forward")
+    p.add_argument("--start")
+    p.add_argument("--end")
+    p.add_argument("--output", help="Write the equity curves to this parquet file")
+    p.set_defaults(func=portfolio)
+
+    p = commands.add_parser("walk-forward", help="Walk-forward validation with parameters re-chosen in each window")
+    p.add_argument("ticker", help="Nifty, BankNifty, FinNifty or a stored ticker")
+    p.add_argument("--strategy", choices=["mac", "rsi"], default="mac")
+    p.add_argument("--timeframe", help="Resample first (e.g. 5Min, 1h, 1D)")
+    p.add_argument("--in-sample", default="365D")
+    p.add_argument("--out-of-sample", default="90D")
+    p.add_argument("--step", help="Default: the out-of-sample length")
+    p.add_argument("--anchored", action="store_true", help="Grow the in-sample window from the first bar")
+    p.add_argument("--rank-by", default="Sharpe Ratio")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    p.add_argument("--start")
+    p.add_argument("--end")
+    p.add_argument("--output", help="Write the per-window table to this parquet file")
+    p.set_defaults(func=walk_forward)
+
+    # Instrumentation options go before the command: cli.py --report run.json backtest ...
+    parser.add_argument("--report", help="Write the per-stage timing report (JSON) here")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="Also profile the whole run")
+    parser.add_argument("--quiet", action="store_true", help="Don't print the stage summary table")
+    return parser
+
+
+def main(argv=None):
+    from instrumentation import instrumented_run
+
+    args = build_parser().parse_args(argv)
+    if getattr(args, "store", None) == "":
+        args.store = None
+    with instrumented_run(args.command, args.report, args.profile, summary=not args.quiet):
+        args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
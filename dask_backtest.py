@@ -0,0 +1,167 @@
+import os
+
+import dask
+import dask.dataframe as dd
+import numpy as np
+import pandas as pd
+
+from backtest_core import TRADING_DAYS_PER_YEAR, StreamingMetrics, periods_per_year
+from data_loader import BASE_DIR, INDEX_COLUMN, list_partitions
+from feather_to_parquet import OPTIONS_DIR, parse_symbol
+from indicators import rsi, sma
+from positions import long_flat_positions
+from tickers import TICKER_MAP
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+OPTION_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+
+def _with_divisions(ddf):
+    # resample and map_overlap need known divisions; files whose Date ranges overlap are sorted out of core
+    if ddf.known_divisions:
+        return ddf
+    index = ddf.index.name
+    return ddf.reset_index().sort_values(index).set_index(index, sorted=True)
+
+
+def read_ticker(ticker, start_date=None, end_date=None, base_dir=BASE_DIR):
+    """A ticker's OHLCV history as a Dask frame, one partition per parquet file, with known divisions."""
+    start_date = pd.Timestamp(start_date) if start_date else None
+    end_date = pd.Timestamp(end_date) if end_date else None
+    files = [
+        os.path.join(month_path, file_name)
+        for _, _, month_path in list_partitions(ticker, start_date, end_date, base_dir)
+        for file_name in sorted(os.listdir(month_path))
+        if file_name.endswith(".parquet")
+    ]
+    if not files:
+        raise ValueError(f"No data found for ticker {ticker}")
+
+    ddf = _with_divisions(dd.read_parquet(files, columns=list(OHLCV_AGG), index=INDEX_COLUMN,
+                                          calculate_divisions=True))
+    if start_date is not None or end_date is not None:
+        ddf = ddf.loc[start_date:end_date]
+    return ddf
+
+
+def read_option(symbol, category='nfo', output_dir=OPTIONS_DIR):
+    """One option contract's bars from the feather_to_parquet dataset, as a Dask frame indexed by Date."""
+    contract = parse_symbol(symbol, category)
+    if contract is None:
+        raise ValueError(f"Unrecognised option symbol {symbol}")
+    underlying, expiry, _, _ = contract
+    expiry_dir = os.path.join(output_dir, category, f"underlying={underlying}", f"expiry={expiry.isoformat()}")
+    if not os.path.isdir(expiry_dir):
+        raise ValueError(f"No data found for option {symbol}")
+
+    # Date partitions sort lexically (date=YYYY-MM-DD)
+    files = [
+        os.path.join(root, file_name)
+        for root, _, file_names in sorted(os.walk(expiry_dir))
+        for file_name in sorted(file_names)
+        if file_name.endswith(".parquet")
+    ]
+    ddf = dd.read_parquet(files, columns=list(OPTION_COLUMNS), index='timestamp', filters=[('symbol', '==', symbol)],
+                          calculate_divisions=True)
+    ddf = ddf.rename(columns=OPTION_COLUMNS)
+    ddf.index = ddf.index.rename(INDEX_COLUMN)
+    return _with_divisions(ddf)
+
+
+def _merge_partitions(ddf, min_bars, bars_per_day):
+    # Merge neighbouring partitions until each holds about min_bars bars, estimated from weekdays spanned
+    divisions = ddf.divisions
+    days = np.busday_count(np.array(divisions[:-1], dtype='datetime64[D]'),
+                           np.array(divisions[1:], dtype='datetime64[D]'))
+    merged = [divisions[0]]
+    span = 0
+    for i, count in enumerate(days):
+        span += max(count, 1) * bars_per_day
+        if span >= min_bars:
+            merged.append(divisions[i + 1])
+            span = 0
+    if merged[-1] != divisions[-1]:
+        if len(merged) > 1:
+            merged[-1] = divisions[-1]  # Fold a short tail into the last partition
+        else:
+            merged.append(divisions[-1])
+    return ddf.repartition(divisions=merged) if len(merged) < len(divisions) else ddf
+
+
+def mac_signals(df, short_window=20, long_window=50):
+    """Signal column of task3 moving_average_crossover, without the position step."""
+    signal = np.where(sma(df['Close'], short_window) > sma(df['Close'], long_window), 1, -1)
+    return pd.DataFrame({'Close': df['Close'], 'Signal': signal}, index=df.index)
+
+
+def rsi_signals(df, rsi_period=14, rsi_oversold=30, rsi_overbought=70):
+    """Signal column of task3 rsi_strategy, without the position step."""
+    values = rsi(df['Close'], rsi_period, wilder=False)
+    signal = np.where(values < rsi_oversold, 1, 0)
+    signal = np.where(values > rsi_overbought, -1, signal)
+    return pd.DataFrame({'Close': df['Close'], 'Signal': signal}, index=df.index)
+
+
+# name -> (signal function, warm-up rows needed from the previous partition)
+STRATEGIES = {
+    "Moving Average Crossover": (mac_signals, lambda p: p.get('long_window', 50) - 1),
+    "RSI": (rsi_signals, lambda p: p.get('rsi_period', 14)),
+}
+
+
+def backtest_out_of_core(ddf, strategy, timeframe, stop_loss_pct=0.02, batch_size=None, **params):
+    """
+    Backtest a task3 strategy on a Dask OHLCV frame without loading it into memory.
+
+    Bars are resampled per partition, and the strategy's indicators and signals
+    come from map_overlap with the warm-up rows its rolling windows need, so
+    every partition sees exactly the values a full in-memory run would. The
+    position engine and metrics then walk the partitions in order, a batch of
+    batch_size (default: CPU count) computed at a time, carrying the open
+    position and running totals across partition boundaries.
+    Returns the same metrics dict as task4.backtest_strategy.
+    """
+    signal_func, warmup = STRATEGIES[strategy]
+    before = warmup(params)
+
+    # Small partitions (e.g. monthly files at 1D) cannot supply the warm-up rows
+    bars_per_day = periods_per_year(timeframe) / TRADING_DAYS_PER_YEAR
+    ddf = _merge_partitions(ddf, 2 * before, bars_per_day)
+
+    bars = ddf.resample(timeframe).agg(OHLCV_AGG).dropna()
+    meta = pd.DataFrame({'Close': pd.Series(dtype=np.float64), 'Signal': pd.Series(dtype=np.int64)},
+                        index=pd.DatetimeIndex([], name=INDEX_COLUMN))
+    signals = bars.map_overlap(signal_func, before, 0, meta=meta, **params)
+
+    metrics = StreamingMetrics()
+    started = False
+    parts = signals.to_delayed()
+    batch_size = batch_size or os.cpu_count() or 1
+    for i in range(0, len(parts), batch_size):
+        for chunk in dask.compute(*parts[i:i + batch_size]):
+            if not len(chunk):
+                continue
+            close = chunk['Close'].to_numpy(dtype=np.float64)
+            entries, exits = long_flat_positions(chunk['Signal'].to_numpy(), close, stop_loss_pct,
+                                                 start=0 if started else 1, entry_price=metrics.entry_price)
+            metrics.update(close, entries, exits)
+            started = True
+    return metrics.result(timeframe)
+
+
+if __name__ == "__main__":
+    ticker_map = TICKER_MAP
+
+    derivative = input("Choose a derivative (Nifty, BankNifty, FinNifty) or an option symbol: ").strip()
+    strategy = input("Choose a strategy (Moving Average Crossover, RSI): ").strip()
+    timeframe = input("Enter timeframe (e.g., 1Min, 5Min, 1h, 1D): ").strip()
+
+    if strategy in STRATEGIES:
+        if derivative in ticker_map:
+            ddf = read_ticker(ticker_map[derivative])
+        else:
+            ddf = read_option(derivative, 'bfo' if derivative.upper().startswith(('SENSEX', 'BANKEX')) else 'nfo')
+        for key, value in backtest_out_of_core(ddf, strategy, timeframe).items():
+            print(f"{key}: {value}")
+    else:
+        print("Invalid strategy selected.")
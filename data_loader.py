@@ -0,0 +1,154 @@
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from data_quality import read_stats
+from instrumentation import count, timed
+
+# Base data directory (task1 save_to_parquet layout: data/<ticker>/Year=YYYY/Month=M/*.parquet)
+BASE_DIR = "data"
+INDEX_COLUMN = "Date"
+
+_PARTITION_RE = re.compile(r"^(Year|Month)=(\d+)$")
+
+
+def _partition_value(name, key):
+    match = _PARTITION_RE.match(name)
+    if match and match.group(1) == key:
+        return int(match.group(2))
+    return None
+
+
+# List the (year, month, path) partitions of a ticker that overlap [start, end]
+def list_partitions(ticker, start_date=None, end_date=None, base_dir=BASE_DIR):
+    ticker_path = os.path.join(base_dir, ticker)
+    if not os.path.isdir(ticker_path):
+        return []
+
+    start = (start_date.year, start_date.month) if start_date is not None else None
+    end = (end_date.year, end_date.month) if end_date is not None else None
+
+    partitions = []
+    for year_dir in os.listdir(ticker_path):
+        year = _partition_value(year_dir, "Year")
+        if year is None:
+            continue
+        # Prune whole years before looking at their months
+        if (start and year < start[0]) or (end and year > end[0]):
+            continue
+        year_path = os.path.join(ticker_path, year_dir)
+        for month_dir in os.listdir(year_path):
+            month = _partition_value(month_dir, "Month")
+            if month is None:
+                continue
+            if (start and (year, month) < start) or (end and (year, month) > end):
+                continue
+            partitions.append((year, month, os.path.join(year_path, month_dir)))
+
+    partitions.sort()
+    return partitions
+
+
+def _timestamp_scalar(value, field_type):
+    # Match the stored timestamp type (unit and timezone) so the filter can be pushed down
+    value = pd.Timestamp(value)
+    tz = getattr(field_type, "tz", None)
+    if tz is not None and value.tz is None:
+        value = value.tz_localize(tz)
+    elif tz is None and value.tz is not None:
+        value = value.tz_localize(None)
+    return pa.scalar(value, type=field_type)
+
+
+def _comparable(value, like):
+    # value as a Timestamp comparable with `like` (an ISO timestamp from the stats sidecar)
+    like = pd.Timestamp(like)
+    if like.tz is not None and value.tz is None:
+        return value.tz_localize(like.tz)
+    if like.tz is None and value.tz is not None:
+        return value.tz_localize(None)
+    return value
+
+
+def _scan(ticker, start_date=None, end_date=None, columns=None, base_dir=BASE_DIR):
+    # read_table, plus whether the rows are known (from the stats sidecar) to be in timestamp order
+    start_date = pd.Timestamp(start_date) if start_date else None
+    end_date = pd.Timestamp(end_date) if end_date else None
+    stats = read_stats(ticker, base_dir)
+    ticker_path = os.path.join(base_dir, ticker)
+
+    files = []
+    # Rows need filtering unless the stats show every partition read lies inside [start_date, end_date]
+    needs_filter = False
+    in_order = True
+    previous_max = None
+    for _, _, month_path in list_partitions(ticker, start_date, end_date, base_dir):
+        entry = stats.get(os.path.relpath(month_path, ticker_path).replace(os.sep, "/"))
+        if entry is not None and entry['min'] is not None:
+            low, high = pd.Timestamp(entry['min']), pd.Timestamp(entry['max'])
+            # Skip partitions the stats show are outside the range (e.g. a month's tail before start_date)
+            if (start_date is not None and high < _comparable(start_date, high)) or \
+                    (end_date is not None and low > _comparable(end_date, low)):
+                continue
+            needs_filter |= (start_date is not None and low < _comparable(start_date, low)) or \
+                (end_date is not None and high > _comparable(end_date, high))
+            in_order &= entry['sorted'] and (previous_max is None or previous_max < low)
+            previous_max = high
+        else:
+            needs_filter |= start_date is not None or end_date is not None
+            in_order = False
+        files.extend(
+            os.path.join(month_path, file_name)
+            for file_name in sorted(os.listdir(month_path))
+            if file_name.endswith(".parquet")
+        )
+    if not files:
+        raise ValueError(f"No data found for ticker {ticker}")
+    count(bytes_read=sum(os.path.getsize(path) for path in files))
+
+    dataset = ds.dataset(files, format="parquet")
+    if columns is not None:
+        columns = [INDEX_COLUMN] + [c for c in columns if c != INDEX_COLUMN]
+
+    date_type = dataset.schema.field(INDEX_COLUMN).type
+    predicate = None
+    if needs_filter and start_date is not None:
+        predicate = ds.field(INDEX_COLUMN) >= _timestamp_scalar(start_date, date_type)
+    if needs_filter and end_date is not None:
+        upper = ds.field(INDEX_COLUMN) <= _timestamp_scalar(end_date, date_type)
+        predicate = upper if predicate is None else predicate & upper
+
+    return dataset.to_table(columns=columns, filter=predicate), in_order
+
+
+def read_table(ticker, start_date=None, end_date=None, columns=None, base_dir=BASE_DIR):
+    """
+    Scan a ticker's partitioned parquet data into an Arrow table (unsorted).
+
+    Year/Month partitions outside [start_date, end_date] are never opened, only
+    the requested columns are read, and the date range is pushed down to the
+    parquet reader for the boundary months. Where the data_quality stats
+    sidecar is up to date, partitions are pruned by their exact min/max
+    timestamps and no row filter is applied to partitions wholly in range.
+    """
+    return _scan(ticker, start_date, end_date, columns, base_dir)[0]
+
+
+@timed()
+def load_data(ticker, start_date=None, end_date=None, columns=None, base_dir=BASE_DIR):
+    """
+    Load a ticker's partitioned parquet data (see read_table).
+
+    Returns a frame indexed by a sorted DatetimeIndex named Date. The sort (and
+    the check for it) is skipped when the stats sidecar records every
+    partition read as sorted and non-overlapping.
+    """
+    table, in_order = _scan(ticker, start_date, end_date, columns, base_dir)
+    df = table.to_pandas()
+    df.set_index(INDEX_COLUMN, inplace=True)
+    if not in_order and not df.index.is_monotonic_increasing:
+        df.sort_index(inplace=True, kind="stable")
+    return df
@@ -0,0 +1,248 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from atomic_io import atomic_write
+
+# Per-ticker sidecar: data/<ticker>/_partition_stats.json, keyed by "Year=Y/Month=M"
+STATS_FILE = "_partition_stats.json"
+MARKET_TZ = "Asia/Kolkata"
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# NSE closes on these dates every year; moving holidays (Holi, Diwali, ...) come from a
+# CSV with one YYYY-MM-DD date per line at data/nse_holidays.csv (or pass holidays= explicitly)
+FIXED_HOLIDAYS = [(1, 26), (5, 1), (8, 15), (10, 2), (12, 25)]
+HOLIDAYS_FILE = os.path.join("data", "nse_holidays.csv")
+
+
+def load_holidays(holidays_file=HOLIDAYS_FILE):
+    if not os.path.exists(holidays_file):
+        return []
+    with open(holidays_file) as f:
+        return [pd.Timestamp(line.strip()) for line in f if line.strip() and not line.startswith('#')]
+
+
+def trading_days(start, end, holidays=None):
+    """NSE sessions between start and end (dates): weekdays minus the fixed and listed holidays."""
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    holidays = load_holidays() if holidays is None else list(holidays)
+    holidays += [pd.Timestamp(year, month, day) for year in range(start.year, end.year + 1)
+                 for month, day in FIXED_HOLIDAYS]
+    return pd.bdate_range(start, end, freq='C', holidays=holidays)
+
+
+def _local(index):
+    # Exchange-local naive timestamps, so dates line up with the trading calendar
+    index = pd.DatetimeIndex(index)
+    return index.tz_convert(MARKET_TZ).tz_localize(None) if index.tz is not None else index
+
+
+def validate_bars(df, holidays=None, drop_bad_prices=True):
+    """
+    Sort, dedup and check one ticker's OHLCV frame (DatetimeIndex) before it is stored.
+
+    Returns the repaired frame and a report of what was found: rows out of
+    order, duplicate timestamps (the last copy is kept), rows with NaN or
+    non-positive prices (dropped unless drop_bad_prices=False), bars whose
+    high/low don't bracket open/close, trading days with no bars
+    (missing_sessions), bars on non-trading days (extra_sessions) and, for
+    intraday data, gaps longer than the bar interval inside a session.
+    """
+    report = {'rows_in': len(df)}
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df = df.set_axis(pd.to_datetime(df.index))
+
+    stamps = df.index.asi8
+    report['out_of_order'] = int((np.diff(stamps) < 0).sum())
+    if report['out_of_order']:
+        df = df.sort_index(kind='stable')
+
+    duplicated = df.index.duplicated(keep='last')
+    report['duplicates'] = int(duplicated.sum())
+    if report['duplicates']:
+        df = df[~duplicated]
+
+    prices = df[[c for c in PRICE_COLUMNS if c in df.columns]].to_numpy(dtype=np.float64)
+    bad = np.isnan(prices).any(axis=1) | (prices <= 0).any(axis=1)
+    report['bad_prices'] = int(bad.sum())
+    if drop_bad_prices and report['bad_prices']:
+        df = df[~bad]
+    if all(c in df.columns for c in PRICE_COLUMNS):
+        high, low = df['High'].to_numpy(), df['Low'].to_numpy()
+        body_high = np.maximum(df['Open'].to_numpy(), df['Close'].to_numpy())
+        body_low = np.minimum(df['Open'].to_numpy(), df['Close'].to_numpy())
+        report['inconsistent_ranges'] = int(((high < body_high) | (low > body_low)).sum())
+
+    report.update(_gaps(df.index, holidays))
+    report['rows_out'] = len(df)
+    return df, report
+
+
+def _gaps(index, holidays=None):
+    local = _local(index)
+    if not len(local):
+        return {'missing_sessions': [], 'extra_sessions': [], 'intraday_gaps': 0}
+    days = local.normalize()
+    session_days = days.unique()
+    calendar = trading_days(session_days[0], session_days[-1], holidays)
+
+    gaps = {
+        'missing_sessions': [d.date().isoformat() for d in calendar.difference(session_days)],
+        'extra_sessions': [d.date().isoformat() for d in session_days.difference(calendar)],
+        'intraday_gaps': 0,
+    }
+    # Intraday bars: count steps longer than the usual bar interval within the same session
+    steps = np.diff(local.asi8)
+    same_day = days.asi8[1:] == days.asi8[:-1]
+    if same_day.any():
+        interval = np.median(steps[same_day])
+        gaps['intraday_gaps'] = int((steps[same_day] > interval).sum())
+    return gaps
+
+
+def summarize(report):
+    """One line naming the problems in a validate_bars report, or None if it is clean."""
+    problems = [f"{report[key]} {label}" for key, label in (
+        ('out_of_order', 'rows out of order'), ('duplicates', 'duplicate timestamps'),
+        ('bad_prices', 'rows with NaN/zero prices'), ('inconsistent_ranges', 'bars with inconsistent high/low'),
+        ('intraday_gaps', 'intraday gaps')) if report.get(key)]
+    for key, label in (('missing_sessions', 'missing sessions'), ('extra_sessions', 'non-trading-day sessions')):
+        if report.get(key):
+            problems.append(f"{len(report[key])} {label} ({', '.join(report[key][:5])}"
+                            f"{', ...' if len(report[key]) > 5 else ''})")
+    return "; ".join(problems) or None
+
+
+def _parquet_files(month_path):
+    return sorted(f for f in os.listdir(month_path) if f.endswith(".parquet"))
+
+
+def _file_signatures(month_path):
+    signatures = {}
+    for file_name in _parquet_files(month_path):
+        stat = os.stat(os.path.join(month_path, file_name))
+        signatures[file_name] = [stat.st_mtime_ns, stat.st_size]
+    return signatures
+
+
+def partition_stats(month_path, index_column="Date", holidays=None):
+    """
+    Min/max timestamp, row count and ordering of one Year/Month partition, reading only its Date column.
+
+    sorted is True when every file is in timestamp order with no duplicates
+    and the files (in name order) don't overlap, i.e. the partition can be
+    read without re-sorting.
+    """
+    dates = [pd.read_parquet(os.path.join(month_path, f), columns=[index_column])[index_column]
+             for f in _parquet_files(month_path)]
+    dates = [d for d in dates if len(d)]
+    stats = {'files': _file_signatures(month_path), 'rows': sum(len(d) for d in dates)}
+    if not dates:
+        return {**stats, 'min': None, 'max': None, 'sorted': True, 'missing_sessions': []}
+
+    in_order = all(d.is_monotonic_increasing and d.is_unique for d in dates)
+    in_order = in_order and all(a.iloc[-1] < b.iloc[0] for a, b in zip(dates, dates[1:]))
+    index = pd.DatetimeIndex(pd.concat(dates, ignore_index=True))
+    return {
+        **stats,
+        'min': index.min().isoformat(),
+        'max': index.max().isoformat(),
+        'sorted': bool(in_order),
+        'missing_sessions': _gaps(index, holidays)['missing_sessions'],
+    }
+
+
+def _stats_path(ticker, base_dir):
+    return os.path.join(base_dir, ticker, STATS_FILE)
+
+
+def _partition_key(month_path, ticker_path):
+    return os.path.relpath(month_path, ticker_path).replace(os.sep, "/")
+
+
+def read_stats(ticker, base_dir="data"):
+    """
+    The sidecar stats of a ticker, {"Year=Y/Month=M": stats}.
+
+    Partitions whose files changed since their stats were written are left
+    out, so callers fall back to reading them the slow way.
+    """
+    path = _stats_path(ticker, base_dir)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    ticker_path = os.path.join(base_dir, ticker)
+    fresh = {}
+    for key, entry in stats.items():
+        month_path = os.path.join(ticker_path, *key.split("/"))
+        if os.path.isdir(month_path) and _file_signatures(month_path) == entry.get('files'):
+            fresh[key] = entry
+    return fresh
+
+
+def write_stats(ticker, base_dir="data", holidays=None):
+    """(Re)compute the sidecar stats of every partition whose files changed and write the sidecar atomically."""
+    from data_loader import list_partitions
+
+    ticker_path = os.path.join(base_dir, ticker)
+    previous = read_stats(ticker, base_dir)
+    stats = {}
+    for _, _, month_path in list_partitions(ticker, base_dir=base_dir):
+        key = _partition_key(month_path, ticker_path)
+        stats[key] = previous.get(key) or partition_stats(month_path, holidays=holidays)
+
+    def write(path):
+        with open(path, "w") as f:
+            json.dump(stats, f, indent=2)
+
+    atomic_write(_stats_path(ticker, base_dir), write)
+    return stats
+
+
+def repair_ticker(ticker, base_dir="data", holidays=None):
+    """
+    Validate the stored partitions of a ticker, rewriting any that aren't sorted and deduplicated.
+
+    Partitions already recorded as sorted in the sidecar are skipped. Each
+    repaired partition is replaced by a single part-0000.parquet, atomically.
+    Returns {partition: validate_bars report} for the partitions rewritten.
+    """
+    from data_loader import INDEX_COLUMN, list_partitions
+
+    ticker_path = os.path.join(base_dir, ticker)
+    stats = read_stats(ticker, base_dir)
+    repaired = {}
+    for _, _, month_path in list_partitions(ticker, base_dir=base_dir):
+        key = _partition_key(month_path, ticker_path)
+        entry = stats.get(key) or partition_stats(month_path, holidays=holidays)
+        if entry['sorted']:
+            continue
+
+        old_files = [os.path.join(month_path, f) for f in _parquet_files(month_path)]
+        df = pd.concat([pd.read_parquet(f) for f in old_files]).set_index(INDEX_COLUMN)
+        df, report = validate_bars(df, holidays, drop_bad_prices=False)
+        part_path = os.path.join(month_path, "part-0000.parquet")
+        atomic_write(part_path, lambda path: df.reset_index().to_parquet(path, index=False))
+        for f in old_files:
+            if f != part_path:
+                os.remove(f)
+        logging.info(f"Repaired {ticker} {key}: {summarize(report) or 'sorted'}")
+        repaired[key] = report
+
+    write_stats(ticker, base_dir, holidays)
+    return repaired
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for ticker in sorted(os.listdir("data")):
+        if os.path.isdir(os.path.join("data", ticker)):
+            print(f"{ticker}: {len(repair_ticker(ticker))} partitions repaired")
@@ -0,0 +1,121 @@
+import gzip
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+
+from atomic_io import atomic_write
+from instrumentation import stage
+
+BASE_OUTPUT_DIR = "output"
+EXCEL_MAX_ROWS = 1_048_575  # Excel's sheet limit, less the header row
+CHUNK_ROWS = 256 * 1024
+# Arrow's gzip stream is fixed at level 9, several times slower than level 1 for ~10% smaller files
+GZIP_LEVEL = 1
+FORMATS = ("parquet", "csv")
+COMPRESSIONS = (None, "gzip", "zstd")
+_CSV_SUFFIX = {None: ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst"}
+
+
+def parse_format(spec):
+    """'parquet', 'csv', 'csv.gz', 'csv.zst', 'parquet.gzip', 'parquet.zstd'... -> (format, compression)."""
+    fmt, _, compression = (spec or "parquet").strip().lower().partition(".")
+    compression = {"": None, "gz": "gzip", "zst": "zstd"}.get(compression, compression)
+    if fmt not in FORMATS or compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown output format {spec!r}")
+    return fmt, compression
+
+
+def _slug(text):
+    return re.sub(r"[^0-9A-Za-z]+", "_", str(text)).strip("_").lower()
+
+
+def export_path(name, strategy, timeframe, fmt="parquet", compression=None, output_dir=BASE_OUTPUT_DIR):
+    """output/<name>_<strategy>_<timeframe>.parquet, or .csv/.csv.gz/.csv.zst for CSV."""
+    stem = "_".join(_slug(part) for part in (name, strategy, timeframe) if part)
+    return os.path.join(output_dir, stem + (".parquet" if fmt == "parquet" else _CSV_SUFFIX[compression]))
+
+
+def _chunks(df, chunk_rows):
+    # Arrow tables of at most chunk_rows rows, converted one at a time so memory stays bounded
+    if not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index()
+    schema = None
+    for start in range(0, max(len(df), 1), chunk_rows):
+        table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False)
+        schema = table.schema
+        yield table
+
+
+def write_frame(df, path, fmt="parquet", compression=None, chunk_rows=CHUNK_ROWS):
+    """
+    Write df (its index becomes the first column) to a parquet or CSV file, chunk by chunk.
+
+    Parquet gets one row group per chunk with the given codec (snappy by
+    default); CSV is written by Arrow's CSV writer through a gzip/zstd stream
+    when compression is set. The file is written with atomic_io.atomic_write,
+    so readers never see a partial export.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(tmp_path):
+        chunks = _chunks(df, chunk_rows)
+        first = next(chunks)
+        if fmt == "parquet":
+            with pq.ParquetWriter(tmp_path, first.schema, compression=compression or "snappy") as writer:
+                writer.write_table(first)
+                for table in chunks:
+                    writer.write_table(table)
+            return
+        if compression == "gzip":
+            sink = pa.PythonFile(gzip.open(tmp_path, "wb", compresslevel=GZIP_LEVEL), mode="w")
+        elif compression:
+            sink = pa.CompressedOutputStream(tmp_path, compression)
+        else:
+            sink = pa.OSFile(tmp_path, "wb")
+        with sink, pcsv.CSVWriter(sink, first.schema) as writer:
+            writer.write_table(first)
+            for table in chunks:
+                writer.write_table(table)
+
+    with stage("export", rows=len(df)):
+        atomic_write(path, write)
+    return path
+
+
+def _excel_engine():
+    # xlsxwriter streams rows in constant memory and is several times faster than openpyxl, the fallback
+    try:
+        import xlsxwriter  # noqa: F401
+        return "xlsxwriter", {"options": {"constant_memory": True}}
+    except ImportError:
+        return "openpyxl", {}
+
+
+def write_excel(sheets, path, max_rows=EXCEL_MAX_ROWS, index=True):
+    """
+    Write {sheet name: frame} to one workbook, one sheet per frame, skipping frames Excel can't hold.
+
+    Timezone-aware timestamps are written as naive local times (Excel has no
+    timezones). Returns the names of the sheets written; no file is created
+    when none fit.
+    """
+    fitting = {name: df for name, df in sheets.items() if len(df) <= max_rows}
+    for name in [name for name in sheets if name not in fitting]:
+        print(f"Skipping Excel sheet {name}: {len(sheets[name])} rows exceed the limit of {max_rows}")
+    if not fitting:
+        return []
+
+    engine, engine_kwargs = _excel_engine()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with stage("to_excel", rows=sum(len(df) for df in fitting.values())), \
+            pd.ExcelWriter(path, engine=engine, engine_kwargs=engine_kwargs) as writer:
+        for name, df in fitting.items():
+            if getattr(df.index, "tz", None) is not None:
+                df = df.tz_localize(None)
+            df.to_excel(writer, sheet_name=str(name)[:31], index=index)
+    return list(fitting)
+
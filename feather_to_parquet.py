@@ -0,0 +1,283 @@
+import calendar
+import logging
+import os
+import re
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+# Raw files from the Telegram scraper: telegram_data/{nfo,bfo}/year/month/*.feather
+DOWNLOAD_DIR = 'telegram_data'
+# Converted option chains: options_data/{nfo,bfo}/underlying=X/expiry=YYYY-MM-DD/date=YYYY-MM-DD/*.parquet
+OPTIONS_DIR = 'options_data'
+
+# Monthly contracts expire on the last Thursday (NSE) / Friday (BSE) of the month.
+# Exchange holidays that move an expiry a day earlier are not accounted for.
+EXPIRY_WEEKDAY = {'nfo': calendar.THURSDAY, 'bfo': calendar.FRIDAY}
+
+OUTPUT_SCHEMA = pa.schema([
+    ('timestamp', pa.timestamp('s')),
+    ('symbol', pa.string()),
+    ('strike', pa.float64()),
+    ('option_type', pa.string()),
+    ('open', pa.float64()),
+    ('high', pa.float64()),
+    ('low', pa.float64()),
+    ('close', pa.float64()),
+    ('volume', pa.int64()),
+    ('oi', pa.int64()),
+    ('underlying', pa.string()),
+    ('expiry', pa.date32()),
+    ('date', pa.date32()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('underlying', pa.string()), ('expiry', pa.date32()), ('date', pa.date32())]),
+    flavor='hive',
+)
+
+# Source column names seen in the raw files, mapped to the normalised name
+COLUMN_ALIASES = {
+    'symbol': ['symbol', 'ticker', 'tradingsymbol', 'instrument', 'name'],
+    'datetime': ['datetime', 'timestamp', 'date_time'],
+    'date': ['date'],
+    'time': ['time'],
+    'open': ['open'],
+    'high': ['high'],
+    'low': ['low'],
+    'close': ['close', 'ltp'],
+    'volume': ['volume', 'vol'],
+    'oi': ['oi', 'open_interest', 'openinterest'],
+    'strike': ['strike', 'strike_price', 'strikeprice'],
+    'option_type': ['option_type', 'optiontype', 'opt_type', 'right', 'type'],
+    'expiry': ['expiry', 'expiry_date', 'expirydate'],
+    'underlying': ['underlying', 'underlying_symbol'],
+}
+
+_MONTHS = {name.upper(): i for i, name in enumerate(calendar.month_abbr) if name}
+_WEEKLY_MONTH = {**{str(i): i for i in range(1, 10)}, 'O': 10, 'N': 11, 'D': 12}
+# NIFTY23DEC21000CE (monthly), NIFTY2312821000CE (weekly: YY, month 1-9/O/N/D, DD), NIFTY23DECFUT
+_MONTHLY_RE = re.compile(r'^([A-Z&-]+?)(\d{2})(' + '|'.join(_MONTHS) + r')(\d+(?:\.\d+)?)?(CE|PE|FUT)$')
+_WEEKLY_RE = re.compile(r'^([A-Z&-]+?)(\d{2})([1-9OND])(\d{2})(\d+(?:\.\d+)?)(CE|PE)$')
+
+
+def monthly_expiry(year, month, category):
+    weekday = EXPIRY_WEEKDAY[category]
+    last_day = calendar.monthrange(year, month)[1]
+    offset = (date(year, month, last_day).weekday() - weekday) % 7
+    return date(year, month, last_day - offset)
+
+
+def parse_symbol(symbol, category):
+    """Split an exchange trading symbol into (underlying, expiry, strike, option_type), or None."""
+    symbol = symbol.upper().replace('.NFO', '').replace('.BFO', '')
+    match = _WEEKLY_RE.match(symbol)
+    if match:
+        underlying, yy, month, day, strike, option_type = match.groups()
+        try:
+            expiry = date(2000 + int(yy), _WEEKLY_MONTH[month], int(day))
+        except ValueError:
+            expiry = None
+        if expiry is not None:
+            return underlying, expiry, float(strike), option_type
+    match = _MONTHLY_RE.match(symbol)
+    if match:
+        underlying, yy, month, strike, option_type = match.groups()
+        expiry = monthly_expiry(2000 + int(yy), _MONTHS[month], category)
+        return underlying, expiry, float(strike) if strike else None, option_type
+    return None
+
+
+def _find_column(names, key):
+    for alias in COLUMN_ALIASES[key]:
+        if alias in names:
+            return names[alias]
+    return None
+
+
+def _column(batch, names, key, type_):
+    name = _find_column(names, key)
+    if name is None:
+        return pa.nulls(batch.num_rows, type=type_)
+    return pc.cast(batch.column(name), type_, safe=False)
+
+
+def _timestamps(batch, names):
+    name = _find_column(names, 'datetime')
+    if name is not None:
+        column = batch.column(name)
+        if pa.types.is_timestamp(column.type) and column.type.tz is not None:
+            column = pc.local_timestamp(column)
+        return pc.cast(column, pa.timestamp('s'), safe=False)
+
+    day = batch.column(_find_column(names, 'date'))
+    time_name = _find_column(names, 'time')
+    if time_name is None:
+        return pc.cast(day, pa.timestamp('s'))
+    if pa.types.is_timestamp(day.type):
+        day = pc.cast(day, pa.date32())
+    day = pc.cast(day, pa.string())
+    time_ = pc.cast(batch.column(time_name), pa.string())
+    return pc.cast(pc.binary_join_element_wise(day, time_, ' '), pa.timestamp('s'))
+
+
+def _contract_columns(symbols, category):
+    # Parse each distinct symbol once and broadcast the parts back to the rows
+    uniques = pc.unique(symbols)
+    parsed = [parse_symbol(s, category) if s is not None else None for s in uniques.to_pylist()]
+    positions = pc.index_in(symbols, value_set=uniques)
+
+    def lookup(part, type_):
+        return pa.array([p[part] if p else None for p in parsed], type=type_).take(positions)
+
+    return (lookup(0, pa.string()), lookup(1, pa.date32()),
+            lookup(2, pa.float64()), lookup(3, pa.string()))
+
+
+def normalise_batch(batch, category):
+    """Map one raw record batch onto OUTPUT_SCHEMA, dropping rows whose contract cannot be identified."""
+    names = {name.lower().strip().replace(' ', '_'): name for name in batch.schema.names}
+    timestamps = _timestamps(batch, names)
+    symbols = _column(batch, names, 'symbol', pa.string())
+
+    underlying = _column(batch, names, 'underlying', pa.string())
+    expiry = _column(batch, names, 'expiry', pa.date32())
+    strike = _column(batch, names, 'strike', pa.float64())
+    option_type = pc.utf8_upper(_column(batch, names, 'option_type', pa.string()))
+    if underlying.null_count or expiry.null_count or option_type.null_count:
+        parsed = _contract_columns(symbols, category)
+        underlying = pc.coalesce(underlying, parsed[0])
+        expiry = pc.coalesce(expiry, parsed[1])
+        strike = pc.coalesce(strike, parsed[2])
+        option_type = pc.coalesce(option_type, parsed[3])
+
+    table = pa.RecordBatch.from_arrays([
+        timestamps,
+        symbols,
+        strike,
+        option_type,
+        _column(batch, names, 'open', pa.float64()),
+        _column(batch, names, 'high', pa.float64()),
+        _column(batch, names, 'low', pa.float64()),
+        _column(batch, names, 'close', pa.float64()),
+        _column(batch, names, 'volume', pa.int64()),
+        _column(batch, names, 'oi', pa.int64()),
+        underlying,
+        expiry,
+        pc.cast(timestamps, pa.date32()),
+    ], schema=OUTPUT_SCHEMA)
+
+    valid = pc.and_(pc.is_valid(underlying), pc.is_valid(expiry))
+    valid = pc.and_(valid, pc.is_valid(table.column('date')))
+    dropped = table.num_rows - pc.sum(pc.cast(valid, pa.int64())).as_py() if table.num_rows else 0
+    if dropped:
+        logging.warning(f"Dropped {dropped} rows without a recognisable contract")
+
+    # NaN/null or non-positive closes are feed errors, not prices
+    close = table.column('close')
+    priced = pc.fill_null(pc.and_(pc.greater(close, 0), pc.invert(pc.is_nan(close))), False)
+    bad = pc.sum(pc.cast(pc.and_(valid, pc.invert(priced)), pa.int64())).as_py() if table.num_rows else 0
+    if bad:
+        logging.warning(f"Dropped {bad} rows with a missing or non-positive close")
+    return table.filter(pc.and_(valid, priced))
+
+
+def iter_feather_batches(path):
+    """Yield the record batches of a feather (Arrow IPC) file from a memory map, one at a time."""
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+    except pa.ArrowInvalid:
+        # Feather v1 files are not IPC files; they have to be read whole
+        from pyarrow import feather
+        yield from feather.read_table(path).to_batches()
+        return
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i)
+
+
+def sort_and_dedup(table):
+    """
+    Order normalised option rows by (symbol, timestamp) and drop duplicate bars, keeping the last copy.
+
+    The option-chain counterpart of data_quality.validate_bars; returns the
+    table and a report of the rows found out of order and duplicated.
+    """
+    report = {'rows_in': table.num_rows, 'out_of_order': 0, 'duplicates': 0}
+    if table.num_rows < 2:
+        return table, report
+    # The sort is stable, so within a (symbol, timestamp) group the rows keep their file order
+    order = pc.sort_indices(table, sort_keys=[('symbol', 'ascending'), ('timestamp', 'ascending')])
+    head, tail = slice(0, table.num_rows - 1), slice(1, table.num_rows)
+    report['out_of_order'] = pc.sum(pc.cast(pc.less(order[tail], order[head]), pa.int64())).as_py()
+    table = table.take(order)
+
+    symbols, stamps = table.column('symbol'), table.column('timestamp')
+    # A row is a duplicate if the next one has the same contract and timestamp (nulls never match)
+    same = pc.and_(pc.equal(symbols[head], symbols[tail]), pc.equal(stamps[head], stamps[tail]))
+    duplicate = pa.concat_arrays([pc.fill_null(same, False).combine_chunks(), pa.array([False])])
+    report['duplicates'] = pc.sum(pc.cast(duplicate, pa.int64())).as_py()
+    if report['duplicates']:
+        table = table.filter(pc.invert(duplicate))
+    report['rows_out'] = table.num_rows
+    return table, report
+
+
+def convert_feather(path, category, output_dir=OPTIONS_DIR):
+    """
+    Convert one raw feather file into the partitioned options dataset for its category.
+
+    The file is read batch by batch from a memory map; its normalised rows
+    (one day's chain) are then sorted and deduplicated by sort_and_dedup
+    before they are partitioned.
+    """
+    batches = [normalise_batch(batch, category) for batch in iter_feather_batches(path)]
+    table, report = sort_and_dedup(pa.Table.from_batches(batches, schema=OUTPUT_SCHEMA))
+    if report['out_of_order'] or report['duplicates']:
+        logging.warning(f"{path}: {report['out_of_order']} rows out of order, "
+                        f"{report['duplicates']} duplicate bars dropped")
+    stem = os.path.splitext(os.path.basename(path))[0]
+    ds.write_dataset(
+        table,
+        os.path.join(output_dir, category),
+        schema=OUTPUT_SCHEMA,
+        format='parquet',
+        partitioning=PARTITIONING,
+        # Named after the source file, so converting it again replaces its output
+        basename_template=f'{stem}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    logging.info(f'Converted: {path}')
+
+
+def convert_all(download_dir=DOWNLOAD_DIR, output_dir=OPTIONS_DIR):
+    for category in EXPIRY_WEEKDAY:
+        category_dir = os.path.join(download_dir, category)
+        if not os.path.isdir(category_dir):
+            continue
+        for root, _, files in os.walk(category_dir):
+            for file_name in sorted(files):
+                if file_name.endswith('.feather'):
+                    convert_feather(os.path.join(root, file_name), category, output_dir)
+
+
+def options_dataset(category='nfo', output_dir=OPTIONS_DIR):
+    return ds.dataset(os.path.join(output_dir, category), format='parquet', partitioning=PARTITIONING)
+
+
+def read_expiry(underlying, expiry, category='nfo', columns=None, output_dir=OPTIONS_DIR):
+    """
+    Load one underlying's option chain for an expiry.
+
+    The underlying/expiry predicates match partition directories, so only the
+    files under underlying=<underlying>/expiry=<expiry>/ are opened.
+    """
+    expiry = pa.scalar(date.fromisoformat(str(expiry)[:10]), type=pa.date32())
+    predicate = (ds.field('underlying') == underlying) & (ds.field('expiry') == expiry)
+    return options_dataset(category, output_dir).to_table(columns=columns, filter=predicate).to_pandas()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    convert_all()
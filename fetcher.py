@@ -0,0 +1,217 @@
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from atomic_io import atomic_write
+from tickers import storage_name
+
+# Raw responses: cache/yfinance/<ticker>/<interval>/<chunk start>_<chunk end>.parquet
+CACHE_DIR = os.path.join("cache", "yfinance")
+MAX_WORKERS = 4
+RETRIES = 4
+BACKOFF_SECONDS = 1.0
+
+# Longest range Yahoo serves per request for each interval; requests are split into
+# chunks on a fixed grid of this span so that completed chunks hit the cache on re-runs
+# (only the first chunk starts off the grid, at the requested start)
+CHUNK_SPAN = {
+    '1m': pd.Timedelta(days=7),
+    '2m': pd.Timedelta(days=59),
+    '5m': pd.Timedelta(days=59),
+    '15m': pd.Timedelta(days=59),
+    '30m': pd.Timedelta(days=59),
+    '90m': pd.Timedelta(days=59),
+    '60m': pd.Timedelta(days=729),
+    '1h': pd.Timedelta(days=729),
+}
+DAILY_CHUNK_SPAN = pd.Timedelta(days=365)
+_GRID_ORIGIN = pd.Timestamp("2000-01-01")
+
+# Spacing of consecutive bars per interval, so an incremental fetch can start one bar after the stored max
+INTERVAL_STEP = {
+    '1m': pd.Timedelta(minutes=1),
+    '2m': pd.Timedelta(minutes=2),
+    '5m': pd.Timedelta(minutes=5),
+    '15m': pd.Timedelta(minutes=15),
+    '30m': pd.Timedelta(minutes=30),
+    '60m': pd.Timedelta(hours=1),
+    '90m': pd.Timedelta(minutes=90),
+    '1h': pd.Timedelta(hours=1),
+    '1d': pd.Timedelta(days=1),
+    '5d': pd.Timedelta(days=5),
+    '1wk': pd.Timedelta(weeks=1),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+}
+
+
+def yf_download(tickers, start, end, interval):
+    """Default download function: one (multi-symbol) yfinance request."""
+    import yfinance as yf
+
+    return yf.download(tickers, start=start, end=end, interval=interval, group_by='ticker',
+                       auto_adjust=False, progress=False, threads=False)
+
+
+def next_bar(timestamp, interval):
+    """Start of the bar after `timestamp` at `interval`: where an incremental fetch picks up."""
+    return pd.Timestamp(timestamp) + INTERVAL_STEP.get(interval, pd.Timedelta(days=1))
+
+
+def _naive(timestamp):
+    # Chunks are laid out in exchange-local wall-clock time
+    timestamp = pd.Timestamp(timestamp)
+    return timestamp.tz_localize(None) if timestamp.tz is not None else timestamp
+
+
+def chunk_ranges(start, end, interval):
+    """
+    Split [start, end) into (chunk_start, chunk_end) pairs no longer than Yahoo's limit.
+
+    The first chunk starts at `start` and runs to the next grid boundary; the
+    rest are grid-aligned, so an incremental fetch requests only what is new
+    while full-grid chunks still hit the cache.
+    """
+    start, end = _naive(start), _naive(end)
+    span = CHUNK_SPAN.get(interval, DAILY_CHUNK_SPAN)
+    chunk_start = start
+    chunk_end = _GRID_ORIGIN + ((start - _GRID_ORIGIN) // span + 1) * span
+    chunks = []
+    while chunk_start < end:
+        chunks.append((chunk_start, chunk_end))
+        chunk_start, chunk_end = chunk_end, chunk_end + span
+    return chunks
+
+
+def _cache_path(ticker, interval, chunk, cache_dir):
+    name = f"{chunk[0]:%Y%m%d%H%M}_{chunk[1]:%Y%m%d%H%M}.parquet"
+    return os.path.join(cache_dir, storage_name(ticker), interval, name)
+
+
+def _write_cached(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, df.to_parquet)
+
+
+def _split(data, ticker, tickers):
+    # One ticker's columns from a (possibly multi-symbol) download
+    if data is None or data.empty:
+        return pd.DataFrame()
+    if isinstance(data.columns, pd.MultiIndex):
+        for level in range(data.columns.nlevels):
+            if ticker in data.columns.get_level_values(level):
+                return data.xs(ticker, axis=1, level=level).dropna(how='all')
+        return pd.DataFrame()
+    return data.dropna(how='all') if len(tickers) == 1 else pd.DataFrame()
+
+
+def _clip(df, start, end):
+    if df.empty:
+        return df
+    tz = getattr(df.index, 'tz', None)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if tz is not None:
+        start = start.tz_localize(tz) if start.tz is None else start
+        end = end.tz_localize(tz) if end.tz is None else end
+    return df[(df.index >= start) & (df.index < end)]
+
+
+class EmptyDownload(Exception):
+    """A download that returned no rows (or only NaN rows): how yfinance reports rate limits and outages."""
+
+
+def _is_empty(data):
+    return data is None or data.empty or bool(data.isna().all(axis=None))
+
+
+def _with_retries(download, tickers, chunk, interval, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            data = download(tickers if len(tickers) > 1 else tickers[0], chunk[0], chunk[1], interval)
+            if _is_empty(data):
+                raise EmptyDownload("no data returned")
+            return data
+        except Exception as e:
+            if attempt == retries:
+                if isinstance(e, EmptyDownload):
+                    # Possibly a range with no trading; returned (but never cached) so the next run asks again
+                    logging.warning(f"Download of {tickers} {chunk[0]:%Y-%m-%d}..{chunk[1]:%Y-%m-%d} "
+                                    f"returned no data after {retries + 1} attempts")
+                    return pd.DataFrame()
+                raise
+            # Exponential backoff with jitter, so parallel chunks don't retry in lockstep
+            delay = backoff * 2 ** attempt * (1 + random.random())
+            logging.warning(f"Download of {tickers} {chunk[0]:%Y-%m-%d}..{chunk[1]:%Y-%m-%d} failed ({e}), "
+                            f"retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def fetch_history(tickers, start, end=None, interval='1d', download=None, max_workers=MAX_WORKERS,
+                  retries=RETRIES, backoff=BACKOFF_SECONDS, cache_dir=CACHE_DIR):
+    """
+    Download [start, end) of every ticker at `interval`.
+
+    `start` is a date or a {ticker: date} mapping; for an incremental fetch
+    pass next_bar(stored max, interval). The range is cut into chunks
+    within Yahoo's per-request limit. Tickers missing the same chunk share one
+    multi-symbol request, and requests run on a thread pool of max_workers,
+    each retried with exponential backoff; an empty or all-NaN response counts
+    as a failure and is retried too. Completed chunks (ending before today)
+    that returned data are cached on disk by (ticker, interval, chunk), so
+    re-runs only download what is new or came back empty.
+
+    `download(tickers, start, end, interval)` defaults to yfinance; pass a
+    stub to run offline. Returns {ticker: DataFrame or None if a request for
+    it failed after all retries}.
+    """
+    download = download or yf_download
+    end = _naive(end) if end is not None else pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+    starts = {ticker: _naive(start[ticker] if isinstance(start, dict) else start) for ticker in tickers}
+    today = pd.Timestamp.now().normalize()
+
+    pieces = {ticker: [] for ticker in tickers}
+    failed = set()
+    missing = {}  # chunk -> tickers that need it downloaded
+    for ticker in tickers:
+        for chunk in chunk_ranges(starts[ticker], end, interval):
+            path = _cache_path(ticker, interval, chunk, cache_dir)
+            if os.path.exists(path):
+                pieces[ticker].append(pd.read_parquet(path))
+            else:
+                missing.setdefault(chunk, []).append(ticker)
+
+    def run(chunk):
+        return _with_retries(download, missing[chunk], chunk, interval, retries, backoff)
+
+    chunks = sorted(missing)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(run, chunk) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"Error fetching data for {', '.join(missing[chunk])}: {e}")
+                failed.update(missing[chunk])
+                continue
+            for ticker in missing[chunk]:
+                df = _split(data, ticker, missing[chunk])
+                # An empty piece may be a failure in disguise, so only chunks with data are cached
+                if chunk[1] <= today and not df.empty:
+                    _write_cached(df, _cache_path(ticker, interval, chunk, cache_dir))
+                pieces[ticker].append(df)
+
+    results = {}
+    for ticker in tickers:
+        frames = [df for df in pieces[ticker] if not df.empty]
+        if ticker in failed:
+            results[ticker] = None
+        elif not frames:
+            results[ticker] = pd.DataFrame()
+        else:
+            df = pd.concat(frames).sort_index()
+            results[ticker] = _clip(df[~df.index.duplicated(keep='last')], starts[ticker], end)
+    return results
@@ -0,0 +1,250 @@
+import math
+
+import numpy as np
+
+# Batch forms take a pandas Series of closes and return Series (or a tuple of them).
+# Streaming forms keep their state in fixed-size ring buffers; update(bar) costs O(1)
+# and returns the indicator value after that bar (NaN during warm-up). Missing (NaN)
+# closes are handled as the batch forms handle them.
+
+
+def sma(close, window):
+    return close.rolling(window=window).mean()
+
+
+def ema(close, span):
+    return close.ewm(span=span, adjust=False).mean()
+
+
+def rolling_std(close, window):
+    return close.rolling(window=window).std()
+
+
+def bollinger_bands(close, window=20, num_std=2):
+    """Return (middle, upper, lower) bands, computing the rolling std only once."""
+    middle = sma(close, window)
+    width = rolling_std(close, window) * num_std
+    return middle, middle + width, middle - width
+
+
+def rsi(close, period=14, wilder=True):
+    """
+    Relative Strength Index.
+
+    wilder=True smooths gains/losses with alpha = 1/period; wilder=False uses
+    simple rolling means, as the task2/task3 strategies do.
+    """
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    if wilder:
+        avg_gain = gain.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+        avg_loss = loss.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    else:
+        avg_gain = gain.rolling(window=period).mean()
+        avg_loss = loss.rolling(window=period).mean()
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def _price(bar):
+    # Bars may be plain closes or mappings/Series with a 'Close' field
+    if isinstance(bar, (int, float, np.floating, np.integer)):
+        return float(bar)
+    return float(bar['Close'])
+
+
+class RingBuffer:
+    """Fixed-size window of the most recent values."""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = np.zeros(size)
+        self.count = 0
+        self._pos = 0
+
+    @property
+    def full(self):
+        return self.count >= self.size
+
+    def push(self, value):
+        """Store value and return the one it evicts (0.0 while the buffer is filling)."""
+        evicted = self.values[self._pos] if self.full else 0.0
+        self.values[self._pos] = value
+        self._pos = (self._pos + 1) % self.size
+        self.count += 1
+        return evicted
+
+
+class StreamingSMA:
+    """Like rolling(window).mean(): NaN while any close in the window is missing."""
+
+    def __init__(self, window):
+        self.window = window
+        self._buffer = RingBuffer(window)
+        self._sum = 0.0
+        self._nans = 0
+        self.value = math.nan
+
+    def update(self, bar):
+        price = _price(bar)
+        evicted = self._buffer.push(price)
+        # The sum runs over the present closes only; missing ones are counted instead
+        self._nans += math.isnan(price) - math.isnan(evicted)
+        self._sum += (0.0 if math.isnan(price) else price) - (0.0 if math.isnan(evicted) else evicted)
+        # Re-sum once per lap of the buffer so rounding drift cannot accumulate
+        if self._buffer.count % self.window == 0:
+            self._sum = float(np.nansum(self._buffer.values))
+        self.value = self._sum / self.window if self._buffer.full and not self._nans else math.nan
+        return self.value
+
+
+class StreamingEMA:
+    """
+    Matches ewm(span=span, adjust=False): seeded with the first bar.
+
+    A missing close holds the value and decays its weight, so the next close
+    counts for more, as pandas does with ignore_na=False.
+    """
+
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self._weight = 1.0
+        self.value = math.nan
+
+    def update(self, bar):
+        price = _price(bar)
+        if math.isnan(price):
+            if not math.isnan(self.value):
+                self._weight *= 1 - self.alpha
+            return self.value
+        if math.isnan(self.value):
+            self.value = price
+        else:
+            weight = self._weight * (1 - self.alpha)
+            self.value = (weight * self.value + self.alpha * price) / (weight + self.alpha)
+        self._weight = 1.0
+        return self.value
+
+
+class StreamingStd:
+    """
+    Rolling sample standard deviation (ddof=1) with its rolling mean, via a sliding Welford update.
+
+    Both are NaN while any close in the window is missing, as with rolling().
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._buffer = RingBuffer(window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._nans = 0
+        self._same = 0
+        self._last = math.nan
+        self.mean = math.nan
+        self.value = math.nan
+
+    def _rederive(self):
+        values = self._buffer.values[:self._buffer.count]
+        self._mean = float(values.mean())
+        self._m2 = float(((values - self._mean) ** 2).sum())
+
+    def update(self, bar):
+        price = _price(bar)
+        self._same = self._same + 1 if price == self._last else 1
+        self._last = price
+
+        filling = not self._buffer.full
+        evicted = self._buffer.push(price)
+        stale = self._nans > 0
+        self._nans += math.isnan(price) - math.isnan(evicted)
+        if self._nans:
+            # The moments are not kept up while a close in the window is missing...
+            self.mean = self.value = math.nan
+            return self.value
+        if stale:
+            # ...and are re-derived once the last one leaves it
+            self._rederive()
+        elif filling:
+            delta = price - self._mean
+            self._mean += delta / self._buffer.count
+            self._m2 += delta * (price - self._mean)
+        else:
+            old_mean = self._mean
+            self._mean += (price - evicted) / self.window
+            self._m2 += (price - evicted) * (price - self._mean + evicted - old_mean)
+
+        # Re-derive the moments once per lap of the buffer so rounding drift cannot accumulate
+        if self._buffer.count % self.window == 0:
+            self._rederive()
+
+        if not self._buffer.full:
+            return self.value
+        self.mean = self._mean
+        # A window of identical prices has exactly zero spread (pandas does the same)
+        if self._same >= self.window:
+            self.value = 0.0
+        else:
+            self.value = math.sqrt(max(self._m2, 0.0) / (self.window - 1))
+        return self.value
+
+
+class StreamingBollinger:
+    def __init__(self, window=20, num_std=2):
+        self.num_std = num_std
+        self._std = StreamingStd(window)
+        self.value = (math.nan, math.nan, math.nan)
+
+    def update(self, bar):
+        """Return (middle, upper, lower) after this bar."""
+        std = self._std.update(bar)
+        middle = self._std.mean
+        width = std * self.num_std
+        self.value = (middle, middle + width, middle - width)
+        return self.value
+
+
+class StreamingRSI:
+    """Streaming form of rsi(); the first bar counts as a zero gain/loss, as in the batch form."""
+
+    def __init__(self, period=14, wilder=True):
+        self.period = period
+        self.wilder = wilder
+        self._prev = math.nan
+        self._count = 0
+        if wilder:
+            self._avg_gain = math.nan
+            self._avg_loss = math.nan
+        else:
+            self._gains = StreamingSMA(period)
+            self._losses = StreamingSMA(period)
+        self.value = math.nan
+
+    def update(self, bar):
+        price = _price(bar)
+        delta = price - self._prev
+        self._prev = price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self._count += 1
+
+        if self.wilder:
+            alpha = 1 / self.period
+            if self._count == 1:
+                self._avg_gain, self._avg_loss = gain, loss
+            else:
+                self._avg_gain = alpha * gain + (1 - alpha) * self._avg_gain
+                self._avg_loss = alpha * loss + (1 - alpha) * self._avg_loss
+            if self._count < self.period:
+                return self.value
+            avg_gain, avg_loss = self._avg_gain, self._avg_loss
+        else:
+            avg_gain = self._gains.update(gain)
+            avg_loss = self._losses.update(loss)
+
+        if avg_loss == 0:
+            self.value = math.nan if avg_gain == 0 else 100.0
+        else:
+            self.value = 100 - (100 / (1 + avg_gain / avg_loss))
+        return self.value
@@ -0,0 +1,259 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stages only record while a run is active; outside one, stage() and @timed cost a global lookup
+_run = None
+# How often the run's sampler thread reads the current RSS into the open stages' peaks
+RSS_SAMPLE_INTERVAL_S = 0.01
+
+
+def _rss_bytes():
+    """Current resident set size, or None where it can't be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_bytes():
+    # Process high-water mark: ru_maxrss is KiB on Linux, bytes on macOS
+    if resource is None:
+        return _rss_bytes() or 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Stage:
+    """Totals for one stage path (e.g. 'backtest/resample'), summed over all its calls in a run."""
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.rows = 0
+        self.bytes_read = 0
+        self.rss_growth = 0
+        self.peak_rss = 0  # Highest RSS sampled while the stage was open, not the process high-water mark
+
+    def as_dict(self):
+        return {
+            'stage': self.path,
+            'calls': self.calls,
+            'wall_s': round(self.wall_s, 6),
+            'cpu_s': round(self.cpu_s, 6),
+            'rows': self.rows,
+            'bytes_read': self.bytes_read,
+            'rows_per_s': round(self.rows / self.wall_s) if self.rows and self.wall_s else None,
+            'rss_growth_mb': round(self.rss_growth / 1024 ** 2, 3),
+            'peak_rss_mb': round(self.peak_rss / 1024 ** 2, 3) if self.peak_rss else None,
+        }
+
+
+class Run:
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.now()
+        self.stages = {}
+        self.stack = []
+        self.open_records = []  # Stage records currently open, innermost last
+        self.profile = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def sample_rss(self):
+        # Raise the peak of every open stage to the current RSS
+        rss = _rss_bytes()
+        if rss is not None:
+            for record in list(self.open_records):
+                record.peak_rss = max(record.peak_rss, rss)
+
+    def start_sampler(self, interval=RSS_SAMPLE_INTERVAL_S):
+        # RSS is sampled in the background so a stage's peak covers allocations freed before it exits
+        if _rss_bytes() is None:
+            return
+
+        def sample():
+            while not self._stop.wait(interval):
+                self.sample_rss()
+        self._sampler = threading.Thread(target=sample, name=f"rss-sampler-{self.name}", daemon=True)
+        self._sampler.start()
+
+    def stop_sampler(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def report(self):
+        return {
+            'run': self.name,
+            'started': self.started.isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            # Process high-water mark (ru_maxrss), including anything before the run started
+            'peak_rss_mb': round(_peak_rss_bytes() / 1024 ** 2, 3),
+            'stages': [stage.as_dict() for stage in self.stages.values()],
+            'profile': self.profile,
+        }
+
+
+@contextmanager
+def stage(name, rows=None, bytes_read=None):
+    """
+    Time a block as a stage of the active run, nested under any enclosing stage.
+
+    Records wall and CPU time, RSS growth and the stage's peak RSS: the
+    highest RSS sampled while it was open (at entry, at exit and every
+    RSS_SAMPLE_INTERVAL_S in between). rows/bytes_read can be given here or
+    added from inside with count().
+    """
+    run = _run
+    if run is None:
+        yield None
+        return
+
+    path = "/".join([*run.stack, name])
+    record = run.stages.setdefault(path, Stage(path))
+    run.stack.append(name)
+    run.open_records.append(record)
+    rss_before = _rss_bytes()
+    if rss_before is not None:
+        record.peak_rss = max(record.peak_rss, rss_before)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall_s += time.perf_counter() - wall
+        record.cpu_s += time.process_time() - cpu
+        record.calls += 1
+        record.rows += rows or 0
+        record.bytes_read += bytes_read or 0
+        rss_after = _rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            record.rss_growth = max(record.rss_growth, rss_after - rss_before)
+        run.sample_rss()
+        run.open_records.remove(record)
+        run.stack.pop()
+
+
+def count(rows=0, bytes_read=0):
+    """Add rows/bytes to the innermost active stage (no-op outside a run)."""
+    run = _run
+    if run is None or not run.stack:
+        return
+    record = run.stages["/".join(run.stack)]
+    record.rows += rows
+    record.bytes_read += bytes_read
+
+
+def timed(name=None):
+    """Decorator form of stage(); rows are taken from the result's length when it has a shape."""
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _run is None:
+                return func(*args, **kwargs)
+            with stage(stage_name) as record:
+                result = func(*args, **kwargs)
+                shape = getattr(result, 'shape', None)
+                if shape:
+                    record.rows += shape[0]
+                return result
+        return wrapper
+    return decorate
+
+
+def _profile_summary(profiler, limit=25):
+    # Top functions by cumulative time, for the JSON report
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (file_name, line, func), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({'function': f"{os.path.basename(file_name)}:{line}({func})", 'calls': calls,
+                     'total_s': round(total, 6), 'cumulative_s': round(cumulative, 6)})
+    rows.sort(key=lambda row: row['cumulative_s'], reverse=True)
+    return rows[:limit]
+
+
+@contextmanager
+def instrumented_run(name, report_path=None, profile=None, summary=True):
+    """
+    Collect stage timings for everything inside the block.
+
+    profile='cprofile' or 'pyinstrument' also captures a profile of the whole
+    run: cProfile's top functions go into the report and its stats next to
+    report_path (.prof); pyinstrument's text output is written next to it
+    (.txt). At exit the JSON report is written to report_path (if given) and a
+    summary table is printed (if summary).
+    """
+    global _run
+    run = Run(name)
+    previous, _run = _run, run
+
+    profiler = None
+    if profile == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif profile == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+    elif profile is not None:
+        raise ValueError(f"Unknown profiler: {profile}")
+
+    run.start_sampler()
+    try:
+        with stage(name):
+            yield run
+    finally:
+        run.stop_sampler()
+        _run = previous
+        base = os.path.splitext(report_path)[0] if report_path else f"{name}-{run.started:%Y%m%d-%H%M%S}"
+        if profile == 'cprofile':
+            profiler.disable()
+            profiler.dump_stats(f"{base}.prof")
+            run.profile = {'type': 'cprofile', 'stats_file': f"{base}.prof", 'top': _profile_summary(profiler)}
+        elif profile == 'pyinstrument':
+            profiler.stop()
+            with open(f"{base}.txt", "w") as f:
+                f.write(profiler.output_text())
+            run.profile = {'type': 'pyinstrument', 'output_file': f"{base}.txt"}
+
+        report = run.report()
+        if report_path:
+            os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+            with open(report_path, "w") as f:
+                json.dump(report, f, indent=2)
+        if summary:
+            print(format_summary(report), file=sys.stderr)
+
+
+def format_summary(report):
+    """The stages of a report as a fixed-width table, slowest first."""
+    header = f"{'stage':<48} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'rows':>11} {'MB read':>9} {'peak RSS MB':>12}"
+    lines = [f"Run {report['run']} (peak RSS {report['peak_rss_mb']:.1f} MB)", header, "-" * len(header)]
+    for row in sorted(report['stages'], key=lambda row: row['wall_s'], reverse=True):
+        lines.append(f"{row['stage'][:48]:<48} {row['calls']:>6} {row['wall_s']:>9.3f} {row['cpu_s']:>9.3f} "
+                     f"{row['rows']:>11} {row['bytes_read'] / 1024 ** 2:>9.1f} "
+                     f"{row['peak_rss_mb'] if row['peak_rss_mb'] is not None else float('nan'):>12.1f}")
+    return "\n".join(lines)
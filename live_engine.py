@@ -0,0 +1,140 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from data_loader import load_data
+from indicators import StreamingRSI, StreamingSMA
+from positions import LongFlatState
+from tickers import TICKER_MAP
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+@dataclass
+class SignalEvent:
+    strategy: str
+    timestamp: object
+    action: str  # 'entry' or 'exit'
+    price: float
+    latency_us: float
+
+
+class MovingAverageCrossoverLive:
+    """Streaming form of task3 moving_average_crossover."""
+
+    name = "Moving Average Crossover"
+
+    def __init__(self, short_window=20, long_window=50, stop_loss_pct=0.02):
+        self._short = StreamingSMA(short_window)
+        self._long = StreamingSMA(long_window)
+        self.state = LongFlatState(stop_loss_pct)
+
+    def on_bar(self, bar):
+        short = self._short.update(bar)
+        long = self._long.update(bar)
+        signal = 1 if short > long else -1
+        return self.state.step(signal, bar['Close'])
+
+
+class RSILive:
+    """Streaming form of task3 rsi_strategy."""
+
+    name = "RSI"
+
+    def __init__(self, rsi_period=14, rsi_oversold=30, rsi_overbought=70, stop_loss_pct=0.02):
+        self._rsi = StreamingRSI(rsi_period, wilder=False)
+        self.rsi_oversold = rsi_oversold
+        self.rsi_overbought = rsi_overbought
+        self.state = LongFlatState(stop_loss_pct)
+
+    def on_bar(self, bar):
+        value = self._rsi.update(bar)
+        signal = 0
+        if value < self.rsi_oversold:
+            signal = 1  # Buy signal
+        if value > self.rsi_overbought:
+            signal = -1  # Sell signal
+        return self.state.step(signal, bar['Close'])
+
+
+async def replay_parquet(ticker, start_date=None, end_date=None, speed=0.0, timeframe=None):
+    """
+    Replay stored bars as a live feed.
+
+    speed is a multiple of real time (60 plays one minute of bars per second);
+    0 replays as fast as the consumer can take them. Waits are capped at the
+    median bar interval, so overnight, weekend and holiday gaps pass like one
+    ordinary bar instead of stalling the replay.
+    """
+    df = load_data(ticker, start_date, end_date, columns=OHLCV_COLUMNS)
+    if timeframe is not None:
+        from task4 import resample_ohlcv
+        df = resample_ohlcv(df, timeframe)
+
+    timestamps = df.index
+    values = df.to_numpy()
+    max_wait = np.median(np.diff(timestamps.asi8)) / 1e9 if len(timestamps) > 1 else 0.0
+    previous = None
+    for i, timestamp in enumerate(timestamps):
+        if speed and previous is not None:
+            await asyncio.sleep(min((timestamp - previous).total_seconds(), max_wait) / speed)
+        elif i % 1000 == 0:
+            await asyncio.sleep(0)  # Let other tasks run during a fast replay
+        previous = timestamp
+        bar = dict(zip(OHLCV_COLUMNS, values[i]))
+        bar['Date'] = timestamp
+        yield bar
+
+
+async def run_live(feed, strategies, on_signal=None):
+    """
+    Drive each strategy bar by bar from an async bar feed.
+
+    Every entry/exit becomes a SignalEvent passed to on_signal (if given), with
+    the time from receiving the bar to producing that strategy's decision.
+    Returns per-strategy latency statistics in microseconds.
+    """
+    latencies = {strategy.name: [] for strategy in strategies}
+    async for bar in feed:
+        for strategy in strategies:
+            started = time.perf_counter_ns()
+            action = strategy.on_bar(bar)
+            latency_us = (time.perf_counter_ns() - started) / 1000
+            latencies[strategy.name].append(latency_us)
+            if action and on_signal is not None:
+                event = SignalEvent(strategy.name, bar['Date'], action, bar['Close'], latency_us)
+                result = on_signal(event)
+                if asyncio.iscoroutine(result):
+                    await result
+
+    stats = {}
+    for name, values in latencies.items():
+        values = np.asarray(values)
+        if not len(values):
+            stats[name] = {'bars': 0}
+            continue
+        stats[name] = {
+            'bars': len(values),
+            'mean_us': float(values.mean()),
+            'p50_us': float(np.percentile(values, 50)),
+            'p99_us': float(np.percentile(values, 99)),
+            'max_us': float(values.max()),
+        }
+    return stats
+
+
+if __name__ == "__main__":
+    ticker_map = TICKER_MAP
+
+    derivative = input("Choose a derivative (Nifty, BankNifty, FinNifty): ").strip()
+    speed = float(input("Replay speed (multiple of real time, 0 = as fast as possible): ").strip() or 0)
+
+    if derivative in ticker_map:
+        feed = replay_parquet(ticker_map[derivative], speed=speed)
+        stats = asyncio.run(run_live(feed, [MovingAverageCrossoverLive(), RSILive()], on_signal=print))
+        for name, values in stats.items():
+            print(f"{name}: {values}")
+    else:
+        print("Invalid derivative selected.")
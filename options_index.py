@@ -0,0 +1,317 @@
+import bisect
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from atomic_io import atomic_write
+from feather_to_parquet import OPTIONS_DIR, OUTPUT_SCHEMA
+from instrumentation import count
+
+# Sidecar per category: options_data/<category>/_contract_index.parquet (the leading underscore keeps
+# it out of options_dataset scans). One row per (contract, file, row group) holding that contract.
+INDEX_FILE = '_contract_index.parquet'
+KEY_COLUMNS = ['underlying', 'expiry', 'strike', 'option_type']
+ROW_GROUP_ROWS = 64 * 1024
+OPTION_TYPES = ('CE', 'PE')
+_INDEX_SCHEMA = pa.schema([
+    ('underlying', pa.string()),
+    ('expiry', pa.date32()),
+    ('strike', pa.float64()),
+    ('option_type', pa.string()),
+    ('file', pa.string()),  # Relative to the category directory
+    ('row_group', pa.int32()),
+    ('first_timestamp', pa.timestamp('s')),
+    ('last_timestamp', pa.timestamp('s')),
+    ('rows', pa.int64()),
+    ('mtime_ns', pa.int64()),  # Of the file when it was indexed, to re-index only changed files
+    ('size', pa.int64()),
+])
+_DATA_COLUMNS = [name for name in OUTPUT_SCHEMA.names if name not in ('underlying', 'expiry', 'date')]
+
+
+def _partition_values(relative_path):
+    # underlying=NIFTY/expiry=2023-12-28/date=2023-12-01/x.parquet -> {'underlying': 'NIFTY', ...}
+    parts = dict(part.split('=', 1) for part in relative_path.split(os.sep)[:-1] if '=' in part)
+    return parts['underlying'], date.fromisoformat(parts['expiry'])
+
+
+def _data_files(category_dir):
+    for root, _, file_names in os.walk(category_dir):
+        for file_name in sorted(file_names):
+            if file_name.endswith('.parquet') and not file_name.startswith(('_', '.')):
+                yield os.path.relpath(os.path.join(root, file_name), category_dir)
+
+
+def _index_file(category_dir, relative_path):
+    # One pass over the key columns of each row group; the price columns are never read
+    path = os.path.join(category_dir, relative_path)
+    stat = os.stat(path)
+    underlying, expiry = _partition_values(relative_path)
+    parquet_file = pq.ParquetFile(path)
+    groups = []
+    for row_group in range(parquet_file.num_row_groups):
+        table = parquet_file.read_row_group(row_group, columns=['timestamp', 'strike', 'option_type'])
+        table = table.filter(pc.is_in(table['option_type'], value_set=pa.array(OPTION_TYPES)))
+        if not table.num_rows:
+            continue
+        summary = table.group_by(['strike', 'option_type']).aggregate(
+            [('timestamp', 'min'), ('timestamp', 'max'), ('timestamp', 'count')]).to_pandas()
+        summary = summary.rename(columns={'timestamp_min': 'first_timestamp', 'timestamp_max': 'last_timestamp',
+                                          'timestamp_count': 'rows'})
+        summary['row_group'] = row_group
+        groups.append(summary)
+    if not groups:
+        return pd.DataFrame(columns=_INDEX_SCHEMA.names)
+    entries = pd.concat(groups, ignore_index=True)
+    entries['underlying'] = underlying
+    entries['expiry'] = expiry
+    entries['file'] = relative_path
+    entries['mtime_ns'] = stat.st_mtime_ns
+    entries['size'] = stat.st_size
+    return entries[_INDEX_SCHEMA.names]
+
+
+def build_index(category='nfo', output_dir=OPTIONS_DIR, cluster=False):
+    """
+    Create or refresh the contract index of a category and return it as a DataFrame sorted by KEY_COLUMNS.
+
+    Only files added or rewritten since the last build are read (and only
+    their key columns); entries of deleted files are dropped. With
+    cluster=True, files are first rewritten sorted by contract (see
+    cluster_file), so each contract's rows sit in one or two row groups and
+    queries read just those.
+    """
+    category_dir = os.path.join(output_dir, category)
+    index_path = os.path.join(category_dir, INDEX_FILE)
+    previous = pd.read_parquet(index_path) if os.path.exists(index_path) else pd.DataFrame(columns=_INDEX_SCHEMA.names)
+    indexed = previous.drop_duplicates('file').set_index('file')[['mtime_ns', 'size']].to_dict('index')
+
+    keep, fresh = [], []
+    for relative_path in _data_files(category_dir):
+        if cluster:
+            cluster_file(os.path.join(category_dir, relative_path))
+        stat = os.stat(os.path.join(category_dir, relative_path))
+        if indexed.get(relative_path) == {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}:
+            keep.append(relative_path)
+        else:
+            entries = _index_file(category_dir, relative_path)
+            if not entries.empty:
+                fresh.append(entries)
+
+    if not fresh and len(keep) == len(indexed):
+        return previous
+    kept = previous[previous['file'].isin(keep)]
+    entries = pd.concat([kept, *fresh] if len(kept) else fresh, ignore_index=True) if fresh else kept
+    entries = entries.sort_values(KEY_COLUMNS + ['file', 'row_group'], ignore_index=True)
+
+    table = pa.Table.from_pandas(entries, schema=_INDEX_SCHEMA, preserve_index=False)
+    atomic_write(index_path, lambda path: pq.write_table(table, path))
+    return table.to_pandas()
+
+
+def cluster_file(path, row_group_size=ROW_GROUP_ROWS):
+    """Rewrite one dataset file sorted by (strike, option_type, timestamp) in small row groups, unless it already is."""
+    metadata = pq.read_metadata(path)
+    if metadata.metadata and metadata.metadata.get(b'clustered') == b'1':
+        return
+    table = pq.read_table(path, partitioning=None)
+    table = table.sort_by([('strike', 'ascending'), ('option_type', 'ascending'), ('timestamp', 'ascending')])
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'clustered': b'1'})
+    atomic_write(path, lambda tmp_path: pq.write_table(table, tmp_path, row_group_size=row_group_size))
+
+
+def expiry_calendar(entries):
+    """
+    Expiries per underlying from an index: one row per (underlying, expiry).
+
+    kind is 'monthly' for the last expiry of a calendar month traded for that
+    underlying and 'weekly' for the others, so exchange holiday shifts need no
+    special handling.
+    """
+    columns = ['underlying', 'expiry', 'kind', 'strikes', 'first_timestamp', 'last_timestamp']
+    if entries.empty:
+        return pd.DataFrame(columns=columns)
+    calendar = entries.groupby(['underlying', 'expiry'], sort=True).agg(
+        strikes=('strike', 'nunique'), first_timestamp=('first_timestamp', 'min'),
+        last_timestamp=('last_timestamp', 'max')).reset_index()
+    month = pd.to_datetime(calendar['expiry']).dt.to_period('M')
+    last_in_month = calendar.groupby([calendar['underlying'], month])['expiry'].transform('max')
+    calendar['kind'] = np.where(calendar['expiry'] == last_in_month, 'monthly', 'weekly')
+    return calendar[columns]
+
+
+class OptionsIndex:
+    """
+    Query the feather_to_parquet options dataset through its contract index.
+
+    Contracts are located by binary search over the sorted index keys and
+    only the matching row groups of the matching files are read.
+    """
+
+    def __init__(self, entries, category='nfo', output_dir=OPTIONS_DIR):
+        self.entries = entries.reset_index(drop=True)
+        self.category_dir = os.path.join(output_dir, category)
+        self.calendar = expiry_calendar(self.entries)
+        self._keys = list(zip(*(self.entries[column].tolist() for column in KEY_COLUMNS)))
+        self._expiries = {underlying: group['expiry'].tolist()
+                          for underlying, group in self.calendar.groupby('underlying', sort=False)}
+
+    @classmethod
+    def load(cls, category='nfo', output_dir=OPTIONS_DIR, cluster=False):
+        """Refresh the index (cheap when nothing changed) and open it."""
+        return cls(build_index(category, output_dir, cluster), category, output_dir)
+
+    def _span(self, *prefix):
+        # [lo, hi) of the index rows whose key starts with prefix; tuples compare element-wise,
+        # so a shorter prefix sorts before every key it starts and (prefix, +inf) after them
+        return bisect.bisect_left(self._keys, prefix), bisect.bisect_left(self._keys, (*prefix, np.inf))
+
+    def expiries(self, underlying, kind=None):
+        calendar = self.calendar[self.calendar['underlying'] == underlying]
+        if kind is not None:
+            calendar = calendar[calendar['kind'] == kind]
+        return calendar['expiry'].tolist()
+
+    def nearest_expiry(self, underlying, on_date):
+        """First expiry of the underlying on or after on_date, or None."""
+        expiries = self._expiries.get(underlying, [])
+        i = bisect.bisect_left(expiries, pd.Timestamp(on_date).date())
+        return expiries[i] if i < len(expiries) else None
+
+    def strikes(self, underlying, expiry, option_type=None):
+        """Sorted strikes listed for an expiry."""
+        lo, hi = self._span(underlying, pd.Timestamp(expiry).date())
+        block = self.entries.iloc[lo:hi]
+        if option_type is not None:
+            block = block[block['option_type'] == option_type]
+        return np.unique(block['strike'].to_numpy())
+
+    def _read(self, rows, start, end, columns):
+        # Read the row groups named by index rows, keeping only their contracts and [start, end]
+        if start is not None:
+            rows = rows[rows['last_timestamp'] >= start]
+        if end is not None:
+            rows = rows[rows['first_timestamp'] <= end]
+        columns = list(columns or _DATA_COLUMNS)
+        read_columns = list(dict.fromkeys(['timestamp', 'strike', 'option_type', *columns]))
+
+        frames = []
+        for (file_name, underlying, expiry), group in rows.groupby(['file', 'underlying', 'expiry'], sort=False):
+            path = os.path.join(self.category_dir, file_name)
+            table = pq.ParquetFile(path).read_row_groups(sorted(set(group['row_group'])), columns=read_columns)
+            count(rows=table.num_rows, bytes_read=table.nbytes)
+            wanted = pa.table({'strike': group['strike'].to_numpy(), 'option_type': group['option_type'].to_numpy()})
+            table = table.join(wanted.group_by(['strike', 'option_type']).aggregate([]), ['strike', 'option_type'],
+                               join_type='left semi')
+            if start is not None:
+                table = table.filter(pc.greater_equal(table['timestamp'], pa.scalar(start, pa.timestamp('s'))))
+            if end is not None:
+                table = table.filter(pc.less_equal(table['timestamp'], pa.scalar(end, pa.timestamp('s'))))
+            df = table.to_pandas()
+            df['underlying'] = underlying
+            df['expiry'] = expiry
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(columns=['underlying', 'expiry', *read_columns])
+        df = pd.concat(frames, ignore_index=True)
+        df = df.sort_values(['timestamp', 'strike', 'option_type'], ignore_index=True)
+        return df[['underlying', 'expiry', *read_columns]]
+
+    def chain(self, underlying, expiry, start=None, end=None, strikes=None, option_type=None, columns=None):
+        """
+        Bars of every strike (or the given strikes) of one expiry between start and end.
+
+        `option_type` is 'CE', 'PE' or None for both; `columns` limits the price
+        columns read (timestamp, strike and option_type are always returned).
+        """
+        lo, hi = self._span(underlying, pd.Timestamp(expiry).date())
+        rows = self.entries.iloc[lo:hi]
+        if strikes is not None:
+            rows = rows[rows['strike'].isin(np.atleast_1d(strikes))]
+        if option_type is not None:
+            rows = rows[rows['option_type'] == option_type]
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        return self._read(rows, start, end, columns)
+
+    def atm_series(self, underlying, spot, start=None, end=None, option_type=None, columns=None):
+        """
+        Continuous nearest-expiry at-the-money series between start and end.
+
+        Each day trades the first expiry on or after it, rolling to the next
+        expiry the day after one expires. `spot` is a fixed price or a Series
+        of underlying prices indexed by timestamp; with a Series every option
+        bar is matched to the strike nearest the latest spot price at or
+        before it. An 'atm_strike' column is added to the result.
+        """
+        expiries = self._expiries.get(underlying, [])
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp(self.calendar['first_timestamp'].min())
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp(self.calendar['last_timestamp'].max())
+        if isinstance(spot, pd.Series):
+            spot = spot.sort_index()
+
+        frames = []
+        first = bisect.bisect_left(expiries, start.date())
+        last = bisect.bisect_left(expiries, end.date())
+        previous = None
+        for expiry in expiries[first:last + 1]:
+            # This expiry is the front contract from the day after the previous one until its own day
+            segment_start = max(start, pd.Timestamp(previous) + pd.Timedelta(days=1)) if previous else start
+            segment_end = min(end, pd.Timestamp(expiry) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+            previous = expiry
+            strikes = self.strikes(underlying, expiry, option_type)
+            if not len(strikes) or segment_start > segment_end:
+                continue
+
+            if isinstance(spot, pd.Series):
+                # Prices in the segment plus the one prevailing at its start
+                prices = pd.concat([spot[spot.index < segment_start].tail(1),
+                                    spot[(spot.index >= segment_start) & (spot.index <= segment_end)]])
+                if prices.empty:
+                    continue
+                levels = pd.DataFrame({'timestamp': prices.index.astype('datetime64[ns]'),
+                                       'atm_strike': _nearest(strikes, prices.to_numpy(dtype=np.float64))})
+                df = self.chain(underlying, expiry, segment_start, segment_end, levels['atm_strike'].unique(),
+                                option_type, columns)
+                if df.empty:
+                    continue
+                df['timestamp'] = df['timestamp'].astype('datetime64[ns]')
+                df = pd.merge_asof(df, levels, on='timestamp')
+                df = df[df['strike'] == df['atm_strike']]
+            else:
+                atm_strike = _nearest(strikes, np.array([spot]))[0]
+                df = self.chain(underlying, expiry, segment_start, segment_end, atm_strike, option_type, columns)
+                if df.empty:
+                    continue
+                df['atm_strike'] = atm_strike
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+
+def _nearest(sorted_values, targets):
+    # Element of sorted_values closest to each target (the lower one on ties)
+    i = np.searchsorted(sorted_values, targets).clip(1, max(len(sorted_values) - 1, 1))
+    lower, upper = sorted_values[i - 1], sorted_values[np.minimum(i, len(sorted_values) - 1)]
+    return np.where(targets - lower <= upper - targets, lower, upper)
+
+
+if __name__ == "__main__":
+    underlying = input("Underlying (e.g. NIFTY, BANKNIFTY): ").strip().upper()
+    index = OptionsIndex.load()
+    print(index.calendar[index.calendar['underlying'] == underlying].to_string(index=False))
+
+    expiry = input("Expiry (YYYY-MM-DD, blank = nearest ATM series): ").strip()
+    if expiry:
+        print(index.chain(underlying, expiry))
+    else:
+        spot = float(input("Spot price: ").strip())
+        print(index.atm_series(underlying, spot))
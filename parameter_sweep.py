@@ -0,0 +1,142 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from backtest_core import METRIC_COLUMNS, compute_metrics
+from positions import long_flat_positions
+from task4 import resample_ohlcv
+
+# Memory a batch's signal matrices may take. Each combo column costs about
+# BYTES_PER_BAR per bar (float64 indicator gathers plus int64 signals)
+BATCH_MEMORY_BYTES = 256 * 1024 ** 2
+BYTES_PER_BAR = 32
+MAX_BATCH_SIZE = 256
+
+
+def rolling_means(values, windows):
+    """
+    Rolling means of `values` for every window, from a single cumulative sum.
+
+    Returns an (n_bars, n_windows) matrix with NaN during each window's warm-up
+    and wherever a window contains a NaN value, matching pandas
+    rolling(window).mean() up to floating point rounding.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    valid = ~np.isnan(values)
+    # NaNs are summed as 0 and counted separately, so one missing value only affects the windows holding it
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    count = np.concatenate(([0], np.cumsum(valid)))
+    means = np.full((n, len(windows)), np.nan)
+    for j, window in enumerate(windows):
+        if window <= n:
+            full = (count[window:] - count[:-window]) == window
+            means[window - 1:, j] = np.where(full, (csum[window:] - csum[:-window]) / window, np.nan)
+    return means
+
+
+def rsi_matrix(close, periods):
+    """task3 RSI (simple rolling averages of gains and losses) for every period, as an (n_bars, n_periods) matrix."""
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = rolling_means(gain, periods) / rolling_means(loss, periods)
+        return 100 - (100 / (1 + rs))
+
+
+def mac_signal_builder(means, column):
+    """build_signals for Moving Average Crossover combos, from a rolling_means matrix and its {window: column} map."""
+    def build_signals(batch):
+        short = means[:, [column[s] for s, _ in batch]]
+        long = means[:, [column[l] for _, l in batch]]
+        return np.where(short > long, 1, -1)
+    return build_signals
+
+
+def rsi_signal_builder(rsi, column):
+    """build_signals for RSI combos, from an rsi_matrix and its {period: column} map."""
+    def build_signals(batch):
+        values = rsi[:, [column[p] for p, _, _ in batch]]
+        oversold = np.array([lo for _, lo, _ in batch])
+        overbought = np.array([hi for _, _, hi in batch])
+        signals = np.where(values < oversold, 1, 0)
+        return np.where(values > overbought, -1, signals)
+    return build_signals
+
+
+def batch_size_for(n_bars, memory_bytes=BATCH_MEMORY_BYTES):
+    """Combos per batch so a batch's (n_bars x batch) signal matrices fit in memory_bytes."""
+    return int(max(1, min(MAX_BATCH_SIZE, memory_bytes // max(n_bars * BYTES_PER_BAR, 1))))
+
+
+def run_batches(close, combos, stop_loss_pcts, build_signals, param_names, timeframe, batch_size=None):
+    # Each signal column is shared by every stop-loss level; only the position engine reruns
+    batch_size = batch_size or batch_size_for(len(close))
+    rows = []
+    for start in range(0, len(combos), batch_size):
+        batch = combos[start:start + batch_size]
+        signals = build_signals(batch)
+        for j, combo in enumerate(batch):
+            column = np.ascontiguousarray(signals[:, j])
+            for stop_loss_pct in stop_loss_pcts:
+                entries, exits = long_flat_positions(column, close, stop_loss_pct)
+                metrics = compute_metrics(close, entries, exits, timeframe)
+                rows.append((*combo, stop_loss_pct, *(metrics[name] for name in METRIC_COLUMNS)))
+    return pd.DataFrame(rows, columns=param_names + ['stop_loss_pct'] + METRIC_COLUMNS)
+
+
+def rank_results(results, rank_by, ascending):
+    return results.sort_values(rank_by, ascending=ascending, na_position='last', kind='stable').reset_index(drop=True)
+
+
+def sweep_moving_average_crossover(df, short_windows, long_windows, stop_loss_pcts=(0.02,), timeframe=None,
+                                   rank_by='Sharpe Ratio', ascending=False, batch_size=None):
+    """
+    Evaluate every (short_window, long_window, stop_loss_pct) combo of the task3 Moving Average Crossover.
+
+    Rolling means are computed once per distinct window and each batch of
+    window pairs becomes one 2-D signal matrix; every column then goes through
+    the position engine and the backtest_core metrics. Pairs with
+    short_window >= long_window are skipped. batch_size defaults to what fits
+    in BATCH_MEMORY_BYTES for the length of df. Returns the ranked results table.
+    """
+    if timeframe is not None:
+        df = resample_ohlcv(df, timeframe)
+    close = df['Close'].to_numpy(dtype=np.float64)
+
+    combos = [(s, l) for s, l in itertools.product(short_windows, long_windows) if s < l]
+    windows = sorted({w for combo in combos for w in combo})
+    column = {w: j for j, w in enumerate(windows)}
+    build_signals = mac_signal_builder(rolling_means(close, windows), column)
+
+    results = run_batches(close, combos, stop_loss_pcts, build_signals, ['short_window', 'long_window'],
+                          timeframe, batch_size)
+    return rank_results(results, rank_by, ascending)
+
+
+def sweep_rsi(df, rsi_periods, oversold_levels=(30,), overbought_levels=(70,), stop_loss_pcts=(0.02,),
+              timeframe=None, rank_by='Sharpe Ratio', ascending=False, batch_size=None):
+    """
+    Evaluate every (rsi_period, rsi_oversold, rsi_overbought, stop_loss_pct) combo of the task3 RSI strategy.
+
+    The RSI is computed once per distinct period; thresholds are applied to
+    the RSI matrix column-wise for each batch. Combos with
+    oversold >= overbought are skipped. batch_size defaults as in
+    sweep_moving_average_crossover. Returns the ranked results table.
+    """
+    if timeframe is not None:
+        df = resample_ohlcv(df, timeframe)
+    close = df['Close'].to_numpy(dtype=np.float64)
+
+    combos = [(p, lo, hi) for p, lo, hi in itertools.product(rsi_periods, oversold_levels, overbought_levels)
+              if lo < hi]
+    periods = sorted({p for p, _, _ in combos})
+    column = {p: j for j, p in enumerate(periods)}
+    build_signals = rsi_signal_builder(rsi_matrix(close, periods), column)
+
+    results = run_batches(close, combos, stop_loss_pcts, build_signals,
+                          ['rsi_period', 'rsi_oversold', 'rsi_overbought'], timeframe, batch_size)
+    return rank_results(results, rank_by, ascending)
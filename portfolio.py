@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from backtest_core import METRIC_COLUMNS, compute_metrics, periods_per_year
+from data_loader import load_data
+from indicators import rsi, sma
+from positions import long_flat_positions
+from tickers import TICKERS
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+@dataclass
+class PortfolioResult:
+    equity: pd.DataFrame  # One column per symbol plus 'Portfolio', starting from 1.0
+    metrics: pd.DataFrame  # One row per symbol plus 'Portfolio'
+    weights: pd.Series
+
+
+def load_price_matrix(tickers=TICKERS, timeframe='1D', start_date=None, end_date=None, how='inner'):
+    """
+    Closes of every ticker at `timeframe` as one (bars x tickers) frame on a shared DatetimeIndex.
+
+    Each ticker is loaded and resampled once (through the resample cache when
+    the full history is requested). how='inner' keeps bars where every ticker
+    traded; how='outer' keeps all bars and carries each close forward over the
+    other tickers' extra bars.
+    """
+    from task4 import resample_ohlcv
+
+    closes = {}
+    for ticker in tickers:
+        if start_date is None and end_date is None:
+            from resample_cache import get_resampled
+            bars = get_resampled(ticker, timeframe)
+        else:
+            bars = resample_ohlcv(load_data(ticker, start_date, end_date, columns=OHLCV_COLUMNS), timeframe)
+        closes[ticker] = bars['Close']
+
+    matrix = pd.concat(closes, axis=1, join=how).sort_index()
+    if how == 'outer':
+        matrix = matrix.ffill().dropna()
+    return matrix.astype(np.float64)
+
+
+def mac_signals(close, short_window=20, long_window=50):
+    """task3 Moving Average Crossover signals for every column of a close matrix."""
+    return np.where(sma(close, short_window) > sma(close, long_window), 1, -1)
+
+
+def rsi_signals(close, rsi_period=14, rsi_oversold=30, rsi_overbought=70):
+    """task3 RSI signals for every column of a close matrix."""
+    values = rsi(close, rsi_period, wilder=False).to_numpy()
+    signal = np.where(values < rsi_oversold, 1, 0)
+    return np.where(values > rsi_overbought, -1, signal)
+
+
+STRATEGIES = {
+    "Moving Average Crossover": mac_signals,
+    "RSI": rsi_signals,
+}
+
+
+def held_matrix(n, trades):
+    """(n x k) 0/1 matrix of bars held (from the bar after each entry through its exit) from per-column trades."""
+    held = np.zeros((n + 1, len(trades)))
+    for j, (entries, exits) in enumerate(trades):
+        if len(entries) > len(exits):
+            exits = np.append(exits, n - 1)  # Open trade marked to the last bar
+        np.add.at(held[:, j], entries + 1, 1)
+        np.add.at(held[:, j], exits + 1, -1)
+    return np.cumsum(held[:n], axis=0)
+
+
+def backtest_portfolio(close, strategy, weights=None, stop_loss_pct=0.02, timeframe=None, **params):
+    """
+    Run a strategy over every column of a close matrix and combine the symbols into one portfolio.
+
+    Indicators, signals, returns and equity curves are computed on the whole
+    matrix at once; only the stop-loss position engine runs per column. Each
+    symbol gets a sleeve of `weights` (default equal, normalised to sum to 1),
+    so the combined equity is the weighted sum of the per-symbol curves.
+    """
+    symbols = list(close.columns)
+    weights = pd.Series(1.0, index=symbols) if weights is None else pd.Series(weights, dtype=np.float64)
+    weights = weights.reindex(symbols).fillna(0.0)
+    weights /= weights.sum()
+
+    values = close.to_numpy(dtype=np.float64)
+    n = len(values)
+    signals = STRATEGIES[strategy](close, **params)
+    trades = [long_flat_positions(np.ascontiguousarray(signals[:, j]), values[:, j], stop_loss_pct)
+              for j in range(len(symbols))]
+
+    returns = np.zeros_like(values)
+    returns[1:] = values[1:] / values[:-1] - 1
+    equity = np.cumprod(1 + returns * held_matrix(n, trades), axis=0)
+    combined = equity @ weights.to_numpy()
+
+    metrics = {symbol: compute_metrics(values[:, j], *trades[j], timeframe) for j, symbol in enumerate(symbols)}
+    metrics['Portfolio'] = _portfolio_metrics(combined, metrics, weights, timeframe)
+
+    equity_df = pd.DataFrame(equity, index=close.index, columns=symbols)
+    equity_df['Portfolio'] = combined
+    return PortfolioResult(equity_df, pd.DataFrame(metrics).T[METRIC_COLUMNS], weights)
+
+
+def _portfolio_metrics(combined, metrics, weights, timeframe):
+    # Curve-based metrics from the combined equity; trade counts summed and activity weighted across sleeves
+    returns = combined[1:] / combined[:-1] - 1
+    peak = np.maximum.accumulate(np.concatenate(([1.0], combined)))[1:]
+    sharpe = np.nan
+    if len(returns) > 1 and returns.std(ddof=1) > 0:
+        sharpe = returns.mean() / returns.std(ddof=1)
+        if timeframe is not None:
+            sharpe *= np.sqrt(periods_per_year(timeframe))
+
+    trades = sum(m['Number of Trades'] for m in metrics.values())
+    wins = sum(m['Number of Trades'] * np.nan_to_num(m['Win Rate']) / 100 for m in metrics.values())
+    return {
+        'Number of Trades': trades,
+        'Total Profit/Loss': combined[-1] - 1 if len(combined) else 0.0,
+        'Win Rate': wins / trades * 100 if trades else np.nan,
+        'Sharpe Ratio': sharpe,
+        'Maximum Drawdown': (1 - combined / peak).max() if len(combined) else 0.0,
+        'Exposure': sum(weights[s] * m['Exposure'] for s, m in metrics.items()),
+        'Turnover': sum(weights[s] * m['Turnover'] for s, m in metrics.items()),
+    }
+
+
+if __name__ == "__main__":
+    strategy = input("Choose a strategy (Moving Average Crossover, RSI): ").strip()
+    timeframe = input("Enter timeframe (e.g., 5Min, 1h, 1D): ").strip() or '1D'
+    weights = input("Weights for Nifty, BankNifty, FinNifty (e.g. 0.5,0.3,0.2; blank = equal): ").strip()
+
+    if strategy in STRATEGIES:
+        weights = dict(zip(TICKERS, map(float, weights.split(',')))) if weights else None
+        result = backtest_portfolio(load_price_matrix(TICKERS, timeframe), strategy, weights, timeframe=timeframe)
+        print(result.metrics.to_string())
+        print(result.equity.tail())
+    else:
+        print("Invalid strategy selected.")
@@ -0,0 +1,105 @@
+import numpy as np
+
+from instrumentation import timed
+
+
+# Index of the next bar at or after each position where `mask` is True (len(mask) when there is none)
+def _next_true(mask):
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+def long_flat_positions(signal, close, stop_loss_pct, start=1, entry_price=None):
+    """
+    Long/flat position engine with stop-loss, shared by the task3 strategies.
+
+    Enter long on the first bar with signal == 1 while flat. Exit on the first
+    later bar with signal == -1, or earlier if the close falls below
+    entry_price * (1 - stop_loss_pct). No re-entry on the exit bar.
+
+    Bars are walked trade by trade rather than row by row: the next buy/sell bar
+    for every position is precomputed, and the stop-loss scan only covers the
+    bars between an entry and its crossover exit.
+
+    Returns (entries, exits) as integer index arrays. A position still open at
+    the last bar has no matching exit.
+
+    To continue across chunks of one series, pass start=0 and, if a position
+    was open at the end of the previous chunk, its entry_price: the series then
+    starts long and the first element of exits (if any) closes that position.
+    """
+    signal = np.asarray(signal)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(signal)
+
+    next_buy = _next_true(signal == 1)
+    next_sell = _next_true(signal == -1)
+
+    def find_exit(first, entry_price):
+        # Crossover exit bounds the stop-loss search window
+        sell = next_sell[first] if first < n else n
+        window = close[first:sell]
+        stopped = np.flatnonzero(window < entry_price * (1 - stop_loss_pct))
+        return first + stopped[0] if len(stopped) else sell
+
+    entries = []
+    exits = []
+    i = next_buy[start] if start < n else n
+    if entry_price is not None:
+        exit_idx = find_exit(start, entry_price)
+        if exit_idx < n:
+            exits.append(exit_idx)
+        i = next_buy[exit_idx + 1] if exit_idx + 1 < n else n
+
+    while i < n:
+        entries.append(i)
+        exit_idx = find_exit(i + 1, close[i])
+        if exit_idx >= n:
+            break
+        exits.append(exit_idx)
+
+        i = next_buy[exit_idx + 1] if exit_idx + 1 < n else n
+
+    return np.asarray(entries, dtype=np.int64), np.asarray(exits, dtype=np.int64)
+
+
+@timed('positions')
+def apply_positions(df, stop_loss_pct):
+    """Write the engine's entries/exits into the Entry_Price/Exit_Price columns of df."""
+    close = df['Close'].to_numpy()
+    entries, exits = long_flat_positions(df['Signal'].to_numpy(), close, stop_loss_pct)
+
+    entry_col = df.columns.get_loc('Entry_Price')
+    exit_col = df.columns.get_loc('Exit_Price')
+    df.iloc[entries, entry_col] = close[entries]
+    df.iloc[exits, exit_col] = close[exits]
+    return df
+
+
+class LongFlatState:
+    """
+    Bar-by-bar form of long_flat_positions for live trading.
+
+    step(signal, close) returns 'entry', 'exit' or None. Like the batch engine,
+    the first bar only primes the state and never trades.
+    """
+
+    def __init__(self, stop_loss_pct):
+        self.stop_loss_pct = stop_loss_pct
+        self.position = None
+        self.entry_price = None
+        self._bars = 0
+
+    def step(self, signal, close):
+        self._bars += 1
+        if self._bars == 1:
+            return None
+        if signal == 1 and self.position != 'long':
+            self.position = 'long'
+            self.entry_price = close
+            return 'entry'
+        if self.position == 'long' and (signal == -1 or close < self.entry_price * (1 - self.stop_loss_pct)):
+            self.position = None
+            return 'exit'
+        return None
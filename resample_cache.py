@@ -0,0 +1,130 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from atomic_io import atomic_write
+from data_loader import BASE_DIR, load_data
+
+# Resampled bars: cache/resample/<ticker>/<timeframe>-<source version>.parquet, or
+# <timeframe>.<dtype>-<source version>.parquet when built from prices narrower than float64 (e.g. float32 Bars)
+CACHE_DIR = os.path.join("cache", "resample")
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Each timeframe can be built from the finer one below it (OHLCV aggregation composes)
+PARENT_TIMEFRAME = {
+    'min': None,
+    '5min': 'min',
+    '15min': '5min',
+    'h': '5min',
+    'D': 'h',
+    'W-SUN': 'D',
+    'ME': 'D',
+}
+
+
+def canonical_timeframe(timeframe):
+    """Normalise aliases ('1Min', '1T', '1H', '1h') to one cache key ('min', 'h', ...)."""
+    return to_offset(timeframe).freqstr
+
+
+def source_version(ticker, base_dir=BASE_DIR):
+    """Fingerprint of a ticker's parquet files (path, size, mtime); changes whenever the data is rewritten."""
+    digest = hashlib.sha1()
+    ticker_path = os.path.join(base_dir, ticker)
+    for root, dirs, files in os.walk(ticker_path):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.endswith(".parquet"):
+                stat = os.stat(os.path.join(root, file_name))
+                digest.update(f"{os.path.relpath(os.path.join(root, file_name), ticker_path)}"
+                              f":{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _price_dtype(df):
+    # Precision of the prices a source frame carries; the cache keeps one entry chain per precision
+    dtypes = [df[col].dtype for col in PRICE_COLUMNS if col in df.columns]
+    return np.result_type(*dtypes) if dtypes else np.dtype(np.float64)
+
+
+def _cache_path(ticker, timeframe, version, cache_dir, dtype=np.float64):
+    key = timeframe if np.dtype(dtype) == np.float64 else f"{timeframe}.{np.dtype(dtype).name}"
+    return os.path.join(cache_dir, ticker, f"{key}-{version}.parquet")
+
+
+def _read_cached(path):
+    os.utime(path)  # Mark as recently used for LRU eviction
+    return pd.read_parquet(path)
+
+
+def _write_cached(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, df.to_parquet)
+
+    # Older versions of the same timeframe can never be hit again
+    prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+    for file_name in os.listdir(os.path.dirname(path)):
+        old_path = os.path.join(os.path.dirname(path), file_name)
+        if file_name.startswith(prefix) and file_name.endswith(".parquet") and old_path != path:
+            os.remove(old_path)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Delete least recently used cache files until the cache fits in max_bytes."""
+    entries = []
+    for root, _, files in os.walk(cache_dir):
+        for file_name in files:
+            if file_name.endswith(".parquet"):
+                path = os.path.join(root, file_name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+def get_resampled(ticker, timeframe, source=None, base_dir=BASE_DIR, cache_dir=CACHE_DIR,
+                  max_bytes=MAX_CACHE_BYTES):
+    """
+    OHLCV bars of a ticker's full history at `timeframe`, cached on disk.
+
+    On a miss the bars are built from the nearest finer timeframe already in
+    the cache (1h from 5min, 1D from 1h, ...), falling back to the raw data:
+    `source` if given (it must be the ticker's full history), else load_data.
+    Entries are keyed by the source data version, so rewritten data is never
+    served stale, and by the price dtype of `source`: bars built from float32
+    prices are cached apart from (and never served to) float64 callers.
+    """
+    from task4 import resample_ohlcv
+
+    timeframe = canonical_timeframe(timeframe)
+    version = source_version(ticker, base_dir)
+    dtype = _price_dtype(source) if source is not None else np.dtype(np.float64)
+    path = _cache_path(ticker, timeframe, version, cache_dir, dtype)
+    if os.path.exists(path):
+        return _read_cached(path)
+
+    parent = PARENT_TIMEFRAME.get(timeframe)
+    while parent is not None and not os.path.exists(_cache_path(ticker, parent, version, cache_dir, dtype)):
+        parent = PARENT_TIMEFRAME.get(parent)
+
+    if parent is not None:
+        finer = _read_cached(_cache_path(ticker, parent, version, cache_dir, dtype))
+    elif source is not None:
+        finer = source
+    else:
+        finer = load_data(ticker, columns=OHLCV_COLUMNS, base_dir=base_dir)
+
+    resampled = resample_ohlcv(finer, timeframe)
+    _write_cached(resampled, path)
+    evict(cache_dir, max_bytes)
+    return resampled
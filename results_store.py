@@ -0,0 +1,142 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from atomic_io import atomic_write
+from backtest_core import METRIC_COLUMNS
+from export import EXCEL_MAX_ROWS, write_excel
+
+# Backtest runs: results/runs/run_date=YYYY-MM-DD/<batch id>.parquet (append-only, one file per write)
+# Signal series: results/signals/run_id=<run id>/signals.parquet
+RESULTS_DIR = "results"
+
+RUN_SCHEMA = pa.schema(
+    [
+        ('run_id', pa.string()),
+        ('recorded_at', pa.timestamp('us')),
+        ('ticker', pa.string()),
+        ('strategy', pa.string()),
+        ('timeframe', pa.string()),
+        ('params', pa.string()),  # JSON object
+    ]
+    + [(name, pa.float64()) for name in METRIC_COLUMNS]
+    + [('extra_metrics', pa.string())]  # JSON object of any other metrics
+)
+
+_PARTITIONING = ds.partitioning(pa.schema([('run_date', pa.date32())]), flavor='hive')
+
+
+def _runs_dir(store_dir):
+    return os.path.join(store_dir, "runs")
+
+
+def _signals_path(run_id, store_dir):
+    return os.path.join(store_dir, "signals", f"run_id={run_id}", "signals.parquet")
+
+
+def _atomic_write_table(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, lambda tmp_path: pq.write_table(table, tmp_path))
+
+
+def record_runs(results, param_columns=(), store_dir=RESULTS_DIR, **fixed):
+    """
+    Append backtest results to the store, one run per row, and return their run IDs.
+
+    `results` is a DataFrame (e.g. from run_backtest_grid or a parameter sweep)
+    holding ticker/strategy/timeframe columns (any capitalisation) and metric
+    columns; values for those fields can also be passed as keywords.
+    `param_columns` are packed into each run's params JSON.
+    """
+    rows = results.rename(columns=str.lower).rename(columns={name.lower(): name for name in METRIC_COLUMNS})
+    for key, value in fixed.items():
+        rows[key] = value
+
+    now = datetime.now()
+    run_ids = [uuid.uuid4().hex for _ in range(len(rows))]
+    known = {'ticker', 'strategy', 'timeframe', *METRIC_COLUMNS, *(c.lower() for c in param_columns)}
+    extra_columns = [c for c in rows.columns if c not in known]
+
+    def json_column(columns):
+        records = rows[columns].to_dict('records') if columns else [{}] * len(rows)
+        return [json.dumps(record, default=str) for record in records]
+
+    table = pa.table({
+        'run_id': run_ids,
+        'recorded_at': [now] * len(rows),
+        'ticker': rows['ticker'].astype(str).tolist(),
+        'strategy': rows['strategy'].astype(str).tolist(),
+        'timeframe': rows['timeframe'].astype(str).tolist(),
+        'params': json_column([c.lower() for c in param_columns]),
+        **{name: rows[name].astype(float).tolist() if name in rows else [None] * len(rows)
+           for name in METRIC_COLUMNS},
+        'extra_metrics': json_column(extra_columns),
+    }, schema=RUN_SCHEMA)
+
+    path = os.path.join(_runs_dir(store_dir), f"run_date={now.date().isoformat()}", f"{uuid.uuid4().hex}.parquet")
+    _atomic_write_table(table, path)
+    return run_ids
+
+
+def record_run(ticker, strategy, timeframe, metrics, params=None, signals=None, store_dir=RESULTS_DIR):
+    """Append a single run; `signals` (a DataFrame) is stored alongside it when given."""
+    row = {'ticker': ticker, 'strategy': strategy, 'timeframe': timeframe, **(params or {}), **metrics}
+    run_id = record_runs(pd.DataFrame([row]), param_columns=list(params or {}), store_dir=store_dir)[0]
+    if signals is not None:
+        _atomic_write_table(pa.Table.from_pandas(signals), _signals_path(run_id, store_dir))
+    return run_id
+
+
+def query_runs(ticker=None, strategy=None, timeframe=None, since=None, until=None, columns=None,
+               store_dir=RESULTS_DIR):
+    """
+    Filtered runs as a DataFrame.
+
+    Filters are pushed down to the parquet scan; since/until (dates) also
+    prune whole run_date partitions. `columns` limits what is read.
+    """
+    runs_dir = _runs_dir(store_dir)
+    if not os.path.isdir(runs_dir):
+        return pd.DataFrame(columns=columns or RUN_SCHEMA.names)
+    dataset = ds.dataset(runs_dir, format='parquet', partitioning=_PARTITIONING, schema=RUN_SCHEMA.append(
+        pa.field('run_date', pa.date32())))
+
+    predicate = None
+    for field, value in (('ticker', ticker), ('strategy', strategy), ('timeframe', timeframe)):
+        if value is None:
+            continue
+        values = [value] if isinstance(value, str) else list(value)
+        condition = ds.field(field).isin(values)
+        predicate = condition if predicate is None else predicate & condition
+    if since is not None:
+        condition = ds.field('run_date') >= pa.scalar(pd.Timestamp(since).date(), type=pa.date32())
+        predicate = condition if predicate is None else predicate & condition
+    if until is not None:
+        condition = ds.field('run_date') <= pa.scalar(pd.Timestamp(until).date(), type=pa.date32())
+        predicate = condition if predicate is None else predicate & condition
+
+    return dataset.to_table(columns=columns, filter=predicate).to_pandas()
+
+
+def compare_runs(metric='Sharpe Ratio', index='timeframe', columns='strategy', **filters):
+    """Pivot the latest run of each (ticker, strategy, timeframe) on one metric for side-by-side comparison."""
+    runs = query_runs(columns=['recorded_at', 'ticker', 'strategy', 'timeframe', metric], **filters)
+    latest = runs.sort_values('recorded_at').drop_duplicates(['ticker', 'strategy', 'timeframe'], keep='last')
+    return latest.pivot_table(index=index, columns=columns, values=metric, aggfunc='last')
+
+
+def load_signals(run_id, store_dir=RESULTS_DIR):
+    return pd.read_parquet(_signals_path(run_id, store_dir))
+
+
+def export_excel(df, path, max_rows=EXCEL_MAX_ROWS):
+    """Optional report step for a small slice of results; refuses frames Excel cannot hold."""
+    if len(df) > max_rows:
+        raise ValueError(f"{len(df)} rows exceed the Excel report limit of {max_rows}; query a smaller slice")
+    write_excel({'runs': df}, path, max_rows, index=False)
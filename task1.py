@@ -1,12 +1,16 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime
+import json
 import os
+import shutil
 
-# Parallel processing with Dask (if dataset grows very large)
-import dask.dataframe as dd
+from atomic_io import atomic_write
+from data_loader import list_partitions
+from data_quality import summarize, validate_bars, write_stats
+from fetcher import fetch_history, next_bar
+from tickers import YAHOO_SYMBOLS, storage_name
 
-tickers = ['^NSEI', '^NSEBANK', 'NIFTY_FIN_SERVICE.NS']
+tickers = list(YAHOO_SYMBOLS.values())
 
 # Data over 5 year period
 start_date = '2018-01-01'
@@ -14,27 +18,29 @@ end_date = datetime.now().strftime('%Y-%m-%d')
 
 # Directory to store partitioned data
 DATA_DIR = 'data/'
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
+# Last stored timestamp per ticker, used by incremental ingestion
+STATE_FILE = f"{DATA_DIR}ingest_state.json"
 
 
-# Download historical data from Yahoo Finance
-def fetch_data(ticker):
-    print(f"Fetching data for {ticker}")
-    try:
-        data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-        if data.empty:
-            print(f"No data found for {ticker}")
-            return None
-        return data
-    except Exception as e:
-        print(f"Error fetching data for {ticker}: {e}")
+# Download historical data from Yahoo Finance (see fetcher.fetch_history for batching, retries and caching)
+def fetch_data(ticker, start=start_date, download=None):
+    print(f"Fetching data for {ticker} from {start}")
+    data = fetch_history([ticker], start, end_date, download=download)[ticker]
+    if data is None:
+        return None
+    if data.empty:
+        print(f"No data found for {ticker}")
         return None
+    return data
 
 
-# Save the data to partitioned Parquet files (partitioning by Year/Month to reduce number of partitions)
+# Save the data to partitioned Parquet files (partitioning by Year/Month to reduce number of partitions),
+# replacing anything already stored for the ticker
 def save_to_parquet(df, file_name):
     print(f"Saving {file_name} partitioned by Year and Month")
+    # to_parquet adds a new part file to existing partitions, so a re-download would duplicate every row
+    if os.path.isdir(f"{DATA_DIR}{file_name}"):
+        shutil.rmtree(f"{DATA_DIR}{file_name}")
 
     # Ensure the index is in Datetime format
     if not pd.api.types.is_datetime64_any_dtype(df.index):
@@ -51,30 +57,139 @@ def save_to_parquet(df, file_name):
 
 # Loading data efficiently
 def load_data(file_name):
+    # Parallel processing with Dask (if dataset grows very large)
+    import dask.dataframe as dd
+
     print(f"Loading {file_name} using Dask for efficient processing")
     # Use Dask for large datasets
     df = dd.read_parquet(f"{DATA_DIR}{file_name}")
     return df
 
 
-# Process and save all ticker data
-def process_and_save_all_data(tickers):
-    for ticker in tickers:
-        df = fetch_data(ticker)
-        if df is not None:
-            save_to_parquet(df, ticker.replace('^', '').replace('.', '_'))
+def _read_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE) as f:
+        return json.load(f)
+
+
+def _update_state(file_name, last_timestamp):
+    # last_timestamp None drops the entry, so the mark falls back to what is actually stored
+    state = _read_state()
+    if last_timestamp is None:
+        state.pop(file_name, None)
+    else:
+        state[file_name] = pd.Timestamp(last_timestamp).isoformat()
 
+    def write(path):
+        with open(path, 'w') as f:
+            json.dump(state, f, indent=2)
 
-# Download and partition the data
-process_and_save_all_data(tickers)
+    atomic_write(STATE_FILE, write)
+
+
+# Last stored timestamp for a ticker: from the state file, else from its newest partition
+def get_high_water_mark(file_name):
+    state = _read_state()
+    if file_name in state:
+        return pd.Timestamp(state[file_name])
+
+    partitions = list_partitions(file_name, base_dir=DATA_DIR)
+    if not partitions:
+        return None
+    _, _, month_path = partitions[-1]
+    dates = [pd.read_parquet(os.path.join(month_path, f), columns=['Date'])['Date']
+             for f in os.listdir(month_path) if f.endswith('.parquet')]
+    return max(d.max() for d in dates) if dates else None
+
+
+# Merge new rows into the affected Year/Month partitions only, replacing each partition atomically
+def append_to_parquet(df, file_name):
+    if not pd.api.types.is_datetime64_any_dtype(df.index):
+        df.index = pd.to_datetime(df.index)
+    df.index.name = 'Date'
+
+    for (year, month), new_rows in df.groupby([df.index.year, df.index.month]):
+        month_path = os.path.join(f"{DATA_DIR}{file_name}", f"Year={year}", f"Month={month}")
+        os.makedirs(month_path, exist_ok=True)
+        print(f"Updating {file_name} partition Year={year}/Month={month} with {len(new_rows)} rows")
+
+        old_files = [os.path.join(month_path, f) for f in os.listdir(month_path) if f.endswith('.parquet')]
+        existing = [pd.read_parquet(f).set_index('Date') for f in old_files]
+        merged = pd.concat(existing + [new_rows])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+        part_path = os.path.join(month_path, 'part-0000.parquet')
+        atomic_write(part_path, lambda path: merged.reset_index().to_parquet(path, index=False))
+        # Files written by save_to_parquet are folded into part-0000 and can go
+        for f in old_files:
+            if f != part_path:
+                os.remove(f)
+
+
+# Process and save all ticker data
+def process_and_save_all_data(tickers, incremental=True, download=None):
+    """
+    Download and store every ticker.
+
+    In incremental mode only bars newer than the ticker's high-water mark are
+    fetched and only their Year/Month partitions are rewritten; tickers with no
+    stored data fall back to a full download from start_date. All tickers are
+    fetched together by fetcher.fetch_history; `download` replaces yfinance
+    there (e.g. with an offline stub).
+
+    Each download is sorted, deduplicated and checked against the NSE trading
+    calendar (data_quality.validate_bars) before it is stored, and the
+    ticker's partition stats sidecar is refreshed afterwards.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    file_names = {ticker: storage_name(ticker) for ticker in tickers}
+    marks = {ticker: get_high_water_mark(file_names[ticker]) if incremental else None for ticker in tickers}
+    # Incremental fetches start one bar after the stored max, not at the start of its day or chunk
+    starts = {ticker: next_bar(mark, '1d') if mark is not None else start_date for ticker, mark in marks.items()}
+
+    print(f"Fetching data for {', '.join(tickers)}")
+    frames = fetch_history(list(tickers), starts, end_date, download=download)
+
+    for ticker in tickers:
+        file_name = file_names[ticker]
+        last_timestamp = marks[ticker]
+        df = frames[ticker]
+        if df is None:
+            continue
+        if df.empty:
+            print(f"No data found for {ticker}")
+            continue
+        df = df.copy()
+        if not pd.api.types.is_datetime64_any_dtype(df.index):
+            df.index = pd.to_datetime(df.index)
+        df.index.name = 'Date'
+        df, report = validate_bars(df)
+        problems = summarize(report)
+        if problems:
+            print(f"{ticker}: {problems}")
+
+        if last_timestamp is None:
+            # A full download replaces the stored data; until it is written the old mark no longer holds
+            _update_state(file_name, None)
+            save_to_parquet(df, file_name)
+            _update_state(file_name, df['Date'].max())
+            write_stats(file_name, base_dir=DATA_DIR)
+            continue
+
+        df = df[df.index > last_timestamp]
+        if df.empty:
+            print(f"{ticker} is up to date")
+            continue
+        append_to_parquet(df, file_name)
+        _update_state(file_name, df.index.max())
+        write_stats(file_name, base_dir=DATA_DIR)
 
-# Example of loading Nifty data for processing
-nifty_df = load_data('NSEI')
-print(nifty_df.head())
-nifty_df = load_data('NSEBANK')
-print(nifty_df.head())
 
 # Placeholder function for filtering by expiry dates (options or futures)
+# Option chains converted from the Telegram .feather files are partitioned by expiry;
+# use feather_to_parquet.read_expiry(underlying, expiry) to read only that expiry's files, or
+# options_index.OptionsIndex for single strikes, date ranges and nearest-expiry ATM series.
 def filter_by_expiry(data, expiry_date):
     # Assuming data has an 'expiry' column (replace with real options/futures data)
     filtered_data = data[data['expiry'] == expiry_date]
@@ -83,3 +198,14 @@ def filter_by_expiry(data, expiry_date):
 # Example call (when you have actual options data)
 # expiry_date = '2023-12-28'
 # filtered_options = filter_by_expiry(nifty_options_data, expiry_date)
+
+
+if __name__ == "__main__":
+    # Download and partition the data
+    process_and_save_all_data(tickers)
+
+    # Example of loading Nifty data for processing
+    nifty_df = load_data('NSEI')
+    print(nifty_df.head())
+    nifty_df = load_data('NSEBANK')
+    print(nifty_df.head())
@@ -1,22 +1,11 @@
 import os
 import re
-from telethon import TelegramClient
-from dotenv import load_dotenv
-
-load_dotenv()
-
-api_id = os.getenv('API_ID')
-api_hash = os.getenv('API_HASH')
-phone_number = os.getenv('PHONE_NUMBER')
-group_link = os.getenv('GROUP_LINK')
 
 DOWNLOAD_DIR = 'telegram_data'
 
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+client = None
 
-client = TelegramClient('session_name', api_id, api_hash)
-
-async def main():
+async def main(group_link):
     await client.start()
 
     group = await client.get_entity(group_link)
@@ -48,5 +37,12 @@ async def main():
         else:
             print("No document found in this message.")
 
-with client:
-    client.loop.run_until_complete(main())
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from telethon import TelegramClient
+
+    load_dotenv()
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    client = TelegramClient('session_name', os.getenv('API_ID'), os.getenv('API_HASH'))
+    with client:
+        client.loop.run_until_complete(main(os.getenv('GROUP_LINK')))
@@ -2,44 +2,12 @@ import pandas as pd
 import os
 import numpy as np
 
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None)
-
-# Base data directory
-BASE_DIR = "data"
-BASE_OUTPUT_DIR = "output"
-if not os.path.exists(BASE_OUTPUT_DIR):
-    os.makedirs(BASE_OUTPUT_DIR)
-
-# Function to load data from the specified ticker, year, and month
-def load_data(ticker):
-    # Construct the path for the ticker
-    ticker_path = os.path.join(BASE_DIR, f"{ticker}")
-
-    # Load all parquet files in Year/Month structure
-    all_data = []
-
-    for year in os.listdir(ticker_path):
-        year_path = os.path.join(ticker_path, year)
-        if os.path.isdir(year_path):
-            for month in os.listdir(year_path):
-                month_path = os.path.join(year_path, month)
-                if os.path.isdir(month_path):
-                    for file_name in os.listdir(month_path):
-                        if file_name.endswith(".parquet"):
-                            file_path = os.path.join(month_path, file_name)
-                            df = pd.read_parquet(file_path)
-                            all_data.append(df)
-
-    # Concatenate all DataFrames
-    if all_data:
-        combined_df = pd.concat(all_data, ignore_index=True)
-        # combined_df['Date'] = pd.to_datetime(combined_df.index)  # Ensure Date is in datetime format
-        combined_df.set_index('Date', inplace=True)  # Set Date as index
-        return combined_df
-    else:
-        raise ValueError(f"No data found for ticker {ticker}")
-
+from data_loader import load_data
+from export import BASE_OUTPUT_DIR, export_path, parse_format, write_excel, write_frame
+from indicators import bollinger_bands, rsi, sma
+from instrumentation import timed
+from resample_cache import get_resampled
+from tickers import TICKER_MAP
 
 # Function to filter data based on expiry date
 def filter_data_by_start_expiry(df, start_date, expiry_date):
@@ -50,38 +18,37 @@ def filter_data_by_start_expiry(df, start_date, expiry_date):
     return filtered_df
 
 
+@timed()
 def apply_strategy(df, strategy):
     if strategy == "Moving Average Crossover":
-        df['SMA_20'] = df['Close'].rolling(window=20).mean()
-        df['SMA_50'] = df['Close'].rolling(window=50).mean()
+        df['SMA_20'] = sma(df['Close'], 20)
+        df['SMA_50'] = sma(df['Close'], 50)
         df['Signal'] = 0
         df.iloc[20:, df.columns.get_loc('Signal')] = np.where(
             df.iloc[20:, df.columns.get_loc('SMA_20')] > df.iloc[20:, df.columns.get_loc('SMA_50')], 1, 0)
         df['Position'] = df['Signal'].diff()
     elif strategy == "RSI":
         # Example implementation of RSI
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+        df['RSI'] = rsi(df['Close'], 14, wilder=False)
     elif strategy == "Bollinger Bands":
-        df['MA'] = df['Close'].rolling(window=20).mean()
-        df['Upper_Band'] = df['MA'] + (df['Close'].rolling(window=20).std() * 2)
-        df['Lower_Band'] = df['MA'] - (df['Close'].rolling(window=20).std() * 2)
+        df['MA'], df['Upper_Band'], df['Lower_Band'] = bollinger_bands(df['Close'], 20, 2)
 
     return df
 
-def resample_data(df, timeframe):
+@timed()
+def resample_data(df, timeframe, ticker=None):
     # Mapping for timeframes
     timeframe_mapping = {
-        "1 minute": "1T",
-        "5 minutes": "5T",
-        "1 hour": "1H",
+        "1 minute": "1min",
+        "5 minutes": "5min",
+        "1 hour": "1h",
         "1 day": "1D"
     }
 
-    if timeframe in timeframe_mapping:
+    if timeframe in timeframe_mapping and ticker is not None:
+        # df is the ticker's full history, so the shared resample cache applies
+        return get_resampled(ticker, timeframe_mapping[timeframe], source=df)
+    elif timeframe in timeframe_mapping:
         return df.resample(timeframe_mapping[timeframe]).agg({
             'Open': 'first',
             'High': 'max',
@@ -93,36 +60,49 @@ def resample_data(df, timeframe):
         raise ValueError(f"Invalid timeframe: {timeframe}")
 
 
-# Prompt the user for input parameters
-derivative = input("Choose a derivative (Nifty, BankNifty, FinNifty): ").strip()
-start_date = input("Specify the start date (YYYY-MM-DD): (Optional)").strip()
-expiry_date = input("Specify the expiry date (YYYY-MM-DD): (Optional)").strip()
-timeframes = input("Enter timeframes (e.g., 1 minute, 5 minutes, 1 hour, 1 day) separated by commas: ").split(',')
-strategy = input("Choose a trading strategy (Moving Average Crossover, RSI, Bollinger Bands): ").strip()
-
-# Map the user input to actual ticker symbols
-ticker_map = {
-    "Nifty": "NSEI",
-    "BankNifty": "NSEBANK",
-    "FinNifty": "NIFTY_FIN_SERVICE.NS"
-}
-
-# Load and process data based on user inputs
-if derivative in ticker_map:
-    ticker = ticker_map[derivative]
-    df = load_data(ticker)
-    # Filter the data based on expiry date if applicable
-    if expiry_date and start_date and start_date<expiry_date:
-        df = filter_data_by_start_expiry(df, start_date, expiry_date)
-        print(df)
-
-    for timeframe in timeframes:
-        print(f"Processing data for {timeframe} timeframe...")
-        resampled_df = resample_data(df, timeframe)
-
-        if strategy:
-            resampled_df = apply_strategy(resampled_df, strategy)
-            # Display the processed data
-            print(resampled_df)
-            output_file = f"{BASE_OUTPUT_DIR}/task2 {strategy} trading signals.xlsx"
-            resampled_df.to_excel(output_file, index=True)
+if __name__ == "__main__":
+    pd.set_option('display.max_rows', None)
+    pd.set_option('display.max_columns', None)
+    os.makedirs(BASE_OUTPUT_DIR, exist_ok=True)
+
+    # Prompt the user for input parameters
+    derivative = input("Choose a derivative (Nifty, BankNifty, FinNifty): ").strip()
+    start_date = input("Specify the start date (YYYY-MM-DD): (Optional)").strip()
+    expiry_date = input("Specify the expiry date (YYYY-MM-DD): (Optional)").strip()
+    timeframes = input("Enter timeframes (e.g., 1 minute, 5 minutes, 1 hour, 1 day) separated by commas: ").split(',')
+    strategy = input("Choose a trading strategy (Moving Average Crossover, RSI, Bollinger Bands): ").strip()
+    fmt, compression = parse_format(input("Output format (parquet, csv, csv.gz, csv.zst; default parquet): "))
+    excel = input("Also write an Excel workbook with one sheet per timeframe? (y/N): ").strip().lower() == 'y'
+
+    # Map the user input to actual ticker symbols
+    ticker_map = TICKER_MAP
+
+    # Load and process data based on user inputs
+    if derivative in ticker_map:
+        ticker = ticker_map[derivative]
+        # Filter the data based on expiry date if applicable (only the partitions in range are read)
+        cache_ticker = None
+        if expiry_date and start_date and start_date<expiry_date:
+            df = load_data(ticker, start_date, expiry_date)
+            print(df)
+        else:
+            df = load_data(ticker)
+            cache_ticker = ticker
+
+        sheets = {}
+        for timeframe in timeframes:
+            timeframe = timeframe.strip()
+            print(f"Processing data for {timeframe} timeframe...")
+            resampled_df = resample_data(df, timeframe, cache_ticker)
+
+            if strategy:
+                resampled_df = apply_strategy(resampled_df, strategy)
+                # Display the processed data
+                print(resampled_df)
+                # One file per timeframe, so timeframes no longer overwrite each other
+                write_frame(resampled_df, export_path("task2", strategy, timeframe, fmt, compression), fmt, compression)
+                if excel:
+                    sheets[timeframe] = resampled_df
+
+        if sheets:
+            write_excel(sheets, f"{BASE_OUTPUT_DIR}/task2 {strategy} trading signals.xlsx")
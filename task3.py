@@ -2,43 +2,15 @@ import numpy as np
 import pandas as pd
 import os
 
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None)
-
-BASE_DIR = "data"
-BASE_OUTPUT_DIR = "output"
-if not os.path.exists(BASE_OUTPUT_DIR):
-    os.makedirs(BASE_OUTPUT_DIR)
-
-def load_data(ticker):
-    # Construct the path for the ticker
-    ticker_path = os.path.join(BASE_DIR, f"{ticker}")
-
-    # Load all parquet files in Year/Month structure
-    all_data = []
-
-    for year in os.listdir(ticker_path):
-        year_path = os.path.join(ticker_path, year)
-        if os.path.isdir(year_path):
-            for month in os.listdir(year_path):
-                month_path = os.path.join(year_path, month)
-                if os.path.isdir(month_path):
-                    for file_name in os.listdir(month_path):
-                        if file_name.endswith(".parquet"):
-                            file_path = os.path.join(month_path, file_name)
-                            df = pd.read_parquet(file_path)
-                            all_data.append(df)
-
-    # Concatenate all DataFrames
-    if all_data:
-        combined_df = pd.concat(all_data, ignore_index=True)
-        # combined_df['Date'] = pd.to_datetime(combined_df.index)  # Ensure Date is in datetime format
-        combined_df.set_index('Date', inplace=True)  # Set Date as index
-        return combined_df
-    else:
-        raise ValueError(f"No data found for ticker {ticker}")
+from data_loader import load_data
+from indicators import rsi, sma
+from export import BASE_OUTPUT_DIR, export_path, parse_format, write_excel, write_frame
+from instrumentation import timed
+from positions import apply_positions
+from tickers import TICKER_MAP
 
 # Strategy: Moving Average Crossover
+@timed()
 def moving_average_crossover(df, short_window=20, long_window=50, stop_loss_pct=0.02):
     """
     Moving Average Crossover strategy with stop-loss logic.
@@ -48,8 +20,8 @@ def moving_average_crossover(df, short_window=20, long_window=50, stop_loss_pct=
 
     Stop-loss: Exits trade if price falls by stop_loss_pct from the entry price.
     """
-    df['SMA_Short'] = df['Close'].rolling(window=short_window).mean()
-    df['SMA_Long'] = df['Close'].rolling(window=long_window).mean()
+    df['SMA_Short'] = sma(df['Close'], short_window)
+    df['SMA_Long'] = sma(df['Close'], long_window)
 
     df['Signal'] = 0
     df['Signal'] = np.where(df['SMA_Short'] > df['SMA_Long'], 1, -1)
@@ -58,89 +30,43 @@ def moving_average_crossover(df, short_window=20, long_window=50, stop_loss_pct=
     # Stop-loss implementation
     df['Entry_Price'] = np.nan
     df['Exit_Price'] = np.nan
-    position = None
-    entry_price = None
-
-    for i in range(1, len(df)):
-        if df['Signal'].iloc[i] == 1 and position != 'long':
-            # Enter buy (long) position
-            position = 'long'
-            entry_price = df['Close'].iloc[i]
-            df.iloc[i, df.columns.get_loc('Entry_Price')] = entry_price
-            # print(f"Entry Price set at index {i}: {entry_price}")
-        elif df['Signal'].iloc[i] == -1 and position == 'long':
-            # Exit long position
-            position = None
-            df.iloc[i, df.columns.get_loc('Exit_Price')] = df['Close'].iloc[i]
-            # print(f"Exit Price set at index {i}: {df['Close'].iloc[i]}")
-        elif position == 'long':
-            # Check for stop-loss condition
-            if df['Close'].iloc[i] < entry_price * (1 - stop_loss_pct):
-                position = None
-                df.iloc[i, df.columns.get_loc('Exit_Price')] = df['Close'].iloc[i]
-                # print(f"Exit Price set at index {i}: {df['Close'].iloc[i]}")
-
+    apply_positions(df, stop_loss_pct)
 
     return df
 
 
 # Strategy: RSI (Relative Strength Index)
+@timed()
 def rsi_strategy(df, rsi_period=14, rsi_oversold=30, rsi_overbought=70, stop_loss_pct=0.02):
     """
     RSI strategy with stop-loss logic.
 
-    Buy when RSI < 30 (oversold).
-    Sell when RSI > 70 (overbought).
+    Buy when RSI < rsi_oversold (30).
+    Sell when RSI > rsi_overbought (70).
 
     Stop-loss: Exits trade if price falls by stop_loss_pct from the entry price.
     """
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=rsi_period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    df['RSI'] = rsi(df['Close'], rsi_period, wilder=False)
 
     df['Signal'] = 0
-    df.loc[df['RSI'] < 30, 'Signal'] = 1  # Buy signal
-    df.loc[df['RSI'] > 70, 'Signal'] = -1  # Sell signal
+    df.loc[df['RSI'] < rsi_oversold, 'Signal'] = 1  # Buy signal
+    df.loc[df['RSI'] > rsi_overbought, 'Signal'] = -1  # Sell signal
 
     # Stop-loss implementation
     # df['Entry_Price'] = np.nan
     # df['Exit_Price'] = np.nan
     df['Entry_Price'] = np.where(df['Signal'] == 1, df['Close'], np.nan)
     df['Exit_Price'] = np.where(df['Signal'] == -1, df['Close'], np.nan)
-
-    position = None
-    entry_price = None
-
-    for i in range(1, len(df)):
-        if df['Signal'].iloc[i] == 1 and position != 'long':
-            # Enter buy (long) position
-            position = 'long'
-            entry_price = df['Close'].iloc[i]
-            df.iloc[i, df.columns.get_loc('Entry_Price')] = entry_price
-            # print(f"Entry Price set at index {i}: {entry_price}")
-        elif df['Signal'].iloc[i] == -1 and position == 'long':
-            # Exit long position
-            position = None
-            df.iloc[i, df.columns.get_loc('Exit_Price')] = df['Close'].iloc[i]
-            # print(f"Exit Price set at index {i}: {df['Close'].iloc[i]}")
-        elif position == 'long':
-            # Check for stop-loss condition
-            if df['Close'].iloc[i] < entry_price * (1 - stop_loss_pct):
-                position = None
-                df.iloc[i, df.columns.get_loc('Exit_Price')] = df['Close'].iloc[i]
-                # print(f"Exit Price set at index {i}: {df['Close'].iloc[i]}")
+    apply_positions(df, stop_loss_pct)
 
     return df
 
 if __name__ == "__main__":
+    pd.set_option('display.max_rows', None)
+    pd.set_option('display.max_columns', None)
+    os.makedirs(BASE_OUTPUT_DIR, exist_ok=True)
 
-    ticker_map = {
-        "Nifty": "NSEI",
-        "BankNifty": "NSEBANK",
-        "FinNifty": "NIFTY_FIN_SERVICE.NS"
-    }
+    ticker_map = TICKER_MAP
 
     derivative = input("Choose a derivative (Nifty, BankNifty, FinNifty): ").strip()
 
@@ -149,16 +75,21 @@ if __name__ == "__main__":
         ticker = ticker_map[derivative]
         df = load_data(ticker)
         strategy = input("Choose a strategy (Moving Average Crossover, RSI): ").strip()
+        fmt, compression = parse_format(input("Output format (parquet, csv, csv.gz, csv.zst; default parquet): "))
+        excel = input("Also write an Excel workbook? (y/N): ").strip().lower() == 'y'
 
         if strategy == "Moving Average Crossover":
             df = moving_average_crossover(df)
-            output_file = f"{BASE_OUTPUT_DIR}/task_3_MAC_trading_signals.xlsx"
-            df.to_excel(output_file, index=True)
+            write_frame(df, export_path("task_3", "MAC", "raw", fmt, compression), fmt, compression)
+            if excel:
+                # The full minute history rarely fits a sheet; write_excel skips it if it doesn't
+                write_excel({"MAC": df}, f"{BASE_OUTPUT_DIR}/task_3_MAC_trading_signals.xlsx")
             # print(df[['Close', 'SMA_Short', 'SMA_Long', 'Signal', 'Entry_Price', 'Exit_Price']])
         elif strategy == "RSI":
             df = rsi_strategy(df)
-            output_file = f"{BASE_OUTPUT_DIR}/task_3_RSI_trading_signals.xlsx"
-            df.to_excel(output_file, index=True)
+            write_frame(df, export_path("task_3", "RSI", "raw", fmt, compression), fmt, compression)
+            if excel:
+                write_excel({"RSI": df}, f"{BASE_OUTPUT_DIR}/task_3_RSI_trading_signals.xlsx")
             # print(df[['Close', 'RSI', 'Signal', 'Entry_Price', 'Exit_Price']])
         else:
             print("Invalid strategy selected.")
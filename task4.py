@@ -1,40 +1,37 @@
-import pandas as pd
-import numpy as np
-from task3 import load_data, moving_average_crossover, rsi_strategy
-
-def backtest_strategy(df, strategy_func, timeframe):
-
-    # Resample data based on the timeframe
-    df_resampled = df.resample(timeframe).agg({
+from backtest_core import compute_metrics, pair_trades
+from instrumentation import timed
+from tickers import TICKER_MAP
+
+# Resample data based on the timeframe
+@timed('resample')
+def resample_ohlcv(df, timeframe):
+    return df.resample(timeframe).agg({
         'Open': 'first',
         'High': 'max',
         'Low': 'min',
         'Close': 'last',
         'Volume': 'sum'
     }).dropna()
-    df_signals = strategy_func(df_resampled)
-    df_signals['Position'] = df_signals['Signal'].diff()
 
-    df_signals['Returns'] = df_signals['Close'].pct_change()
-    df_signals['Strategy_Returns'] = df_signals['Returns'] * df_signals['Position'].shift(1)
 
-    # Calculate backtesting metrics
-    num_trades = len(df_signals['Position'][df_signals['Position'] != 0])
-    total_profit_loss = df_signals['Strategy_Returns'].sum()
-    win_rate = (df_signals['Strategy_Returns'][df_signals['Strategy_Returns'] > 0].count() / num_trades) * 100
-    sharpe_ratio = df_signals['Strategy_Returns'].mean() / df_signals['Strategy_Returns'].std()
-    max_drawdown = (df_signals['Strategy_Returns'].cumsum().max() - df_signals['Strategy_Returns'].cumsum().min()) / df_signals[
-        'Strategy_Returns'].cumsum().max()
+@timed()
+def backtest_strategy(df, strategy_func, timeframe, ticker=None):
+    """
+    Backtest strategy_func on df resampled to timeframe.
 
-    results = {
-        'Number of Trades': num_trades,
-        'Total Profit/Loss': total_profit_loss,
-        'Win Rate': win_rate,
-        'Sharpe Ratio': sharpe_ratio,
-        'Maximum Drawdown': max_drawdown
-    }
+    Pass ticker when df is that ticker's full history to reuse (and fill) the
+    on-disk resample cache instead of resampling df again.
+    """
+    if ticker is not None:
+        from resample_cache import get_resampled
+        df_resampled = get_resampled(ticker, timeframe, source=df)
+    else:
+        df_resampled = resample_ohlcv(df, timeframe)
+    df_signals = strategy_func(df_resampled)
 
-    return results
+    # Trades come from the strategy's Entry_Price/Exit_Price columns
+    entries, exits = pair_trades(df_signals['Entry_Price'].to_numpy(), df_signals['Exit_Price'].to_numpy())
+    return compute_metrics(df_signals['Close'].to_numpy(), entries, exits, timeframe)
 
 
 if __name__ == "__main__":
@@ -42,31 +39,23 @@ if __name__ == "__main__":
     strategy = input("Choose a strategy (Moving Average Crossover, RSI): ").strip()
 
     timeframe_list = ['1Min', '5Min', '1h', '1D', '1ME']  # Define the list of timeframes to backtest
-    ticker_map = {
-        "Nifty": "NSEI",
-        "BankNifty": "NSEBANK",
-        "FinNifty": "NIFTY_FIN_SERVICE.NS"
-    }
+    ticker_map = TICKER_MAP
 
     if derivative in ticker_map and strategy in ['Moving Average Crossover', 'RSI']:
-        ticker = ticker_map[derivative]
-        df = load_data(ticker)
+        from backtest_runner import run_backtest_grid
 
-        if strategy == "Moving Average Crossover":
-            strategy_func = moving_average_crossover
-        elif strategy == "RSI":
-            strategy_func = rsi_strategy
+        ticker = ticker_map[derivative]
 
-        results = []
-        for timeframe in timeframe_list:
-            print(f"Backtesting {strategy} strategy on {derivative} for {timeframe} timeframe...")
-            backtest_result = backtest_strategy(df, strategy_func, timeframe)
-            results.append(backtest_result)
-            print("Backtest Results:")
-            for key, value in backtest_result.items():
+        # Timeframes are backtested in parallel, one process per timeframe
+        print(f"Backtesting {strategy} strategy on {derivative} for {', '.join(timeframe_list)} timeframes...")
+        from results_store import RESULTS_DIR
+        results = run_backtest_grid([ticker], [strategy], timeframe_list, store_dir=RESULTS_DIR)
+        for _, backtest_result in results.iterrows():
+            print(f"Backtest Results ({backtest_result['Timeframe']}):")
+            for key, value in backtest_result.drop(['Ticker', 'Strategy', 'Timeframe']).items():
                 print(f"{key}: {value}")
             print("-" * 30)
 
-        # Optionally, you can save or further process the results here
+        # Runs are kept in the results store; compare them later with results_store.query_runs/compare_runs
     else:
         print("Invalid derivative or strategy selected.")
@@ -1,85 +1,191 @@
 import os
 import re
+import json
 import logging
 import asyncio
-from telethon import TelegramClient, errors
-from dotenv import load_dotenv
-
-load_dotenv()
-
-api_id = os.getenv('API_ID')
-api_hash = os.getenv('API_HASH')
-phone_number = os.getenv('PHONE_NUMBER')
-group_link = os.getenv('GROUP_LINK')
 
 DOWNLOAD_DIR = 'telegram_data'
+# Highest message ID below which every message has been processed
+CHECKPOINT_FILE = os.path.join(DOWNLOAD_DIR, 'checkpoint.json')
+MAX_CONCURRENT_DOWNLOADS = 4
+QUEUE_SIZE = 100
 
 session_name = 'session_name'
-client = TelegramClient(session_name, api_id, api_hash)
+# Created by scrape() so the pipeline can be imported (and driven by a fake client) without credentials
+client = None
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f).get('last_message_id', 0)
+
+
+def save_checkpoint(message_id, path=CHECKPOINT_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'last_message_id': message_id}, f)
+    os.replace(tmp_path, path)
+
+
+class CheckpointTracker:
+    """
+    Tracks message IDs in flight and persists the highest ID up to which all
+    messages are done. Downloads finish out of order, so the checkpoint only
+    moves past a message once every earlier one has completed.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.committed = load_checkpoint(path)
+        self._last_seen = self.committed
+        self._in_flight = set()
+
+    def seen(self, message_id):
+        self._last_seen = max(self._last_seen, message_id)
+        self._commit()
+
+    def start(self, message_id):
+        self._in_flight.add(message_id)
+        self.seen(message_id)
+
+    def done(self, message_id):
+        self._in_flight.discard(message_id)
+        self._commit()
+
+    def _commit(self):
+        watermark = min(self._in_flight) - 1 if self._in_flight else self._last_seen
+        if watermark > self.committed:
+            self.committed = watermark
+            save_checkpoint(watermark, self.path)
+
+
+def download_target(message):
+    """Return (file_path, size) for a message carrying an NFO/BFO .feather file, else None."""
+    if not message.document:
+        logging.info("No document found in this message.")
+        return None
+
+    file_name = message.document.attributes[0].file_name
+    logging.info(f"Found document: {file_name}")
+    if not file_name.endswith('.feather'):
+        return None
+
+    category = 'nfo' if 'nfo' in file_name.lower() else 'bfo' if 'bfo' in file_name.lower() else None
+    if category is None:
+        logging.warning(f"File {file_name} is neither NFO nor BFO.")
+        return None  # Skip files that don't contain nfo or bfo
+
+    match = re.match(r'(\d{4})-(\d{1,2})-(\d{1,2})', file_name)
+    if not match:
+        logging.warning(f"File name {file_name} does not match date format.")
+        return None
+
+    year, month, _ = match.groups()
+    return os.path.join(DOWNLOAD_DIR, category, year, month, file_name), message.document.size
+
+
+async def download_file(client, message, file_path, size, semaphore):
+    """Download a file unless an identical-size copy is already on disk."""
+    if os.path.exists(file_path) and os.path.getsize(file_path) == size:
+        logging.info(f'Already downloaded: {file_path}')
+        return
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f'{file_path}.part'
+    async with semaphore:
+        await client.download_media(message, tmp_path)
+    os.replace(tmp_path, file_path)
+    logging.info(f'Downloaded: {file_path}')
+
+
+async def _produce(client, group, queue, tracker):
+    # Oldest first from the checkpoint, so message IDs arrive in increasing order
+    async for message in client.iter_messages(group, reverse=True, min_id=tracker.committed):
+        logging.info(f"Processing message ID: {message.id}, Date: {message.date}")
+        target = download_target(message)
+        if target is None:
+            tracker.seen(message.id)
+            continue
+        tracker.start(message.id)
+        await queue.put((message, *target))  # Blocks while the queue is full
 
-async def download_file(message, category, year, month, file_name):
-    """Asynchronously download a file and save it in the specified directory."""
-    dir_path = os.path.join(DOWNLOAD_DIR, category, year, month)
-    os.makedirs(dir_path, exist_ok=True)
 
-    file_path = os.path.join(dir_path, file_name)
+async def _consume(client, queue, semaphore, tracker):
+    from telethon import errors
 
+    while True:
+        message, file_path, size = await queue.get()
+        try:
+            await download_file(client, message, file_path, size, semaphore)
+            tracker.done(message.id)
+        except errors.FloodWaitError:
+            raise  # Let maintain_session back off and resume from the checkpoint
+        except Exception as e:
+            # Left in flight so the checkpoint stays behind it and the next run retries it
+            logging.error(f'Failed to download {file_path}: {e}')
+        finally:
+            queue.task_done()
+
+
+async def run_pipeline(client, group, checkpoint_path=CHECKPOINT_FILE,
+                       concurrency=MAX_CONCURRENT_DOWNLOADS, queue_size=QUEUE_SIZE):
+    """
+    Stream the channel history through a bounded queue into `concurrency`
+    download workers, persisting progress so a restart resumes where it left off.
+
+    `client` only needs `iter_messages` and `download_media`, so a local fake
+    can stand in for TelegramClient.
+    """
+    queue = asyncio.Queue(maxsize=queue_size)
+    semaphore = asyncio.Semaphore(concurrency)
+    tracker = CheckpointTracker(checkpoint_path)
+
+    async def drain():
+        await _produce(client, group, queue, tracker)
+        await queue.join()
+
+    consumers = [asyncio.create_task(_consume(client, queue, semaphore, tracker)) for _ in range(concurrency)]
+    drain_task = asyncio.create_task(drain())
     try:
-        await client.download_media(message, file_path)
-        logging.info(f'Downloaded: {file_path}')
-    except Exception as e:
-        logging.error(f'Failed to download {file_name}: {e}')
+        done, _ = await asyncio.wait([drain_task, *consumers], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in [drain_task, *consumers]:
+            task.cancel()
+        await asyncio.gather(drain_task, *consumers, return_exceptions=True)
 
-async def main():
-    await client.start()
+    for task in done:
+        task.result()  # Re-raise a consumer failure
+    return tracker.committed
 
-    group = await client.get_entity(group_link)
 
-    download_tasks = []
+async def main(group_link, **pipeline_options):
+    await client.start()
 
-    async for message in client.iter_messages(group):
-        logging.info(f"Processing message ID: {message.id}, Date: {message.date}")
+    group = await client.get_entity(group_link)
+    await run_pipeline(client, group, **pipeline_options)
 
-        if message.document:
-            file_name = message.document.attributes[0].file_name
-            logging.info(f"Found document: {file_name}")
-
-            if file_name.endswith('.feather'):
-                category = 'nfo' if 'nfo' in file_name.lower() else 'bfo' if 'bfo' in file_name.lower() else None
-                if category is None:
-                    logging.warning(f"File {file_name} is neither NFO nor BFO.")
-                    continue  # Skip files that don't contain nfo or bfo
-
-                match = re.match(r'(\d{4})-(\d{1,2})-(\d{1,2})', file_name)
-                if match:
-                    year, month, _ = match.groups()
-                    download_tasks.append(download_file(message, category, year, month, file_name))
-                else:
-                    logging.warning(f"File name {file_name} does not match date format.")
-        else:
-            logging.info("No document found in this message.")
-
-    if download_tasks:
-        await asyncio.gather(*download_tasks)
-
-async def maintain_session():
+async def maintain_session(group_link, **pipeline_options):
     """Keep the session alive and handle reconnections."""
-    global session_name
+    from telethon import errors
+
     while True:
         try:
-            await main()
+            await main(group_link, **pipeline_options)
             break  # Exit the loop if `main` runs successfully
-        except errors.SessionPasswordNeeded:
+        except errors.SessionPasswordNeededError:
             logging.error("Session requires a password. Please enter your password.")
             break
-        except errors.SessionRevoked:
+        except errors.SessionRevokedError:
             logging.error("Session has been revoked. Creating a new session.")
             os.remove(f'{session_name}.session')  # Remove the expired session
             await client.start()  # Start a new session
-        except errors.FloodWait as e:
+        except errors.FloodWaitError as e:
             logging.error(f"Flood wait error: {e}. Retrying in {e.seconds} seconds...")
             await asyncio.sleep(e.seconds)  # Wait before trying again
-        except (errors.ConnectionError, errors.RPCError) as e:
+        except (ConnectionError, errors.RPCError) as e:
             logging.error(f"Connection error: {e}. Retrying in 5 seconds...")
             await asyncio.sleep(5)  # Wait before trying again
         except errors.SecurityError as e:
@@ -90,5 +196,19 @@ async def maintain_session():
             logging.error(f"Error in main loop: {e}. Retrying in 5 seconds...")
             await asyncio.sleep(5)  # Wait before trying again
 
-with client:
-    client.loop.run_until_complete(maintain_session())
+def scrape(group_link=None, checkpoint_path=CHECKPOINT_FILE, concurrency=MAX_CONCURRENT_DOWNLOADS):
+    """Download the group's .feather files; credentials (and the default group) come from .env."""
+    global client
+    from dotenv import load_dotenv
+    from telethon import TelegramClient
+
+    load_dotenv()
+    group_link = group_link or os.getenv('GROUP_LINK')
+    client = TelegramClient(session_name, os.getenv('API_ID'), os.getenv('API_HASH'))
+    with client:
+        client.loop.run_until_complete(
+            maintain_session(group_link, checkpoint_path=checkpoint_path, concurrency=concurrency))
+
+
+if __name__ == "__main__":
+    scrape()
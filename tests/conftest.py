@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# The modules are top-level scripts in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def ingested_data(tmp_path, monkeypatch):
+    """A data/ tree written by task1 (from the offline stub download) for its default tickers, as the cwd."""
+    import task1
+    from stubs import StubDownload
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(task1, "start_date", "2024-01-01")
+    monkeypatch.setattr(task1, "end_date", "2024-06-01")
+    task1.process_and_save_all_data(task1.tickers, download=StubDownload(until="2024-06-01"))
+    return tmp_path
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+TZ = "Asia/Kolkata"
+
+
+class StubDownload:
+    """Offline stand-in for yf_download: daily bars for every business day in [start, min(end, until))."""
+
+    def __init__(self, until):
+        self.until = pd.Timestamp(until)
+        self.requests = []
+
+    def __call__(self, tickers, start, end, interval):
+        self.requests.append((tickers, pd.Timestamp(start), pd.Timestamp(end)))
+        days = pd.bdate_range(start, min(pd.Timestamp(end), self.until), inclusive='left', tz=TZ, name='Date')
+        frames = {}
+        for ticker in [tickers] if isinstance(tickers, str) else tickers:
+            close = 100 + np.arange(len(days), dtype=np.float64)
+            frames[ticker] = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                                           'Adj Close': close, 'Volume': 1000}, index=days)
+        if isinstance(tickers, str):
+            return frames[tickers]
+        return pd.concat(frames, axis=1)
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import tast1_async_telegram_scrapper as scrapper
+
+
+def _message(message_id, file_name, size=64):
+    document = SimpleNamespace(attributes=[SimpleNamespace(file_name=file_name)], size=size)
+    return SimpleNamespace(id=message_id, date=datetime(2024, 1, 1), document=document)
+
+
+class FakeClient:
+    """Stands in for TelegramClient: iter_messages over a fixed history and download_media writing `size` bytes."""
+
+    def __init__(self, messages, fail_ids=(), delay=0.01):
+        self.messages = messages
+        self.fail_ids = set(fail_ids)
+        self.delay = delay
+        self.downloaded = []
+        self.active = 0
+        self.max_active = 0
+
+    async def iter_messages(self, group, reverse=False, min_id=0):
+        for message in sorted(self.messages, key=lambda m: m.id, reverse=not reverse):
+            if message.id > min_id:
+                yield message
+
+    async def download_media(self, message, path):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if message.id in self.fail_ids:
+                raise ConnectionResetError("connection lost")
+            with open(path, "wb") as f:
+                f.write(b"x" * message.document.size)
+            self.downloaded.append(message.id)
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def download_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrapper, "DOWNLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _history(count):
+    return [_message(i, f"2024-01-{i:02d}-nfo.feather") for i in range(1, count + 1)]
+
+
+def _run(client, checkpoint, concurrency=3):
+    return asyncio.run(scrapper.run_pipeline(client, "group", checkpoint_path=str(checkpoint),
+                                             concurrency=concurrency, queue_size=2))
+
+
+def test_downloads_are_bounded_by_concurrency(download_dir):
+    client = FakeClient(_history(12))
+    committed = _run(client, download_dir / "checkpoint.json", concurrency=3)
+
+    assert sorted(client.downloaded) == list(range(1, 13))
+    assert client.max_active == 3
+    assert committed == 12
+    assert os.path.exists(download_dir / "nfo" / "2024" / "01" / "2024-01-12-nfo.feather")
+
+
+def test_resumes_from_checkpoint_after_failure(download_dir):
+    checkpoint = download_dir / "checkpoint.json"
+    messages = _history(10) + [_message(11, "notes.txt")]
+
+    # Message 5 fails: the checkpoint stays just behind it even though later downloads finish
+    first = FakeClient(messages, fail_ids={5})
+    assert _run(first, checkpoint) == 4
+    assert json.loads(checkpoint.read_text()) == {'last_message_id': 4}
+
+    second = FakeClient(messages)
+    assert _run(second, checkpoint) == 11
+    # Only the failed message is fetched again; the rest resumed from the checkpoint are already on disk
+    assert second.downloaded == [5]
+
+
+def test_skips_files_already_downloaded_with_same_size(download_dir):
+    messages = _history(3)
+    done = download_dir / "nfo" / "2024" / "01" / "2024-01-01-nfo.feather"
+    partial = download_dir / "nfo" / "2024" / "01" / "2024-01-02-nfo.feather"
+    done.parent.mkdir(parents=True)
+    done.write_bytes(b"x" * 64)
+    partial.write_bytes(b"x" * 10)
+
+    client = FakeClient(messages)
+    _run(client, download_dir / "checkpoint.json")
+
+    assert sorted(client.downloaded) == [2, 3]
+    assert partial.stat().st_size == 64
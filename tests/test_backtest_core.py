@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest_core import compute_metrics, pair_trades, trade_ledger
+from positions import apply_positions, long_flat_positions
+
+
+def _signal_frame(rng, n):
+    # task3-style frame: signal-bar markers (as rsi_strategy writes them) plus the engine's entries/exits
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    p_buy, p_sell = rng.uniform(0.01, 0.2, 2)
+    signal = rng.choice([-1, 0, 1], size=n, p=[p_sell, 1 - p_buy - p_sell, p_buy])
+    signal[0] = 0  # The indicators are still warming up on the first bar
+    df = pd.DataFrame({'Close': close, 'Signal': signal},
+                      index=pd.date_range('2024-01-01 09:15', periods=n, freq='min'))
+    df['Entry_Price'] = np.where(signal == 1, close, np.nan)
+    df['Exit_Price'] = np.where(signal == -1, close, np.nan)
+    return apply_positions(df, 0.02)
+
+
+@pytest.mark.parametrize('seed', range(300))
+def test_pair_trades_matches_position_engine(seed):
+    rng = np.random.default_rng(seed)
+    df = _signal_frame(rng, int(rng.integers(2, 200)))
+    expected = long_flat_positions(df['Signal'].to_numpy(), df['Close'].to_numpy(), 0.02)
+
+    entries, exits = pair_trades(df['Entry_Price'].to_numpy(), df['Exit_Price'].to_numpy())
+    np.testing.assert_array_equal(entries, expected[0])
+    np.testing.assert_array_equal(exits, expected[1])
+
+    ledger = trade_ledger(df)
+    assert len(ledger) == len(expected[0])
+    assert (ledger['Holding_Bars'] >= 0).all()
+    assert compute_metrics(df['Close'], entries, exits)['Exposure'] <= 1
+
+
+def test_pair_trades_extra_entry_before_exit():
+    # Two entry markers ahead of the only exit are one trade, not two overlapping ones
+    entry_price = np.full(12, np.nan)
+    exit_price = np.full(12, np.nan)
+    entry_price[[3, 4]] = 1.0
+    exit_price[10] = 1.0
+
+    entries, exits = pair_trades(entry_price, exit_price)
+    np.testing.assert_array_equal(entries, [3])
+    np.testing.assert_array_equal(exits, [10])
@@ -0,0 +1,16 @@
+import os
+
+from backtest_runner import run_backtest_grid
+from tickers import TICKER_MAP, TICKERS
+
+
+def test_default_tickers_match_task1_storage_names(ingested_data):
+    data_dir = ingested_data / "data"
+    assert sorted(TICKERS) == sorted(name for name in os.listdir(data_dir) if (data_dir / name).is_dir())
+    assert TICKER_MAP["FinNifty"] == "NIFTY_FIN_SERVICE_NS"
+
+
+def test_default_grid_loads_every_ticker(ingested_data):
+    results = run_backtest_grid(timeframes=['1D'], max_workers=2)
+    assert sorted(results['Ticker'].unique()) == sorted(TICKERS)
+    assert len(results) == len(TICKERS) * 2
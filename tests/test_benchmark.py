@@ -0,0 +1,23 @@
+import time
+
+from benchmark import run_benchmarks, time_stage
+
+
+def test_setup_is_not_timed():
+    received = []
+
+    def setup():
+        time.sleep(0.05)
+        return [len(received)]
+
+    best, median, _ = time_stage(received.append, repeat=3, setup=setup)
+    # Every call, including the traced one, gets a fresh setup result
+    assert received == [[0], [1], [2], [3]]
+    assert median < 0.05
+
+
+def test_run_benchmarks_covers_every_stage(tmp_path):
+    report = run_benchmarks(sizes=[0.01], repeat=1, work_dir=str(tmp_path))
+    names = [result['name'] for result in report['results']]
+    assert "load_data" in names and "task3.rsi_strategy" in names
+    assert all(result['best_s'] >= 0 for result in report['results'])
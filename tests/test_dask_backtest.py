@@ -0,0 +1,41 @@
+import os
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import task3
+from dask_backtest import backtest_out_of_core, read_ticker
+from data_loader import load_data
+from task4 import backtest_strategy
+
+
+@pytest.fixture
+def five_minute_data(tmp_path):
+    # Three months of 5-minute bars, one parquet file per month as task1 lays them out
+    rng = np.random.default_rng(7)
+    index = pd.DatetimeIndex([ts for day in pd.bdate_range("2024-01-01", "2024-03-29")
+                              for ts in pd.date_range(day + pd.Timedelta("09:15:00"), periods=75, freq='5min')],
+                             name='Date')
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.003, len(index)))
+    df = pd.DataFrame({'Open': close, 'High': close * 1.002, 'Low': close * 0.998, 'Close': close,
+                       'Volume': rng.integers(1, 1000, len(index)).astype(float)}, index=index)
+    for (year, month), rows in df.groupby([df.index.year, df.index.month]):
+        month_path = tmp_path / "T" / f"Year={year}" / f"Month={month}"
+        os.makedirs(month_path)
+        rows.reset_index().to_parquet(month_path / "part-0000.parquet", index=False)
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize('strategy, func, params', [
+    ("Moving Average Crossover", task3.moving_average_crossover, {'short_window': 5, 'long_window': 20}),
+    ("RSI", task3.rsi_strategy, {'rsi_period': 14, 'rsi_oversold': 40, 'rsi_overbought': 60}),
+])
+@pytest.mark.parametrize('timeframe', ['1h', '1D'])
+def test_out_of_core_matches_in_memory(five_minute_data, strategy, func, params, timeframe):
+    expected = backtest_strategy(load_data("T", base_dir=five_minute_data), partial(func, **params), timeframe)
+    result = backtest_out_of_core(read_ticker("T", base_dir=five_minute_data), strategy, timeframe,
+                                  batch_size=2, **params)
+    assert expected['Number of Trades'] > 0
+    assert result == pytest.approx(expected, nan_ok=True)
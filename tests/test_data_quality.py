@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader
+from data_quality import read_stats, repair_ticker, validate_bars, write_stats
+
+
+def _bars(dates, close=None):
+    close = np.arange(len(dates), dtype=float) + 100 if close is None else np.asarray(close, dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1000},
+                        index=pd.DatetimeIndex(pd.to_datetime(dates), name='Date'))
+
+
+def test_validate_bars_sorts_and_keeps_the_last_duplicate():
+    df = _bars(["2024-01-03", "2024-01-02", "2024-01-04", "2024-01-03"], close=[101, 100, 102, 111])
+    repaired, report = validate_bars(df, holidays=[])
+
+    assert report['out_of_order'] == 2
+    assert report['duplicates'] == 1
+    assert list(repaired.index) == list(pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]))
+    assert repaired.loc["2024-01-03", 'Close'] == 111
+    assert report['rows_in'] == 4 and report['rows_out'] == 3
+
+
+def test_validate_bars_drops_nan_and_zero_prices():
+    df = _bars(["2024-01-02", "2024-01-03", "2024-01-04"])
+    df.loc["2024-01-03", 'Close'] = np.nan
+    df.loc["2024-01-04", 'Low'] = 0
+
+    repaired, report = validate_bars(df, holidays=[])
+    assert report['bad_prices'] == 2
+    assert list(repaired.index) == [pd.Timestamp("2024-01-02")]
+
+    kept, _ = validate_bars(df, holidays=[], drop_bad_prices=False)
+    assert len(kept) == 3
+
+
+def test_validate_bars_reports_missing_weekday_sessions():
+    # Friday 2024-01-05 is missing; the weekend and listed holidays are not sessions
+    df = _bars(["2024-01-04", "2024-01-08", "2024-01-10"])
+    _, report = validate_bars(df, holidays=[pd.Timestamp("2024-01-09")])
+    assert report['missing_sessions'] == ["2024-01-05"]
+    assert report['extra_sessions'] == []
+
+
+def _write_month(base_dir, ticker, year, month, frames):
+    month_path = os.path.join(base_dir, ticker, f"Year={year}", f"Month={month}")
+    os.makedirs(month_path, exist_ok=True)
+    for i, df in enumerate(frames):
+        df.reset_index().to_parquet(os.path.join(month_path, f"part-{i:04d}.parquet"), index=False)
+    return month_path
+
+
+def test_sidecar_goes_stale_when_a_file_is_rewritten(tmp_path):
+    month_path = _write_month(tmp_path, "T", 2024, 1, [_bars(pd.bdate_range("2024-01-01", "2024-01-31"))])
+    write_stats("T", base_dir=str(tmp_path), holidays=[])
+    assert read_stats("T", base_dir=str(tmp_path))["Year=2024/Month=1"]['sorted']
+
+    _bars(pd.bdate_range("2024-01-01", "2024-01-10")).reset_index().to_parquet(
+        os.path.join(month_path, "part-0000.parquet"), index=False)
+    assert read_stats("T", base_dir=str(tmp_path)) == {}
+
+    stats = write_stats("T", base_dir=str(tmp_path), holidays=[])
+    assert stats["Year=2024/Month=1"]['rows'] == len(pd.bdate_range("2024-01-01", "2024-01-10"))
+
+
+def test_repair_ticker_merges_unsorted_overlapping_files(tmp_path):
+    days = pd.bdate_range("2024-01-01", "2024-01-31")
+    month_path = _write_month(tmp_path, "T", 2024, 1, [_bars(days[10:][::-1]), _bars(days[:12])])
+    _write_month(tmp_path, "T", 2024, 2, [_bars(pd.bdate_range("2024-02-01", "2024-02-29"))])
+
+    repaired = repair_ticker("T", base_dir=str(tmp_path), holidays=[])
+    assert list(repaired) == ["Year=2024/Month=1"]
+    assert repaired["Year=2024/Month=1"]['duplicates'] == 2
+    assert os.listdir(month_path) == ["part-0000.parquet"]
+    stored = pd.read_parquet(os.path.join(month_path, "part-0000.parquet"))
+    assert list(stored['Date']) == list(days)
+
+    stats = read_stats("T", base_dir=str(tmp_path))
+    assert all(entry['sorted'] for entry in stats.values())
+    # Nothing left to do on a second pass
+    assert repair_ticker("T", base_dir=str(tmp_path), holidays=[]) == {}
+
+
+@pytest.fixture
+def two_months(tmp_path):
+    _write_month(tmp_path, "T", 2024, 1, [_bars(pd.bdate_range("2024-01-01", "2024-01-31"))])
+    month_path = _write_month(tmp_path, "T", 2024, 2, [_bars(pd.bdate_range("2024-02-01", "2024-02-29"))])
+    return str(tmp_path), month_path
+
+
+def test_scan_is_in_order_only_with_fresh_sorted_stats(two_months):
+    base_dir, february = two_months
+    # No sidecar: nothing is known about the order
+    assert data_loader._scan("T", base_dir=base_dir)[1] is False
+
+    write_stats("T", base_dir=base_dir, holidays=[])
+    table, in_order = data_loader._scan("T", base_dir=base_dir)
+    assert in_order
+    assert table.num_rows == len(pd.bdate_range("2024-01-01", "2024-02-29"))
+
+    # A file added after the stats were written makes that partition's entry stale
+    _bars(pd.bdate_range("2024-02-05", "2024-02-06")).reset_index().to_parquet(
+        os.path.join(february, "part-0001.parquet"), index=False)
+    assert data_loader._scan("T", base_dir=base_dir)[1] is False
+
+    # ...and once the stats are refreshed they record the overlap as unsorted
+    write_stats("T", base_dir=base_dir, holidays=[])
+    assert data_loader._scan("T", base_dir=base_dir)[1] is False
+    df = data_loader.load_data("T", base_dir=base_dir)
+    assert df.index.is_monotonic_increasing
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+import pytest
+
+from export import export_path, parse_format, write_excel, write_frame
+
+
+@pytest.mark.parametrize('spec, expected', [
+    (None, ("parquet", None)), ("csv", ("csv", None)), (" CSV.GZ ", ("csv", "gzip")),
+    ("csv.zst", ("csv", "zstd")), ("parquet.zstd", ("parquet", "zstd")),
+])
+def test_parse_format(spec, expected):
+    assert parse_format(spec) == expected
+
+
+@pytest.mark.parametrize('spec', ["xlsx", "csv.bz2", "parquet.gz.gz", ".gz"])
+def test_parse_format_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_format(spec)
+
+
+def _frame(n=1000):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01 09:15", periods=n, freq='min', tz="Asia/Kolkata", name='Date')
+    return pd.DataFrame({'Close': rng.normal(100, 1, n), 'Signal': rng.integers(-1, 2, n)}, index=index)
+
+
+@pytest.mark.parametrize('spec', ["parquet", "parquet.zstd", "csv", "csv.gz", "csv.zst"])
+def test_write_frame_round_trips_across_chunks(tmp_path, spec):
+    fmt, compression = parse_format(spec)
+    df = _frame()
+    path = export_path("Nifty", "RSI", "5Min", fmt, compression, output_dir=str(tmp_path))
+    assert write_frame(df, path, fmt, compression, chunk_rows=300) == path
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+    if fmt == "parquet":
+        back = pd.read_parquet(path).set_index('Date')
+        assert pq.ParquetFile(path).num_row_groups == 4
+    else:
+        # Arrow picks the decompression from the file extension
+        back = pcsv.read_csv(path).to_pandas().set_index('Date')
+        back.index = back.index.tz_convert("Asia/Kolkata")
+    pd.testing.assert_frame_equal(back, df, check_freq=False, check_index_type=False)
+
+
+def test_write_frame_leaves_no_partial_file(tmp_path):
+    path = str(tmp_path / "out.parquet")
+    with pytest.raises(Exception):
+        write_frame(_frame(), path, "parquet", compression="not-a-codec")
+    assert os.listdir(tmp_path) == []
+
+
+def test_write_excel_skips_oversize_frames(tmp_path):
+    path = str(tmp_path / "out.xlsx")
+    assert write_excel({"big": _frame(20)}, path, max_rows=10) == []
+    assert not os.path.exists(path)
+
+
+def test_write_excel_writes_tz_aware_index_as_local_time(tmp_path):
+    pytest.importorskip("openpyxl")
+    path = str(tmp_path / "out.xlsx")
+    small, big = _frame(5), _frame(20)
+    assert write_excel({"small": small, "big": big}, path, max_rows=10) == ["small"]
+
+    back = pd.read_excel(path, sheet_name=None, index_col=0)
+    assert list(back) == ["small"]
+    assert list(back["small"].index) == list(small.index.tz_localize(None))
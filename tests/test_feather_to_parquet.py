@@ -0,0 +1,52 @@
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+from feather_to_parquet import OUTPUT_SCHEMA, convert_feather, read_expiry, sort_and_dedup
+
+
+def _raw_chain():
+    # Two contracts, rows shuffled, with one bar repeated (a later correction of the first copy)
+    rows = [
+        ("2024-01-02 09:17:00", "NIFTY24JAN21000CE", 12.0),
+        ("2024-01-02 09:15:00", "NIFTY24JAN21000PE", 30.0),
+        ("2024-01-02 09:16:00", "NIFTY24JAN21000CE", 11.0),
+        ("2024-01-02 09:15:00", "NIFTY24JAN21000CE", 10.0),
+        ("2024-01-02 09:16:00", "NIFTY24JAN21000PE", 31.0),
+        ("2024-01-02 09:16:00", "NIFTY24JAN21000CE", 11.5),
+    ]
+    return pd.DataFrame({
+        'datetime': pd.to_datetime([r[0] for r in rows]),
+        'symbol': [r[1] for r in rows],
+        'close': [r[2] for r in rows],
+        'open': [r[2] for r in rows], 'high': [r[2] for r in rows], 'low': [r[2] for r in rows],
+        'volume': 100, 'oi': 1000,
+    })
+
+
+def test_sort_and_dedup_orders_by_contract_and_keeps_last():
+    raw = _raw_chain()
+    table = pa.Table.from_pandas(raw.assign(
+        timestamp=raw['datetime'].astype('datetime64[s]'), strike=21000.0, option_type=raw['symbol'].str[-2:],
+        underlying='NIFTY', expiry=pd.Timestamp("2024-01-25").date(), date=pd.Timestamp("2024-01-02").date(),
+    )[OUTPUT_SCHEMA.names], schema=OUTPUT_SCHEMA, preserve_index=False)
+
+    result, report = sort_and_dedup(table)
+    assert report['duplicates'] == 1
+    assert report['out_of_order'] > 0
+    df = result.to_pandas()
+    assert list(zip(df['symbol'].str[-2:], df['timestamp'].dt.minute, df['close'])) == [
+        ("CE", 15, 10.0), ("CE", 16, 11.5), ("CE", 17, 12.0), ("PE", 15, 30.0), ("PE", 16, 31.0)]
+
+
+def test_convert_feather_writes_sorted_unique_bars(tmp_path):
+    path = tmp_path / "2024-01-02-nfo.feather"
+    feather.write_feather(_raw_chain(), str(path))
+    convert_feather(str(path), 'nfo', output_dir=str(tmp_path / "out"))
+
+    chain = read_expiry("NIFTY", "2024-01-25", output_dir=str(tmp_path / "out"))
+    assert len(chain) == 5
+    for _, bars in chain.groupby('symbol'):
+        assert bars['timestamp'].is_monotonic_increasing and bars['timestamp'].is_unique
+    assert chain.loc[(chain['symbol'] == "NIFTY24JAN21000CE") & (chain['timestamp'].dt.minute == 16), 'close'].item() \
+        == 11.5
@@ -0,0 +1,117 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import task1
+from fetcher import chunk_ranges, fetch_history
+from stubs import TZ, StubDownload
+
+
+def test_first_chunk_starts_at_requested_start():
+    start = pd.Timestamp("2024-03-16")
+    chunks = chunk_ranges(start, "2024-04-21", "1d")
+    assert chunks[0][0] == start
+    # Later chunks stay on the grid, so the first one ends at a grid boundary
+    assert chunk_ranges(chunks[0][1], "2026-01-01", "1d")[0][0] == chunks[0][1]
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+
+def test_fetch_history_batches_tickers_and_caches_completed_chunks(tmp_path):
+    stub = StubDownload(until="2024-02-01")
+    frames = fetch_history(["A", "B"], "2023-06-01", "2024-01-01", download=stub, cache_dir=str(tmp_path))
+    assert all(isinstance(tickers, list) and len(tickers) == 2 for tickers, _, _ in stub.requests)
+    assert frames["A"].index.min() >= pd.Timestamp("2023-06-01", tz=TZ)
+    assert frames["A"].index.max() < pd.Timestamp("2024-01-01", tz=TZ)
+
+    again = StubDownload(until="2024-02-01")
+    cached = fetch_history(["A", "B"], "2023-06-01", "2024-01-01", download=again, cache_dir=str(tmp_path))
+    assert again.requests == []
+    pd.testing.assert_frame_equal(cached["A"], frames["A"], check_freq=False)
+
+
+@pytest.fixture
+def ingest_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(task1, "start_date", "2024-01-01")
+    monkeypatch.setattr(task1, "end_date", "2024-06-01")
+    return tmp_path
+
+
+def _partition(ticker, year, month):
+    return os.path.join(task1.DATA_DIR, ticker, f"Year={year}", f"Month={month}")
+
+
+def test_incremental_ingest_fetches_only_new_bars(ingest_dir):
+    first = StubDownload(until="2024-03-15")
+    task1.process_and_save_all_data(["^NSEI"], download=first)
+    with open(task1.STATE_FILE) as f:
+        mark = pd.Timestamp(json.load(f)["NSEI"])
+    assert mark == pd.Timestamp("2024-03-14", tz=TZ)
+    january = os.listdir(_partition("NSEI", 2024, 1))
+    january_mtimes = {f: os.stat(os.path.join(_partition("NSEI", 2024, 1), f)).st_mtime_ns for f in january}
+
+    second = StubDownload(until="2024-04-20")
+    task1.process_and_save_all_data(["^NSEI"], download=second)
+
+    # Only bars after the stored max are requested
+    assert min(start for _, start, _ in second.requests) == pd.Timestamp("2024-03-15")
+    with open(task1.STATE_FILE) as f:
+        assert pd.Timestamp(json.load(f)["NSEI"]) == pd.Timestamp("2024-04-19", tz=TZ)
+
+    # March is rewritten as one merged, deduplicated file; April is new; January is untouched
+    assert os.listdir(_partition("NSEI", 2024, 3)) == ["part-0000.parquet"]
+    march = pd.read_parquet(os.path.join(_partition("NSEI", 2024, 3), "part-0000.parquet"))
+    assert march['Date'].is_unique and march['Date'].is_monotonic_increasing
+    assert len(march) == len(pd.bdate_range("2024-03-01", "2024-03-29"))
+    assert os.path.isdir(_partition("NSEI", 2024, 4))
+    assert {f: os.stat(os.path.join(_partition("NSEI", 2024, 1), f)).st_mtime_ns for f in january} == january_mtimes
+
+
+class FlakyDownload(StubDownload):
+    """Returns an empty frame (as yfinance does when rate limited) for the first `failures` requests."""
+
+    def __init__(self, until, failures, all_nan=False):
+        super().__init__(until)
+        self.failures = failures
+        self.all_nan = all_nan
+
+    def __call__(self, tickers, start, end, interval):
+        data = super().__call__(tickers, start, end, interval)
+        if len(self.requests) > self.failures:
+            return data
+        return data * float('nan') if self.all_nan else pd.DataFrame()
+
+
+@pytest.mark.parametrize('all_nan', [False, True])
+def test_empty_response_is_retried(tmp_path, all_nan):
+    stub = FlakyDownload(until="2024-02-01", failures=1, all_nan=all_nan)
+    frames = fetch_history(["A"], "2023-06-01", "2024-01-01", download=stub, max_workers=1, backoff=0,
+                           cache_dir=str(tmp_path))
+    assert len(frames["A"]) == len(pd.bdate_range("2023-06-01", "2023-12-31"))
+
+
+def test_empty_chunks_are_never_cached(tmp_path):
+    stub = FlakyDownload(until="2024-02-01", failures=100)
+    frames = fetch_history(["A"], "2023-06-01", "2024-01-01", download=stub, retries=1, backoff=0,
+                           cache_dir=str(tmp_path))
+    assert frames["A"].empty
+    assert not any(files for _, _, files in os.walk(tmp_path))
+
+    # The next run downloads the range again instead of serving an empty chunk from cache
+    again = StubDownload(until="2024-02-01")
+    frames = fetch_history(["A"], "2023-06-01", "2024-01-01", download=again, cache_dir=str(tmp_path))
+    assert again.requests
+    assert len(frames["A"]) == len(pd.bdate_range("2023-06-01", "2023-12-31"))
+
+
+def test_full_ingest_twice_does_not_duplicate_rows(ingest_dir):
+    for _ in range(2):
+        task1.process_and_save_all_data(["^NSEI"], incremental=False, download=StubDownload(until="2024-06-01"))
+
+    stored = pd.read_parquet(os.path.join(task1.DATA_DIR, "NSEI"))
+    assert stored['Date'].is_unique
+    assert len(stored) == len(pd.bdate_range("2024-01-01", "2024-05-31"))
+    with open(task1.STATE_FILE) as f:
+        assert pd.Timestamp(json.load(f)["NSEI"]) == pd.Timestamp("2024-05-31", tz=TZ)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+
+def _closes(seed, n=600, nan_runs=True):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    # Flat stretches (zero spread, zero gains and losses) and missing bars, alone and in runs
+    close[100:130] = close[100]
+    if nan_runs:
+        for start in rng.choice(n - 40, 6, replace=False):
+            close[start:start + rng.integers(1, 30)] = np.nan
+    return pd.Series(close)
+
+
+def _stream(indicator, close):
+    return np.array([indicator.update(price) for price in close])
+
+
+def _assert_matches(streamed, batch):
+    # Prices are ~100; pandas' own rolling moments differ from an exact sum by ~1e-9 on near-flat windows
+    np.testing.assert_allclose(streamed, np.asarray(batch, dtype=float), rtol=1e-9, atol=1e-7, equal_nan=True)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('nan_runs', [False, True])
+@pytest.mark.parametrize('window', [2, 14, 50])
+def test_streaming_matches_batch(seed, nan_runs, window):
+    close = _closes(seed, nan_runs=nan_runs)
+
+    _assert_matches(_stream(indicators.StreamingSMA(window), close), indicators.sma(close, window))
+    _assert_matches(_stream(indicators.StreamingEMA(window), close), indicators.ema(close, window))
+    _assert_matches(_stream(indicators.StreamingStd(window), close), indicators.rolling_std(close, window))
+    for wilder in (True, False):
+        _assert_matches(_stream(indicators.StreamingRSI(window, wilder), close),
+                        indicators.rsi(close, window, wilder))
+
+    bands = np.array(_stream(indicators.StreamingBollinger(window), close).tolist())
+    for streamed, batch in zip(bands.T, indicators.bollinger_bands(close, window)):
+        _assert_matches(streamed, batch)
+
+
+def test_streaming_accepts_bars_with_a_close_field():
+    close = _closes(0, nan_runs=False)[:50]
+    bars = pd.DataFrame({'Close': close})
+    sma = indicators.StreamingSMA(5)
+    _assert_matches([sma.update(bar) for _, bar in bars.iterrows()], indicators.sma(close, 5))
@@ -0,0 +1,22 @@
+import time
+
+import numpy as np
+
+from instrumentation import instrumented_run, stage
+
+
+def test_stage_peak_rss_is_per_stage():
+    with instrumented_run('test', summary=False) as run:
+        with stage('large'):
+            block = np.ones(200 * 1024 ** 2 // 8)
+            time.sleep(0.05)
+            del block
+        with stage('small'):
+            time.sleep(0.05)
+
+    peaks = {row['stage']: row['peak_rss_mb'] for row in run.report()['stages']}
+    if peaks['test/small'] is None:  # No way to read RSS on this platform
+        return
+    # The small stage runs after the large one freed its memory, so it must not inherit that peak
+    assert peaks['test/large'] - peaks['test/small'] > 100
+    assert peaks['test'] >= peaks['test/large']
@@ -0,0 +1,45 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import live_engine
+
+
+@pytest.fixture
+def replayed(monkeypatch):
+    # Two sessions of 1-minute bars either side of a weekend
+    index = pd.DatetimeIndex([*pd.date_range("2024-01-05 15:27", periods=3, freq='min'),
+                              *pd.date_range("2024-01-08 09:15", periods=3, freq='min')], name='Date')
+    close = np.arange(len(index), dtype=float) + 100
+    df = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1.0}, index=index)
+    monkeypatch.setattr(live_engine, "load_data", lambda *args, **kwargs: df)
+
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(live_engine.asyncio, "sleep", sleep)
+    return df, waits
+
+
+def _replay(speed):
+    async def collect():
+        return [bar async for bar in live_engine.replay_parquet("T", speed=speed)]
+    return asyncio.run(collect())
+
+
+def test_replay_caps_waits_at_the_bar_interval(replayed):
+    df, waits = replayed
+    bars = _replay(speed=60)
+    assert [bar['Date'] for bar in bars] == list(df.index)
+    # After the first bar: one second per minute bar, and the weekend counts as one bar too
+    assert waits[1:] == [1.0] * 5
+
+
+def test_fast_replay_does_not_wait(replayed):
+    _, waits = replayed
+    assert len(_replay(speed=0)) == 6
+    assert waits == [0]
@@ -0,0 +1,94 @@
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+from pyarrow import feather
+
+from feather_to_parquet import convert_feather
+from options_index import INDEX_FILE, OptionsIndex, build_index
+
+STRIKES = [21000, 21100, 21200]
+# Weekly NIFTY contracts: NIFTY + YY + month (1-9/O/N/D) + DD + strike + CE/PE
+EXPIRIES = {date(2024, 1, 4): "NIFTY24104", date(2024, 1, 11): "NIFTY24111"}
+
+
+def _close(expiry, strike, option_type, minute):
+    # Every bar's price says which contract and minute it is
+    return expiry.day * 1000 + (strike - 21000) / 100 * 10 + (option_type == 'PE') * 5 + minute
+
+
+def _write_day(download_dir, output_dir, day):
+    rows = []
+    for expiry, prefix in EXPIRIES.items():
+        if expiry < day:
+            continue
+        for strike in STRIKES:
+            for option_type in ('CE', 'PE'):
+                for minute in range(3):
+                    close = _close(expiry, strike, option_type, minute)
+                    rows.append({'datetime': pd.Timestamp(day) + pd.Timedelta(hours=9, minutes=15 + minute),
+                                 'symbol': f"{prefix}{strike}{option_type}", 'open': close, 'high': close,
+                                 'low': close, 'close': close, 'volume': 10, 'oi': 100})
+    path = os.path.join(download_dir, f"{day.isoformat()}-nfo.feather")
+    feather.write_feather(pd.DataFrame(rows), path)
+    convert_feather(path, 'nfo', output_dir)
+
+
+@pytest.fixture
+def options_dir(tmp_path):
+    output_dir = str(tmp_path / "options")
+    for day in (date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4), date(2024, 1, 5)):
+        _write_day(str(tmp_path), output_dir, day)
+    return output_dir
+
+
+@pytest.mark.parametrize('cluster', [False, True])
+def test_chain_reads_one_expiry(options_dir, cluster):
+    index = OptionsIndex.load(output_dir=options_dir, cluster=cluster)
+    assert index.expiries("NIFTY") == list(EXPIRIES)
+    assert list(index.strikes("NIFTY", "2024-01-04")) == STRIKES
+
+    chain = index.chain("NIFTY", "2024-01-04")
+    assert len(chain) == 3 * len(STRIKES) * 2 * 3  # days x strikes x CE/PE x minutes
+    assert (chain['expiry'] == date(2024, 1, 4)).all()
+    assert chain['timestamp'].is_monotonic_increasing
+
+    calls = index.chain("NIFTY", "2024-01-11", start="2024-01-05", strikes=21100, option_type='CE',
+                        columns=['close'])
+    assert list(calls.columns) == ['underlying', 'expiry', 'timestamp', 'strike', 'option_type', 'close']
+    assert list(calls['close']) == [_close(date(2024, 1, 11), 21100, 'CE', minute) for minute in range(3)]
+
+
+def test_atm_series_rolls_to_the_next_expiry(options_dir):
+    index = OptionsIndex.load(output_dir=options_dir)
+    series = index.atm_series("NIFTY", 21090, option_type='CE')
+    assert (series['atm_strike'] == 21100).all()
+    by_day = series.groupby(series['timestamp'].dt.date)['expiry'].unique()
+    assert {day: list(expiries) for day, expiries in by_day.items()} == {
+        date(2024, 1, 2): [date(2024, 1, 4)], date(2024, 1, 3): [date(2024, 1, 4)],
+        date(2024, 1, 4): [date(2024, 1, 4)], date(2024, 1, 5): [date(2024, 1, 11)]}
+
+    # With a spot series the strike follows the latest spot price at or before each bar
+    spot = pd.Series([21010.0, 21190.0], index=pd.to_datetime(["2024-01-02 09:00", "2024-01-03 09:16"]))
+    series = index.atm_series("NIFTY", spot, start="2024-01-02", end="2024-01-03 23:59", option_type='PE')
+    strikes = series.set_index('timestamp')['strike']
+    assert (strikes[:"2024-01-03 09:15"] == 21000).all()
+    assert (strikes["2024-01-03 09:16":] == 21200).all()
+
+
+def test_index_picks_up_new_files(options_dir, tmp_path):
+    first = build_index(output_dir=options_dir)
+    index_path = os.path.join(options_dir, 'nfo', INDEX_FILE)
+    mtime = os.stat(index_path).st_mtime_ns
+    # Nothing changed: the index is not rewritten
+    assert len(build_index(output_dir=options_dir)) == len(first)
+    assert os.stat(index_path).st_mtime_ns == mtime
+
+    _write_day(str(tmp_path), options_dir, date(2024, 1, 8))
+    index = OptionsIndex.load(output_dir=options_dir)
+    assert os.stat(index_path).st_mtime_ns != mtime
+    assert len(index.entries) > len(first)
+    assert index.chain("NIFTY", "2024-01-11", start="2024-01-08")['timestamp'].dt.date.unique().tolist() == \
+        [date(2024, 1, 8)]
+    assert not [f for f in os.listdir(os.path.join(options_dir, 'nfo')) if f.endswith('.tmp')]
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from indicators import rsi
+from parameter_sweep import BATCH_MEMORY_BYTES, BYTES_PER_BAR, batch_size_for, rolling_means, rsi_matrix
+
+
+def test_rolling_means_recover_after_nan():
+    rng = np.random.default_rng(0)
+    close = 100 + rng.normal(0, 1, 500).cumsum()
+    close[100] = np.nan
+    windows = [5, 20, 50]
+
+    expected = np.column_stack([pd.Series(close).rolling(w).mean().to_numpy() for w in windows])
+    np.testing.assert_allclose(rolling_means(close, windows), expected, rtol=1e-9)
+    assert not np.isnan(rolling_means(close, windows)[200]).any()
+
+
+def test_rsi_matrix_matches_task3_rsi_with_nan():
+    rng = np.random.default_rng(1)
+    close = pd.Series(100 + rng.normal(0, 1, 300).cumsum())
+    close[50] = np.nan
+
+    expected = rsi(close, 14, wilder=False).to_numpy()
+    np.testing.assert_allclose(rsi_matrix(close.to_numpy(), [14])[:, 0], expected, rtol=1e-7, atol=1e-7)
+
+
+def test_batch_size_fits_memory_budget():
+    assert batch_size_for(1000) == 256
+    n_bars = 3 * 252 * 375
+    assert batch_size_for(n_bars) * n_bars * BYTES_PER_BAR <= BATCH_MEMORY_BYTES
+    assert batch_size_for(10 ** 9) == 1
@@ -0,0 +1,11 @@
+from portfolio import TICKERS, backtest_portfolio, load_price_matrix
+
+
+def test_default_portfolio_runs_on_task1_data(ingested_data):
+    close = load_price_matrix(timeframe='1D')
+    assert list(close.columns) == TICKERS
+    assert len(close) > 50
+
+    result = backtest_portfolio(close, "Moving Average Crossover", timeframe='1D', short_window=5, long_window=20)
+    assert list(result.metrics.index) == TICKERS + ['Portfolio']
+    assert result.weights.sum() == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from positions import LongFlatState, long_flat_positions
+
+
+def reference_positions(signal, close, stop_loss_pct):
+    # The bar-by-bar loop task3 used before the engine: bar 0 never trades, no stop check on the entry bar
+    entries, exits = [], []
+    position = None
+    entry_price = None
+    for i in range(1, len(signal)):
+        if signal[i] == 1 and position != 'long':
+            position = 'long'
+            entry_price = close[i]
+            entries.append(i)
+        elif signal[i] == -1 and position == 'long':
+            position = None
+            exits.append(i)
+        elif position == 'long':
+            if close[i] < entry_price * (1 - stop_loss_pct):
+                position = None
+                exits.append(i)
+    return entries, exits
+
+
+def _assert_engine_matches(signal, close, stop_loss_pct=0.02):
+    expected = reference_positions(signal, close, stop_loss_pct)
+    entries, exits = long_flat_positions(np.asarray(signal), np.asarray(close, dtype=float), stop_loss_pct)
+    assert entries.tolist() == expected[0]
+    assert exits.tolist() == expected[1]
+    return expected
+
+
+def test_exit_bar_never_re_enters():
+    # Bar 3 stops out (close 97 < 100 * 0.98) on a buy signal; the position is re-entered on bar 4, not bar 3
+    signal = [0, 1, 0, 1, 1, -1, 0]
+    close = [100, 100, 99, 97, 98, 99, 99]
+    assert _assert_engine_matches(signal, close) == ([1, 4], [3, 5])
+
+
+def test_signal_exit_and_stop_loss():
+    signal = [1, 1, 0, -1, 0, 1, 0, 0, 0]
+    close = [100, 100, 101, 102, 102, 100, 99, 95, 96]
+    # Bar 0 never trades; bar 3 exits on the sell signal; bar 7 on the 2% stop
+    assert _assert_engine_matches(signal, close) == ([1, 5], [3, 7])
+
+
+def test_no_stop_check_on_the_entry_bar():
+    signal = [0, 1, 0, 0]
+    close = [100, 50, 49.5, 40]
+    assert _assert_engine_matches(signal, close) == ([1], [3])
+
+
+def test_trailing_open_position_has_no_exit():
+    signal = [0, 1, 0, -1, 0, 1, 0]
+    close = [100.0] * 7
+    entries, exits = _assert_engine_matches(signal, close)
+    assert len(entries) == len(exits) + 1 and entries[-1] == 5
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_engine_matches_reference_loop(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 300))
+    p_buy, p_sell = rng.uniform(0.01, 0.3, 2)
+    signal = rng.choice([-1, 0, 1], size=n, p=[p_sell, 1 - p_buy - p_sell, p_buy])
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    stop_loss_pct = float(rng.choice([0.0, 0.005, 0.02, 0.1]))
+    entries, exits = _assert_engine_matches(signal, close, stop_loss_pct)
+
+    # The live state machine walks the same trades
+    state = LongFlatState(stop_loss_pct)
+    actions = [state.step(s, c) for s, c in zip(signal, close)]
+    assert [i for i, a in enumerate(actions) if a == 'entry'] == entries
+    assert [i for i, a in enumerate(actions) if a == 'exit'] == exits
+
+    # Two chunks, carrying an open position across the split, give the same trades
+    split = int(rng.integers(1, n)) if n > 1 else 1
+    first = long_flat_positions(signal[:split], close[:split], stop_loss_pct)
+    open_price = close[first[0][-1]] if len(first[0]) > len(first[1]) else None
+    second = long_flat_positions(signal[split:], close[split:], stop_loss_pct, start=0, entry_price=open_price)
+    assert np.concatenate([first[0], second[0] + split]).tolist() == entries
+    assert np.concatenate([first[1], second[1] + split]).tolist() == exits
@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import resample_cache
+from resample_cache import get_resampled, source_version
+from task4 import resample_ohlcv
+
+
+def _minute_bars(start, days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex([ts for day in pd.bdate_range(start, periods=days)
+                              for ts in pd.date_range(day + pd.Timedelta("09:15:00"), periods=375, freq='min')],
+                             name='Date')
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.001, len(index)))
+    return pd.DataFrame({'Open': close, 'High': close * 1.001, 'Low': close * 0.999, 'Close': close,
+                         'Volume': rng.integers(1, 1000, len(index))}, index=index)
+
+
+def _store(base_dir, df, name="part-0000.parquet"):
+    for (year, month), rows in df.groupby([df.index.year, df.index.month]):
+        month_path = os.path.join(base_dir, "T", f"Year={year}", f"Month={month}")
+        os.makedirs(month_path, exist_ok=True)
+        rows.reset_index().to_parquet(os.path.join(month_path, name), index=False)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    base_dir, cache_dir = str(tmp_path / "data"), str(tmp_path / "cache")
+    _store(base_dir, _minute_bars("2024-01-01", 10))
+    loads = []
+    load_data = resample_cache.load_data
+    monkeypatch.setattr(resample_cache, "load_data", lambda *args, **kwargs: loads.append(args) or
+                        load_data(*args, **kwargs))
+    return base_dir, cache_dir, loads
+
+
+def _cached(cache_dir):
+    return sorted(os.listdir(os.path.join(cache_dir, "T")))
+
+
+def test_hits_and_finer_levels_skip_the_raw_data(store):
+    base_dir, cache_dir, loads = store
+    hourly = get_resampled("T", "1h", base_dir=base_dir, cache_dir=cache_dir)
+    assert len(loads) == 1
+    pd.testing.assert_frame_equal(get_resampled("T", "h", base_dir=base_dir, cache_dir=cache_dir), hourly,
+                                  check_freq=False)
+    # 1D is built from the cached 1h bars, and matches resampling the raw data directly
+    daily = get_resampled("T", "1D", base_dir=base_dir, cache_dir=cache_dir)
+    assert len(loads) == 1
+    expected = resample_ohlcv(_minute_bars("2024-01-01", 10), "1D")
+    np.testing.assert_allclose(daily['Close'].to_numpy(), expected['Close'].to_numpy())
+    assert daily['Volume'].sum() == expected['Volume'].sum()
+    assert [f.split('-')[0] for f in _cached(cache_dir)] == ["D", "h"]
+
+
+def test_rewritten_source_invalidates_the_cache(store):
+    base_dir, cache_dir, loads = store
+    before = source_version("T", base_dir)
+    get_resampled("T", "D", base_dir=base_dir, cache_dir=cache_dir)
+
+    _store(base_dir, _minute_bars("2024-01-15", 5, seed=1), name="part-0001.parquet")
+    assert source_version("T", base_dir) != before
+    daily = get_resampled("T", "D", base_dir=base_dir, cache_dir=cache_dir)
+    assert len(loads) == 2
+    assert len(daily) == 15
+    # The superseded entry is removed when its replacement is written
+    assert _cached(cache_dir) == [f"D-{source_version('T', base_dir)}.parquet"]
+
+
+
+def test_entries_are_keyed_by_price_dtype(store):
+    base_dir, cache_dir, loads = store
+    source = _minute_bars("2024-01-01", 10)
+    narrow = source.astype({col: np.float32 for col in resample_cache.PRICE_COLUMNS})
+
+    wide = get_resampled("T", "h", source=source, base_dir=base_dir, cache_dir=cache_dir)
+    small = get_resampled("T", "h", source=narrow, base_dir=base_dir, cache_dir=cache_dir)
+    assert wide['Close'].dtype == np.float64 and small['Close'].dtype == np.float32
+    version = source_version("T", base_dir)
+    assert _cached(cache_dir) == [f"h-{version}.parquet", f"h.float32-{version}.parquet"]
+
+    # A float64 caller never gets the float32 bars, and a float32 source builds from its own finer level
+    assert get_resampled("T", "h", base_dir=base_dir, cache_dir=cache_dir)['Close'].dtype == np.float64
+    assert get_resampled("T", "D", source=narrow, base_dir=base_dir, cache_dir=cache_dir)['Close'].dtype \
+        == np.float32
+    assert loads == []
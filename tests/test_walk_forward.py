@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from parameter_sweep import rank_results
+from walk_forward import walk_forward, window_bounds
+
+GRID = {'short_window': [3, 5], 'long_window': [10, 20]}
+
+
+def _bars(n=400, seed=0, close=None):
+    rng = np.random.default_rng(seed)
+    if close is None:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({'Open': close, 'High': close * 1.005, 'Low': close * 0.995, 'Close': close,
+                         'Volume': 1000}, index=pd.date_range("2023-01-01", periods=len(close), freq='D'))
+
+
+def test_rolling_window_bounds():
+    index = pd.date_range("2024-01-01", periods=100, freq='D')
+    bounds = window_bounds(index, '30D', '10D')
+    assert bounds[0] == (0, 30, 40)
+    # The in-sample slice moves with each step; out-of-sample slices follow each other without overlap
+    assert all(b[0] == a[0] + 10 for a, b in zip(bounds, bounds[1:]))
+    assert all(a[2] == b[1] for a, b in zip(bounds, bounds[1:]))
+    assert all(b - a == 30 for a, b, _ in bounds)
+    assert bounds[-1][2] <= len(index)
+
+
+def test_anchored_window_bounds():
+    index = pd.date_range("2024-01-01", periods=100, freq='D')
+    rolling = window_bounds(index, '30D', '10D', step='20D')
+    anchored = window_bounds(index, '30D', '10D', step='20D', anchored=True)
+    assert [b[0] for b in anchored] == [0] * len(anchored)
+    assert [b[1:] for b in anchored] == [b[1:] for b in rolling]
+    assert [b[1] - b[0] for b in anchored] == [30, 50, 70, 90]
+
+
+def test_step_shorter_than_out_of_sample_is_rejected():
+    with pytest.raises(ValueError):
+        window_bounds(pd.date_range("2024-01-01", periods=100, freq='D'), '30D', '10D', step='5D')
+
+
+def test_walk_forward_is_the_same_serial_and_parallel():
+    df = _bars()
+    serial = walk_forward(df, "Moving Average Crossover", GRID, in_sample='120D', out_of_sample='60D',
+                          max_workers=1)
+    parallel = walk_forward(df, "Moving Average Crossover", GRID, in_sample='120D', out_of_sample='60D',
+                            max_workers=2)
+
+    assert len(serial.windows) == len(window_bounds(df.index, '120D', '60D'))
+    pd.testing.assert_frame_equal(serial.windows, parallel.windows)
+    assert serial.metrics == pytest.approx(parallel.metrics, nan_ok=True)
+    assert set(serial.windows['short_window']) <= {3, 5}
+
+
+def test_rank_results_puts_nan_scores_last():
+    results = pd.DataFrame({'short_window': [3, 5, 8], 'Sharpe Ratio': [0.5, np.nan, 1.5]})
+    assert list(rank_results(results, 'Sharpe Ratio', False)['short_window']) == [8, 3, 5]
+    assert list(rank_results(results, 'Sharpe Ratio', True)['short_window']) == [3, 8, 5]
+
+
+def test_walk_forward_when_no_combo_has_a_score():
+    # A flat price never trades, so every in-sample Sharpe ratio is NaN; the first combo is kept
+    df = _bars(close=np.full(300, 100.0))
+    result = walk_forward(df, "Moving Average Crossover", GRID, in_sample='120D', out_of_sample='60D',
+                          max_workers=1)
+    assert result.windows['In-Sample Sharpe Ratio'].isna().all()
+    assert (result.windows['short_window'] == 3).all() and (result.windows['long_window'] == 10).all()
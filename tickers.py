@@ -0,0 +1,16 @@
+# Yahoo symbols of the indices task1 downloads, by the names the scripts prompt for
+YAHOO_SYMBOLS = {
+    "Nifty": "^NSEI",
+    "BankNifty": "^NSEBANK",
+    "FinNifty": "NIFTY_FIN_SERVICE.NS"
+}
+
+
+def storage_name(symbol):
+    """Directory task1 stores a Yahoo symbol under in data/ ('NIFTY_FIN_SERVICE.NS' -> 'NIFTY_FIN_SERVICE_NS')."""
+    return symbol.replace('^', '').replace('.', '_')
+
+
+# Prompt name -> stored ticker, and the stored tickers themselves, for everything that reads data/
+TICKER_MAP = {name: storage_name(symbol) for name, symbol in YAHOO_SYMBOLS.items()}
+TICKERS = list(TICKER_MAP.values())
@@ -0,0 +1,188 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from backtest_core import METRIC_COLUMNS, compute_metrics
+from backtest_runner import attach_arrays, share_arrays
+from instrumentation import stage
+from parameter_sweep import (mac_signal_builder, rank_results, rolling_means, rsi_matrix, rsi_signal_builder,
+                             run_batches)
+from positions import long_flat_positions
+from task4 import resample_ohlcv
+from tickers import TICKER_MAP
+
+# Per strategy: parameter names (in combo order), the indicator matrix over the distinct values of the
+# first parameter, the signal builder for that matrix, and which combos are valid
+STRATEGIES = {
+    "Moving Average Crossover": {
+        'params': ['short_window', 'long_window'],
+        'keys': lambda combos: sorted({w for combo in combos for w in combo}),
+        'indicator': rolling_means,
+        'builder': mac_signal_builder,
+        'valid': lambda combo: combo[0] < combo[1],
+    },
+    "RSI": {
+        'params': ['rsi_period', 'rsi_oversold', 'rsi_overbought'],
+        'keys': lambda combos: sorted({combo[0] for combo in combos}),
+        'indicator': rsi_matrix,
+        'builder': rsi_signal_builder,
+        'valid': lambda combo: combo[1] < combo[2],
+    },
+}
+
+DEFAULT_GRIDS = {
+    "Moving Average Crossover": {'short_window': [5, 10, 20, 30], 'long_window': [50, 100, 200]},
+    "RSI": {'rsi_period': [7, 14, 21], 'rsi_oversold': [20, 30], 'rsi_overbought': [70, 80]},
+}
+
+# Set in each worker process (or in this one when running serially)
+_worker = {}
+
+
+@dataclass
+class WalkForwardResult:
+    windows: pd.DataFrame  # One row per window: bounds, chosen parameters, in-sample score, out-of-sample metrics
+    metrics: dict  # Metrics of all out-of-sample windows stitched together
+
+
+def window_bounds(index, in_sample, out_of_sample, step=None, anchored=False):
+    """
+    (in-sample start, out-of-sample start, out-of-sample end) bar positions of each walk-forward window.
+
+    Windows are laid out in time (in_sample/out_of_sample/step are Timedelta
+    strings such as '365D'), moving forward by step (default out_of_sample).
+    anchored=True grows the in-sample slice from the first bar instead of
+    rolling it.
+    """
+    in_sample, out_of_sample = pd.Timedelta(in_sample), pd.Timedelta(out_of_sample)
+    step = pd.Timedelta(step) if step is not None else out_of_sample
+    if step < out_of_sample:
+        raise ValueError("step must be at least out_of_sample, so out-of-sample windows don't overlap")
+
+    index = pd.DatetimeIndex(index)
+    bounds = []
+    start = index[0]
+    while start + in_sample <= index[-1]:
+        split = start + in_sample
+        first = 0 if anchored else index.searchsorted(start)
+        a, b, c = first, index.searchsorted(split), index.searchsorted(split + out_of_sample)
+        if b - a > 1 and c - b > 1:
+            bounds.append((a, b, c))
+        start += step
+    return bounds
+
+
+def _init_worker(spec, strategy, column, combos, stop_loss_pcts, timeframe, rank_by, ascending):
+    block, arrays = attach_arrays(spec)
+    _worker.update(block=block, arrays=arrays, strategy=strategy, column=column, combos=combos,
+                   stop_loss_pcts=stop_loss_pcts, timeframe=timeframe, rank_by=rank_by, ascending=ascending)
+
+
+def _run_window(bounds):
+    a, b, c = bounds
+    close, indicator = _worker['arrays']['close'], _worker['arrays']['indicator']
+    spec = STRATEGIES[_worker['strategy']]
+    timeframe = _worker['timeframe']
+
+    # In sample: every combo on slices of the shared indicator matrix, nothing recomputed
+    ranked = rank_results(
+        run_batches(close[a:b], _worker['combos'], _worker['stop_loss_pcts'],
+                    spec['builder'](indicator[a:b], _worker['column']), spec['params'], timeframe),
+        _worker['rank_by'], _worker['ascending'])
+    best = ranked.iloc[0]
+    combo = tuple(ranked[spec['params']].iloc[0].tolist())
+
+    # Out of sample: the chosen combo from flat, with any open position closed on the last bar
+    signals = spec['builder'](indicator[b:c], _worker['column'])([combo])[:, 0]
+    entries, exits = long_flat_positions(np.ascontiguousarray(signals), close[b:c], best['stop_loss_pct'])
+    if len(entries) > len(exits):
+        exits = np.append(exits, c - b - 1)
+    metrics = compute_metrics(close[b:c], entries, exits, timeframe)
+
+    row = {**dict(zip(spec['params'], combo)), 'stop_loss_pct': best['stop_loss_pct'],
+           f"In-Sample {_worker['rank_by']}": best[_worker['rank_by']], **metrics}
+    return row, entries + b, exits + b
+
+
+def walk_forward(df, strategy, param_grid=None, in_sample='365D', out_of_sample='90D', step=None, anchored=False,
+                 stop_loss_pcts=(0.02,), timeframe=None, rank_by='Sharpe Ratio', ascending=False, max_workers=None):
+    """
+    Walk-forward validation of a task3 strategy over a load_data frame.
+
+    In each window every parameter combo of param_grid (default
+    DEFAULT_GRIDS[strategy]) is backtested on the in-sample slice, the best by
+    rank_by is kept, and it is scored on the following out-of-sample slice.
+
+    The indicator matrix (rolling means or RSI for every window length) is
+    computed once over the whole history and each window reads slices of it,
+    so overlapping windows share their indicator state and out-of-sample
+    slices start with fully warmed-up indicators. Windows run in parallel on a
+    process pool (max_workers=1 runs them here) that maps the close series
+    and indicator matrix from shared memory.
+    """
+    if timeframe is not None:
+        df = resample_ohlcv(df, timeframe)
+    spec = STRATEGIES[strategy]
+    param_grid = param_grid or DEFAULT_GRIDS[strategy]
+    combos = [combo for combo in itertools.product(*(param_grid[name] for name in spec['params']))
+              if spec['valid'](combo)]
+    keys = spec['keys'](combos)
+    column = {key: j for j, key in enumerate(keys)}
+
+    close = df['Close'].to_numpy(dtype=np.float64)
+    bounds = window_bounds(df.index, in_sample, out_of_sample, step, anchored)
+    if not bounds:
+        raise ValueError("History is shorter than one in-sample plus out-of-sample window")
+
+    with stage('indicators'):
+        indicator = spec['indicator'](close, keys)
+    block, shared = share_arrays({'close': close, 'indicator': indicator})
+    initargs = (shared, strategy, column, combos, tuple(stop_loss_pcts), timeframe, rank_by, ascending)
+    try:
+        workers = min(max_workers or os.cpu_count() or 1, len(bounds))
+        with stage('windows'):
+            if workers == 1:
+                _init_worker(*initargs)
+                results = [_run_window(window) for window in bounds]
+                _worker.pop('block').close()
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+                    results = list(pool.map(_run_window, bounds))
+    finally:
+        block.close()
+        block.unlink()
+
+    index = df.index
+    rows = [{'In-Sample Start': index[a], 'Out-of-Sample Start': index[b], 'Out-of-Sample End': index[c - 1],
+             **row} for (a, b, c), (row, _, _) in zip(bounds, results)]
+    windows = pd.DataFrame(rows)
+
+    # Stitch the out-of-sample trades into one series from the first out-of-sample bar to the last
+    first, last = bounds[0][1], bounds[-1][2]
+    entries = np.concatenate([entries for _, entries, _ in results]) - first
+    exits = np.concatenate([exits for _, _, exits in results]) - first
+    metrics = compute_metrics(close[first:last], entries, exits, timeframe)
+    return WalkForwardResult(windows, {name: metrics[name] for name in METRIC_COLUMNS})
+
+
+if __name__ == "__main__":
+    from data_loader import load_data
+
+    ticker_map = TICKER_MAP
+    ticker_input = input("Choose ticker (Nifty, BankNifty, FinNifty): ").strip()
+    strategy = input("Choose a strategy (Moving Average Crossover, RSI): ").strip()
+    timeframe = input("Enter timeframe (e.g., 5Min, 1h, 1D): ").strip() or None
+    in_sample = input("In-sample length (default 365D): ").strip() or '365D'
+    out_of_sample = input("Out-of-sample length (default 90D): ").strip() or '90D'
+
+    if ticker_input in ticker_map and strategy in STRATEGIES:
+        df = load_data(ticker_map[ticker_input], columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        result = walk_forward(df, strategy, in_sample=in_sample, out_of_sample=out_of_sample, timeframe=timeframe)
+        print(result.windows.to_string(index=False))
+        print(pd.Series(result.metrics).to_string())
+    else:
+        print("Invalid ticker or strategy selected.")